@@ -13,6 +13,8 @@ class ActionTypes(Enum):
         REMOVE_FROM_ARCHIVE (str): Represents the action to remove data from an archive.
         VIEW_ARCHIVE (str): Represents the action to view data in an archive.
         CHECK_VALIDATION (str): Represents the action to check the validity of an archive.
+        EXTRACT (str): Represents the action to extract specific entries from an archive.
+        COMPACT_ARCHIVE (str): Represents the action to reclaim the space of removed data in an archive.
     """
 
     COMPRESS = "compress"
@@ -21,3 +23,5 @@ class ActionTypes(Enum):
     REMOVE_FROM_ARCHIVE = "remove-from-archive"
     VIEW_ARCHIVE = "view-archive"
     CHECK_VALIDATION = "is-valid-archive"
+    EXTRACT = "extract"
+    COMPACT_ARCHIVE = "compact-archive"
@@ -0,0 +1,1121 @@
+import hashlib
+from enum import IntFlag
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Union
+from exceptions import InvalidArchiveFormat, UnsupportedArchiveVersion
+
+if TYPE_CHECKING:
+    from data_compression import DataCompression
+
+ARCHIVE_MAGIC = b"CFLY"
+FOOTER_MAGIC = b"CFIX"
+FORMAT_VERSION = 1
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class ArchiveFlags(IntFlag):
+    """Feature flags stored in the archive header.
+
+    Readers reject archives with flags they do not know, so new
+    features can be introduced without breaking older readers silently.
+
+    Attributes:
+        NONE (int): No optional feature is used.
+        VARINT_FRAMING (int): Entries are framed with a flags byte and
+        LEB128 varint lengths instead of fixed 16 bytes lengths.
+        CENTRAL_DIRECTORY (int): The archive ends with a central directory
+        (index of all entries) located by a fixed size footer.
+        CHUNKED_ENTRIES (int): Entries may store the file data as a
+        sequence of independently compressed chunks.
+        REFERENCE_ENTRIES (int): Entries may refer to the data of an
+        earlier entry with the same content instead of storing it.
+        CHUNK_LISTS (int): Entries may store the file data as a list of
+        content defined chunks, referring to chunks stored earlier.
+        MANIFEST (int): The central directory is followed by a manifest
+        of the archived files, which may refer to a base archive.
+        RECORD_CHECKSUMS (int): The central directory stores the CRC32 of
+        every entry record, so the archive is validated without
+        decompressing it.
+        PATH_TABLE (int): The paths of the entries are stored in a path
+        table of the central directory, compressed once - the entry
+        records hold no path, the entry at the offset of a record gives
+        its path.
+        REMOVED_ENTRIES (int): The central directory holds tombstones of
+        removed entries (or of central directories replaced by an update),
+        whose records must be skipped.
+        SOLID_BLOCKS (int): Entries may store the file data inside a solid
+        block, the data of many files compressed as one stream.
+    """
+
+    NONE = 0
+    VARINT_FRAMING = 1
+    CENTRAL_DIRECTORY = 2
+    CHUNKED_ENTRIES = 4
+    REFERENCE_ENTRIES = 8
+    CHUNK_LISTS = 16
+    MANIFEST = 32
+    RECORD_CHECKSUMS = 64
+    PATH_TABLE = 128
+    REMOVED_ENTRIES = 256
+    SOLID_BLOCKS = 512
+
+
+KNOWN_ARCHIVE_FLAGS = (
+    ArchiveFlags.VARINT_FRAMING
+    | ArchiveFlags.CENTRAL_DIRECTORY
+    | ArchiveFlags.CHUNKED_ENTRIES
+    | ArchiveFlags.REFERENCE_ENTRIES
+    | ArchiveFlags.CHUNK_LISTS
+    | ArchiveFlags.MANIFEST
+    | ArchiveFlags.RECORD_CHECKSUMS
+    | ArchiveFlags.PATH_TABLE
+    | ArchiveFlags.REMOVED_ENTRIES
+    | ArchiveFlags.SOLID_BLOCKS
+)
+
+
+class EntryFlags(IntFlag):
+    """Flags stored in the first byte of every archive entry
+    (varint framing only).
+
+    Attributes:
+        NONE (int): A regular file entry - path followed by file data.
+        DIRECTORY (int): An empty directory entry - path only.
+        CHUNKED (int): A file entry whose data is a sequence of
+        length prefixed compressed chunks, ended by a zero length.
+        REFERENCE (int): A file entry whose data is the varint offset of
+        an earlier file entry with the same content.
+        CHUNK_LIST (int): A file entry whose data is a sequence of varint
+        tags, ended by a zero tag - an even tag (length << 1) is followed
+        by a stored compressed chunk, and an odd tag (offset << 1 | 1)
+        refers to the tag of a chunk stored earlier in the archive.
+        REMOVED (int): Central directory only - the entry was removed, and
+        its record is dead space until the archive is compacted (entries
+        which were not removed may still refer to it).
+        SOLID (int): A file entry stored in a solid block (the data of
+        many files compressed as one stream) - a varint tag like a chunk
+        list tag (the block is stored after an even tag, or an odd tag
+        refers to a block stored earlier), followed by the varint offset
+        and size of the file data inside the block.
+        INDEX (int): Central directory only (with REMOVED) - a central
+        directory and footer which an update appended to the archive
+        replaced, dead space like the records of removed entries.
+    """
+
+    NONE = 0
+    DIRECTORY = 1
+    CHUNKED = 2
+    REFERENCE = 4
+    CHUNK_LIST = 8
+    REMOVED = 16
+    SOLID = 32
+    INDEX = 64
+
+
+def encode_varint(value: int, size: int = 1) -> bytes:
+    """Encode a non negative integer as LEB128 varint - 7 bits per byte,
+    the high bit marks that more bytes follow.
+
+    Args:
+        value (int): The integer to encode.
+        size (int, optional): The minimum number of bytes - smaller values
+        are padded with continuation bytes, so larger values can replace
+        them in place. Defaults to 1.
+
+    Returns:
+        bytes: The varint bytes.
+    """
+    varint = bytearray()
+    while value >= 0x80 or len(varint) < size - 1:
+        varint.append((value & 0x7F) | 0x80)
+        value >>= 7
+    varint.append(value)
+
+    return bytes(varint)
+
+
+def decode_varint(
+    data: Union[bytes, memoryview], index: int = 0
+) -> Tuple[int, int]:
+    """Decode a LEB128 varint.
+
+    Args:
+        data (bytes | memoryview): The data holding the varint.
+        index (int, optional): The index of the varint in the data.
+        Defaults to 0.
+
+    Returns:
+        Tuple[int, int]: The decoded integer and the index of the first
+        byte after the varint.
+
+    Raises:
+        InvalidArchiveFormat: If the varint is truncated.
+    """
+    value = 0
+    shift = 0
+    while True:
+        if index >= len(data):
+            raise InvalidArchiveFormat("Truncated varint length.")
+        byte = data[index]
+        index += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, index
+        shift += 7
+
+
+def match_path(path: str, patterns: List[str]) -> bool:
+    """Check whether a path matches one of the given glob patterns, or is
+    inside a directory given as a pattern.
+
+    Args:
+        path (str): The path of an entry.
+        patterns (list): The glob patterns (e.g. 'conf/*.ini').
+
+    Returns:
+        bool: True if the path matches.
+    """
+    prefixes = tuple(pattern.rstrip("/") + "/" for pattern in patterns)
+    return path.startswith(prefixes) or any(
+        fnmatchcase(path.rstrip("/"), pattern.rstrip("/"))
+        for pattern in patterns
+    )
+
+
+def is_under_paths(path: str, paths: List[str]) -> bool:
+    """Check whether a path is one of the given paths, or inside a
+    directory given as one of them - 'e/a.txt' is not under 'e/a'.
+
+    Args:
+        path (str): The path of an entry.
+        paths (list): The paths of files and directories.
+
+    Returns:
+        bool: True if the path is under one of the paths.
+    """
+    prefixes = tuple(path.rstrip("/") + "/" for path in paths)
+    return path in paths or path.startswith(prefixes)
+
+
+def gf2_matrix_times(matrix: Sequence[int], vector: int) -> int:
+    """Multiply a 32x32 matrix over GF(2) by a 32 bits vector.
+
+    Args:
+        matrix (list): The matrix columns.
+        vector (int): The vector.
+
+    Returns:
+        int: The product vector.
+    """
+    product = 0
+    column = 0
+    while vector:
+        if vector & 1:
+            product ^= matrix[column]
+        vector >>= 1
+        column += 1
+
+    return product
+
+
+def gf2_matrix_square(matrix: List[int]) -> List[int]:
+    """Square a 32x32 matrix over GF(2).
+
+    Args:
+        matrix (list): The matrix columns.
+
+    Returns:
+        list: The columns of the squared matrix.
+    """
+    return [gf2_matrix_times(matrix, column) for column in matrix]
+
+
+@lru_cache(maxsize=64)
+def crc32_zeros_operator(length: int) -> Tuple[int, ...]:
+    """Build the operator which advances a CRC32 over zero bytes. The
+    operators are cached, since the chunks of an archive mostly have the
+    same size.
+
+    Args:
+        length (int): The number of zero bytes.
+
+    Returns:
+        tuple: The columns of the operator matrix.
+    """
+    # operator of a single zero bit, squared to the one of a zero byte
+    square = [0xEDB88320] + [1 << n for n in range(31)]
+    for _ in range(3):
+        square = gf2_matrix_square(square)
+    # multiply the operators of the length bits into the identity
+    operator = [1 << n for n in range(32)]
+    while length:
+        if length & 1:
+            operator = [gf2_matrix_times(square, column)
+                        for column in operator]
+        length >>= 1
+        if length:
+            square = gf2_matrix_square(square)
+
+    return tuple(operator)
+
+
+def crc32_combine(crc1: int, crc2: int, length2: int) -> int:
+    """Combine the CRC32 of two consecutive pieces of data into the CRC32
+    of the whole data (as zlib crc32_combine() does), so pieces which
+    were checksummed separately do not need to be read again.
+
+    Args:
+        crc1 (int): The CRC32 of the first piece.
+        crc2 (int): The CRC32 of the second piece.
+        length2 (int): The length of the second piece.
+
+    Returns:
+        int: The CRC32 of the first piece followed by the second one.
+    """
+    if length2 == 0:
+        return crc1
+
+    return gf2_matrix_times(crc32_zeros_operator(length2), crc1) ^ crc2
+
+
+class ArchiveHeader:
+    """ArchiveHeader represents the fixed binary header at the start
+    of every archive.
+
+    Layout:
+        magic (4 bytes) | format version (1 byte) | varint feature flags
+        | codec id (1 byte) | codec parameters length (1 byte)
+        | codec parameters
+
+    The flags below 0x80 take a single byte, as in archives written
+    before the flags became a varint - older readers see the varint
+    continuation bit of newer flags as an unknown flag and reject them.
+
+    Attributes:
+        codec_id (int): The id of the compression algorithm.
+        codec_parameters (bytes): The parameters of the compression
+        algorithm (see DataCompression.get_metadata()).
+        flags (ArchiveFlags): The feature flags of the archive.
+        version (int): The format version of the archive.
+        flags_size (int): The minimum number of bytes of the flags varint
+        (a parsed header keeps the size it was written with, so it is
+        written again in place).
+
+    Methods:
+        to_bytes() -> bytes: Serialize the header.
+        from_bytes() -> Tuple[ArchiveHeader, int]: Parse a header.
+    """
+
+    def __init__(
+        self,
+        codec_id: int,
+        codec_parameters: bytes = b"",
+        flags: ArchiveFlags = ArchiveFlags.NONE,
+        version: int = FORMAT_VERSION,
+        flags_size: int = 1,
+    ) -> None:
+        """Initialize the ArchiveHeader.
+
+        Args:
+            codec_id (int): The id of the compression algorithm.
+            codec_parameters (bytes, optional): The parameters of the
+            compression algorithm. Defaults to b''.
+            flags (ArchiveFlags, optional): The feature flags.
+            Defaults to ArchiveFlags.NONE.
+            version (int, optional): The format version.
+            Defaults to FORMAT_VERSION.
+            flags_size (int, optional): The minimum number of bytes of
+            the flags varint. Defaults to 1.
+        """
+        self.codec_id = codec_id
+        self.codec_parameters = codec_parameters
+        self.flags = flags
+        self.version = version
+        self.flags_size = flags_size
+
+    def to_bytes(self) -> bytes:
+        """Serialize the header.
+
+        Returns:
+            bytes: The binary header.
+        """
+        header = bytearray(ARCHIVE_MAGIC)
+        header.append(self.version)
+        header.extend(encode_varint(int(self.flags), size=self.flags_size))
+        header.append(self.codec_id)
+        header.append(len(self.codec_parameters))
+        header.extend(self.codec_parameters)
+
+        return bytes(header)
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, index: int = 0
+    ) -> Tuple["ArchiveHeader", int]:
+        """Parse a header from archive data.
+
+        Args:
+            data (bytes): The archive data.
+            index (int, optional): The index of the header in the data.
+            Defaults to 0.
+
+        Returns:
+            Tuple[ArchiveHeader, int]: The header and the index of the
+            first byte after it.
+
+        Raises:
+            InvalidArchiveFormat: If the data does not start with a valid
+            header (for example archives of older versions without magic
+            bytes).
+            UnsupportedArchiveVersion: If the archive was written by a
+            newer format version or uses unknown feature flags.
+        """
+        magic_end = index + len(ARCHIVE_MAGIC)
+        if data[index:magic_end] != ARCHIVE_MAGIC:
+            raise InvalidArchiveFormat(
+                "Missing archive magic bytes - not a valid archive "
+                "(archives of older versions must be compressed again)."
+            )
+        if len(data) < magic_end + 4:
+            raise InvalidArchiveFormat("Truncated archive header.")
+
+        version = data[magic_end]
+        if version > FORMAT_VERSION:
+            raise UnsupportedArchiveVersion(
+                f"Archive format version {version} is newer than the "
+                f"supported version {FORMAT_VERSION}."
+            )
+        flags, index = decode_varint(data=data, index=magic_end + 1)
+        if len(data) < index + 2:
+            raise InvalidArchiveFormat("Truncated archive header.")
+        codec_id, parameters_len = data[index:index + 2]
+        if flags & ~int(KNOWN_ARCHIVE_FLAGS):
+            raise UnsupportedArchiveVersion(
+                f"Archive uses unknown feature flags {flags:#04x}."
+            )
+
+        next_index = index + 2 + parameters_len
+        codec_parameters = bytes(data[index + 2:next_index])
+        header = cls(
+            codec_id=codec_id,
+            codec_parameters=codec_parameters,
+            flags=ArchiveFlags(flags),
+            version=version,
+            flags_size=index - magic_end - 1,
+        )
+
+        return header, next_index
+
+
+class IndexEntry:
+    """IndexEntry describes a single archive entry inside the central
+    directory.
+
+    Attributes:
+        path (str): The path of the entry.
+        offset (int): The offset of the entry inside the archive.
+        compressed_size (int): The number of archive bytes the entry
+        occupies (flags, framing, path and data).
+        uncompressed_size (int): The size of the original file data.
+        checksum (int): CRC32 of the original file data.
+        codec_id (int): The id of the compression algorithm of the entry.
+        codec_parameters (bytes): The parameters of the compression
+        algorithm of the entry.
+        flags (EntryFlags): The entry flags.
+        record_checksum (int): CRC32 of the entry record as it is stored in
+        the archive (None when it is not known).
+
+    Methods:
+        to_bytes() -> bytes: Serialize the index entry.
+        from_bytes() -> Tuple[IndexEntry, int]: Parse an index entry.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        offset: int,
+        compressed_size: int,
+        uncompressed_size: int,
+        checksum: int,
+        codec_id: int,
+        codec_parameters: bytes = b"",
+        flags: EntryFlags = EntryFlags.NONE,
+        record_checksum: Optional[int] = None,
+    ) -> None:
+        """Initialize the IndexEntry.
+
+        Args:
+            path (str): The path of the entry.
+            offset (int): The offset of the entry inside the archive.
+            compressed_size (int): The number of archive bytes the entry
+            occupies.
+            uncompressed_size (int): The size of the original file data.
+            checksum (int): CRC32 of the original file data.
+            codec_id (int): The id of the compression algorithm.
+            codec_parameters (bytes, optional): The parameters of the
+            compression algorithm. Defaults to b''.
+            flags (EntryFlags, optional): The entry flags.
+            Defaults to EntryFlags.NONE.
+            record_checksum (int, optional): CRC32 of the entry record.
+            Defaults to None.
+        """
+        self.path = path
+        self.offset = offset
+        self.compressed_size = compressed_size
+        self.uncompressed_size = uncompressed_size
+        self.checksum = checksum
+        self.codec_id = codec_id
+        self.codec_parameters = codec_parameters
+        self.flags = flags
+        self.record_checksum = record_checksum
+
+    def to_bytes(
+        self, record_checksum: bool = False, with_path: bool = True
+    ) -> bytes:
+        """Serialize the index entry.
+
+        Layout:
+            flags (1 byte) | codec id (1 byte) | varint parameters length
+            | parameters | varint path length | path (both optional)
+            | varint offset | varint compressed size
+            | varint uncompressed size | checksum (4 bytes)
+            | record checksum (4 bytes, optional)
+
+        Args:
+            record_checksum (bool, optional): Whether the record checksum
+            is written. Defaults to False.
+            with_path (bool, optional): Whether the path is written (it is
+            not when the paths are stored in a path table).
+            Defaults to True.
+
+        Returns:
+            bytes: The binary index entry.
+        """
+        entry = bytearray([int(self.flags), self.codec_id])
+        entry.extend(encode_varint(len(self.codec_parameters)))
+        entry.extend(self.codec_parameters)
+        if with_path:
+            path = self.path.encode()
+            entry.extend(encode_varint(len(path)))
+            entry.extend(path)
+        entry.extend(encode_varint(self.offset))
+        entry.extend(encode_varint(self.compressed_size))
+        entry.extend(encode_varint(self.uncompressed_size))
+        entry.extend(self.checksum.to_bytes(4, byteorder="big"))
+        if record_checksum:
+            entry.extend((self.record_checksum or 0).to_bytes(
+                4, byteorder="big"
+            ))
+
+        return bytes(entry)
+
+    @classmethod
+    def from_bytes(
+        cls, data: Union[bytes, memoryview], index: int = 0,
+        record_checksum: bool = False, path: Optional[str] = None
+    ) -> Tuple["IndexEntry", int]:
+        """Parse an index entry.
+
+        Args:
+            data (bytes | memoryview): The central directory data.
+            index (int, optional): The index of the entry in the data.
+            Defaults to 0.
+            record_checksum (bool, optional): Whether the entry holds a
+            record checksum. Defaults to False.
+            path (str, optional): The path of the entry, taken from a path
+            table. Defaults to None (the entry holds its path).
+
+        Returns:
+            Tuple[IndexEntry, int]: The index entry and the index of the
+            first byte after it.
+        """
+        flags = EntryFlags(data[index])
+        codec_id = data[index + 1]
+        parameters_len, index = decode_varint(data=data, index=index + 2)
+        codec_parameters = bytes(data[index:index + parameters_len])
+        index += parameters_len
+        if path is None:
+            path_len, index = decode_varint(data=data, index=index)
+            path = bytes(data[index:index + path_len]).decode()
+            index += path_len
+        offset, index = decode_varint(data=data, index=index)
+        compressed_size, index = decode_varint(data=data, index=index)
+        uncompressed_size, index = decode_varint(data=data, index=index)
+        checksum = int.from_bytes(data[index:index + 4], byteorder="big")
+        index += 4
+        entry_record_checksum = None
+        if record_checksum:
+            entry_record_checksum = int.from_bytes(
+                data[index:index + 4], byteorder="big"
+            )
+            index += 4
+        entry = cls(
+            path=path,
+            offset=offset,
+            compressed_size=compressed_size,
+            uncompressed_size=uncompressed_size,
+            checksum=checksum,
+            codec_id=codec_id,
+            codec_parameters=codec_parameters,
+            flags=flags,
+            record_checksum=entry_record_checksum,
+        )
+
+        return entry, index
+
+
+class PathTable:
+    """PathTable holds the paths of the entries of an archive together,
+    front coded - every path is stored as the length of the prefix it
+    shares with the previous path and the rest of it, so the common
+    directories of the paths are stored once.
+
+    Attributes:
+        paths (list): The paths, in archive order.
+
+    Methods:
+        to_bytes() -> bytes: Serialize the front coded path table.
+        from_bytes() -> PathTable: Parse a front coded path table.
+    """
+
+    def __init__(self, paths: Optional[List[str]] = None) -> None:
+        """Initialize the PathTable.
+
+        Args:
+            paths (list, optional): The paths. Defaults to [].
+        """
+        self.paths: List[str] = paths if paths else []
+
+    def to_bytes(self) -> bytes:
+        """Serialize the path table.
+
+        Layout (per path):
+            varint shared prefix length | varint suffix length | suffix
+
+        Returns:
+            bytes: The binary path table.
+        """
+        table = bytearray()
+        previous = b""
+        for path in self.paths:
+            encoded_path = path.encode()
+            shared = 0
+            max_shared = min(len(previous), len(encoded_path))
+            while shared < max_shared \
+                    and previous[shared] == encoded_path[shared]:
+                shared += 1
+            table.extend(encode_varint(shared))
+            table.extend(encode_varint(len(encoded_path) - shared))
+            table.extend(encoded_path[shared:])
+            previous = encoded_path
+
+        return bytes(table)
+
+    @classmethod
+    def from_bytes(
+        cls, data: Union[bytes, memoryview], count: int
+    ) -> "PathTable":
+        """Parse a path table.
+
+        Args:
+            data (bytes | memoryview): The path table data.
+            count (int): The number of paths in the table.
+
+        Returns:
+            PathTable: The path table.
+
+        Raises:
+            InvalidArchiveFormat: If the path table is truncated or a path
+            shares more than the previous path.
+        """
+        paths = []
+        previous = b""
+        index = 0
+        for _ in range(count):
+            shared, index = decode_varint(data=data, index=index)
+            suffix_len, index = decode_varint(data=data, index=index)
+            if shared > len(previous) or index + suffix_len > len(data):
+                raise InvalidArchiveFormat("Invalid path table.")
+            previous = previous[:shared] + bytes(
+                data[index:index + suffix_len]
+            )
+            index += suffix_len
+            paths.append(previous.decode())
+
+        return cls(paths=paths)
+
+
+class CentralDirectory:
+    """CentralDirectory is the index of all the entries of an archive.
+
+    It is written at the end of the archive, so listing and locating
+    entries only needs to read the index instead of decompressing the
+    whole archive.
+
+    Attributes:
+        entries (list): The index entries, in archive order.
+        manifest (Manifest): The manifest of the archived files, written
+        after the entries (None for archives without a manifest).
+        record_checksums (bool): Whether the entries hold the CRC32 of
+        their records.
+        removed_entries (list): The tombstones of the removed entries,
+        whose records are still in the archive.
+        replaced_indexes (list): The tombstones of the central directories
+        (and footers) replaced by updates, which are still in the archive.
+        path_codec (DataCompression): The compression algorithm the path
+        table of the entries is compressed with (None when every entry
+        holds its path).
+
+    Methods:
+        to_bytes() -> bytes: Serialize the central directory.
+        from_bytes() -> CentralDirectory: Parse a central directory.
+        find_entries() -> List[IndexEntry]: Find entries by paths.
+        match_entries() -> List[IndexEntry]: Find entries by glob patterns.
+        remove_entries() -> None: Turn entries into tombstones.
+        replace_index() -> None: Add the tombstone of a replaced central
+        directory.
+    """
+
+    def __init__(
+        self,
+        entries: Optional[List[IndexEntry]] = None,
+        manifest: Optional["Manifest"] = None,
+        record_checksums: bool = False,
+        removed_entries: Optional[List[IndexEntry]] = None,
+        path_codec: Optional["DataCompression"] = None,
+        replaced_indexes: Optional[List[IndexEntry]] = None,
+    ) -> None:
+        """Initialize the CentralDirectory.
+
+        Args:
+            entries (list, optional): The index entries. Defaults to [].
+            manifest (Manifest, optional): The manifest of the archived
+            files. Defaults to None.
+            record_checksums (bool, optional): Whether the entries hold
+            the CRC32 of their records. Defaults to False.
+            removed_entries (list, optional): The tombstones of the removed
+            entries. Defaults to [].
+            path_codec (DataCompression, optional): The compression
+            algorithm of the path table. Defaults to None (no path table).
+            replaced_indexes (list, optional): The tombstones of the
+            replaced central directories. Defaults to [].
+        """
+        self.entries: List[IndexEntry] = entries if entries else []
+        self.manifest = manifest
+        self.record_checksums = record_checksums
+        self.removed_entries: List[IndexEntry] = (
+            removed_entries if removed_entries else []
+        )
+        self.path_codec = path_codec
+        self.replaced_indexes: List[IndexEntry] = (
+            replaced_indexes if replaced_indexes else []
+        )
+
+    def to_bytes(self) -> bytes:
+        """Serialize the central directory - varint entries count followed
+        by the compressed path table (varint length prefixed, if the
+        directory has a path table), the entries and the tombstones of
+        the removed entries and of the replaced central directories (and
+        the manifest, if any).
+
+        Returns:
+            bytes: The binary central directory.
+        """
+        all_entries = (
+            self.entries + self.removed_entries + self.replaced_indexes
+        )
+        directory = bytearray(encode_varint(len(all_entries)))
+        if self.path_codec is not None:
+            path_table = PathTable(
+                paths=[entry.path for entry in all_entries]
+            ).to_bytes()
+            compressed_table = self.path_codec.compress_data(
+                data=path_table
+            ) if path_table else b""
+            directory.extend(encode_varint(len(compressed_table)))
+            directory.extend(compressed_table)
+        for entry in all_entries:
+            directory.extend(entry.to_bytes(
+                record_checksum=self.record_checksums,
+                with_path=self.path_codec is None,
+            ))
+        if self.manifest is not None:
+            directory.extend(self.manifest.to_bytes())
+
+        return bytes(directory)
+
+    @classmethod
+    def from_bytes(
+        cls, data: Union[bytes, memoryview], record_checksums: bool = False,
+        path_codec: Optional["DataCompression"] = None
+    ) -> "CentralDirectory":
+        """Parse a central directory.
+
+        Args:
+            data (bytes | memoryview): The central directory data.
+            record_checksums (bool, optional): Whether the entries hold
+            the CRC32 of their records. Defaults to False.
+            path_codec (DataCompression, optional): The compression
+            algorithm of the path table. Defaults to None (no path table).
+
+        Returns:
+            CentralDirectory: The central directory.
+        """
+        entries_count, index = decode_varint(data=data)
+        paths: List[Optional[str]] = [None] * entries_count
+        if path_codec is not None:
+            table_len, index = decode_varint(data=data, index=index)
+            if index + table_len > len(data):
+                raise InvalidArchiveFormat("Truncated path table.")
+            path_table = path_codec.decompress_data(
+                compressed_data=data[index:index + table_len]
+            ) if table_len else b""
+            paths = PathTable.from_bytes(
+                data=path_table, count=entries_count
+            ).paths
+            index += table_len
+        entries = []
+        removed_entries = []
+        replaced_indexes = []
+        for path in paths:
+            entry, index = IndexEntry.from_bytes(
+                data=data, index=index, record_checksum=record_checksums,
+                path=path,
+            )
+            if entry.flags & EntryFlags.INDEX:
+                replaced_indexes.append(entry)
+            elif entry.flags & EntryFlags.REMOVED:
+                removed_entries.append(entry)
+            else:
+                entries.append(entry)
+        manifest = None
+        if index < len(data):
+            manifest = Manifest.from_bytes(data=data, index=index)
+
+        return cls(
+            entries=entries,
+            manifest=manifest,
+            record_checksums=record_checksums,
+            removed_entries=removed_entries,
+            path_codec=path_codec,
+            replaced_indexes=replaced_indexes,
+        )
+
+    def find_entries(self, paths: List[str]) -> List[IndexEntry]:
+        """Find the entries whose path is one of the given paths, or inside
+        a directory given as one of them (see is_under_paths()).
+
+        Args:
+            paths (list): The paths of files and directories to look for.
+
+        Returns:
+            list: The matching index entries.
+        """
+        return [
+            entry for entry in self.entries
+            if is_under_paths(path=entry.path, paths=paths)
+        ]
+
+    def match_entries(self, patterns: List[str]) -> List[IndexEntry]:
+        """Find the entries whose path matches one of the given glob
+        patterns, or is inside a directory given as a pattern.
+
+        Args:
+            patterns (list): The glob patterns (e.g. 'conf/*.ini').
+
+        Returns:
+            list: The matching index entries, in archive order.
+        """
+        return [
+            entry for entry in self.entries
+            if match_path(path=entry.path, patterns=patterns)
+        ]
+
+    def remove_entries(self, entries: List[IndexEntry]) -> None:
+        """Move entries to the tombstones - their records stay in the
+        archive, but they are no longer part of it.
+
+        Args:
+            entries (list): The index entries to remove.
+        """
+        removed_offsets = {entry.offset for entry in entries}
+        self.entries = [
+            entry for entry in self.entries
+            if entry.offset not in removed_offsets
+        ]
+        for entry in entries:
+            entry.flags |= EntryFlags.REMOVED
+        self.removed_entries.extend(entries)
+
+    def replace_index(self, offset: int, length: int) -> None:
+        """Add the tombstone of a central directory (and its footer)
+        which this directory replaces - an update appends the new
+        directory after it, so it stays in the archive as dead space until
+        the archive is compacted.
+
+        Args:
+            offset (int): The offset of the replaced central directory.
+            length (int): The length of the replaced central directory and
+            footer.
+        """
+        self.replaced_indexes.append(IndexEntry(
+            path="",
+            offset=offset,
+            compressed_size=length,
+            uncompressed_size=0,
+            checksum=0,
+            codec_id=0,
+            flags=EntryFlags.REMOVED | EntryFlags.INDEX,
+        ))
+
+
+class ManifestEntry:
+    """ManifestEntry describes a single archived file (or empty directory)
+    inside the manifest, so later runs detect whether it changed.
+
+    Attributes:
+        path (str): The path of the file.
+        size (int): The size of the file.
+        mtime (int): The modification time of the file in nanoseconds.
+        content_hash (bytes): The digest of the file content (b'' for
+        directories).
+
+    Methods:
+        to_bytes() -> bytes: Serialize the manifest entry.
+        from_bytes() -> Tuple[ManifestEntry, int]: Parse a manifest entry.
+    """
+
+    def __init__(
+        self, path: str, size: int = 0, mtime: int = 0,
+        content_hash: bytes = b""
+    ) -> None:
+        """Initialize the ManifestEntry.
+
+        Args:
+            path (str): The path of the file.
+            size (int, optional): The size of the file. Defaults to 0.
+            mtime (int, optional): The modification time of the file in
+            nanoseconds. Defaults to 0.
+            content_hash (bytes, optional): The digest of the file content.
+            Defaults to b''.
+        """
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.content_hash = content_hash
+
+    def to_bytes(self) -> bytes:
+        """Serialize the manifest entry.
+
+        Layout:
+            varint path length | path | varint size | varint mtime
+            | varint hash length | hash
+
+        Returns:
+            bytes: The binary manifest entry.
+        """
+        path = self.path.encode()
+        entry = bytearray(encode_varint(len(path)))
+        entry.extend(path)
+        entry.extend(encode_varint(self.size))
+        entry.extend(encode_varint(self.mtime))
+        entry.extend(encode_varint(len(self.content_hash)))
+        entry.extend(self.content_hash)
+
+        return bytes(entry)
+
+    @classmethod
+    def from_bytes(
+        cls, data: Union[bytes, memoryview], index: int = 0
+    ) -> Tuple["ManifestEntry", int]:
+        """Parse a manifest entry.
+
+        Args:
+            data (bytes | memoryview): The manifest data.
+            index (int, optional): The index of the entry in the data.
+            Defaults to 0.
+
+        Returns:
+            Tuple[ManifestEntry, int]: The manifest entry and the index of
+            the first byte after it.
+        """
+        path_len, index = decode_varint(data=data, index=index)
+        path = bytes(data[index:index + path_len]).decode()
+        size, index = decode_varint(data=data, index=index + path_len)
+        mtime, index = decode_varint(data=data, index=index)
+        hash_len, index = decode_varint(data=data, index=index)
+        content_hash = bytes(data[index:index + hash_len])
+        entry = cls(
+            path=path, size=size, mtime=mtime, content_hash=content_hash
+        )
+
+        return entry, index + hash_len
+
+
+class Manifest:
+    """Manifest lists all the files of an archive at the time it was
+    written, with their sizes, modification times and content hashes.
+
+    The manifest of a delta archive also lists the files which did not
+    change since its base archive (whose data is only stored in the base
+    archive), so the files at that time are restored from the delta
+    archive and the chain of its base archives.
+
+    Attributes:
+        entries (list): The manifest entries.
+        base_path (str): The path of the base archive, relative to the
+        directory of the archive ('' for archives without a base).
+        base_digest (bytes): The digest of the manifest of the base
+        archive, so a base archive which was replaced is detected.
+
+    Methods:
+        to_bytes() -> bytes: Serialize the manifest.
+        from_bytes() -> Manifest: Parse a manifest.
+        digest() -> bytes: Get the digest of the manifest.
+    """
+
+    def __init__(
+        self,
+        entries: Optional[List[ManifestEntry]] = None,
+        base_path: str = "",
+        base_digest: bytes = b"",
+    ) -> None:
+        """Initialize the Manifest.
+
+        Args:
+            entries (list, optional): The manifest entries. Defaults to [].
+            base_path (str, optional): The relative path of the base
+            archive. Defaults to ''.
+            base_digest (bytes, optional): The digest of the manifest of the
+            base archive. Defaults to b''.
+        """
+        self.entries: List[ManifestEntry] = entries if entries else []
+        self.base_path = base_path
+        self.base_digest = base_digest
+
+    def to_bytes(self) -> bytes:
+        """Serialize the manifest.
+
+        Layout:
+            varint base path length | base path | varint base digest
+            length | base digest | varint entries count | entries
+
+        Returns:
+            bytes: The binary manifest.
+        """
+        base_path = self.base_path.encode()
+        manifest = bytearray(encode_varint(len(base_path)))
+        manifest.extend(base_path)
+        manifest.extend(encode_varint(len(self.base_digest)))
+        manifest.extend(self.base_digest)
+        manifest.extend(encode_varint(len(self.entries)))
+        for entry in self.entries:
+            manifest.extend(entry.to_bytes())
+
+        return bytes(manifest)
+
+    @classmethod
+    def from_bytes(
+        cls, data: Union[bytes, memoryview], index: int = 0
+    ) -> "Manifest":
+        """Parse a manifest.
+
+        Args:
+            data (bytes | memoryview): The manifest data.
+            index (int, optional): The index of the manifest in the data.
+            Defaults to 0.
+
+        Returns:
+            Manifest: The manifest.
+        """
+        path_len, index = decode_varint(data=data, index=index)
+        base_path = bytes(data[index:index + path_len]).decode()
+        digest_len, index = decode_varint(data=data, index=index + path_len)
+        base_digest = bytes(data[index:index + digest_len])
+        entries_count, index = decode_varint(
+            data=data, index=index + digest_len
+        )
+        entries = []
+        for _ in range(entries_count):
+            entry, index = ManifestEntry.from_bytes(data=data, index=index)
+            entries.append(entry)
+
+        return cls(
+            entries=entries, base_path=base_path, base_digest=base_digest
+        )
+
+    def digest(self) -> bytes:
+        """Get the digest of the manifest, which delta archives keep to
+        verify their base archive.
+
+        Returns:
+            bytes: The 16 bytes digest of the binary manifest.
+        """
+        return hashlib.blake2b(self.to_bytes(), digest_size=16).digest()
+
+
+class ArchiveFooter:
+    """ArchiveFooter is the fixed size record at the end of an archive
+    that locates the central directory.
+
+    Layout:
+        central directory offset (8 bytes) | central directory length
+        (8 bytes) | magic (4 bytes)
+
+    Attributes:
+        index_offset (int): The offset of the central directory.
+        index_length (int): The length of the central directory.
+
+    Methods:
+        to_bytes() -> bytes: Serialize the footer.
+        from_bytes() -> ArchiveFooter: Parse a footer.
+    """
+
+    SIZE = 20
+
+    def __init__(self, index_offset: int, index_length: int) -> None:
+        """Initialize the ArchiveFooter.
+
+        Args:
+            index_offset (int): The offset of the central directory.
+            index_length (int): The length of the central directory.
+        """
+        self.index_offset = index_offset
+        self.index_length = index_length
+
+    def to_bytes(self) -> bytes:
+        """Serialize the footer.
+
+        Returns:
+            bytes: The binary footer.
+        """
+        return (
+            self.index_offset.to_bytes(8, byteorder="big")
+            + self.index_length.to_bytes(8, byteorder="big")
+            + FOOTER_MAGIC
+        )
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, memoryview]) -> "ArchiveFooter":
+        """Parse a footer from the last bytes of an archive.
+
+        Args:
+            data (bytes | memoryview): The last ArchiveFooter.SIZE bytes
+            of the archive.
+
+        Returns:
+            ArchiveFooter: The footer.
+
+        Raises:
+            InvalidArchiveFormat: If the footer magic bytes are missing.
+        """
+        if len(data) != cls.SIZE or data[16:] != FOOTER_MAGIC:
+            raise InvalidArchiveFormat(
+                "Missing central directory footer - archive is truncated."
+            )
+
+        return cls(
+            index_offset=int.from_bytes(data[:8], byteorder="big"),
+            index_length=int.from_bytes(data[8:16], byteorder="big"),
+        )
@@ -0,0 +1,45 @@
+import bz2
+from typing import Any
+from stdlib_compression import StdlibCompression
+
+
+class Bz2Compression(StdlibCompression):
+    """Bz2Compression is a class that wraps the bzip2 compression
+    of the python standard library.
+
+    Args:
+        StdlibCompression (class): The base class for standard library
+        compression algorithms.
+
+    Methods:
+        compressobj() -> Any: Creates a new bz2 compressor object.
+        decompressobj() -> Any: Creates a new bz2 decompressor object.
+    """
+
+    codec_id = 6
+    DEFAULT_LEVEL = 9
+    MIN_LEVEL = 1
+
+    def __init__(self, level: int = DEFAULT_LEVEL) -> None:
+        """Initialize the Bz2Compression class.
+
+        Args:
+            level (int): The compression level (1-9). Default: 9
+        """
+        super().__init__(level=level)
+
+    def compressobj(self) -> Any:
+        """Creates a new bz2 compressor object.
+
+        Returns:
+            Any: bz2 compressor object.
+        """
+        return bz2.BZ2Compressor(self._level)
+
+    def decompressobj(self) -> Any:
+        """Creates a new bz2 decompressor object.
+
+        Returns:
+            Any: bz2 decompressor object.
+        """
+        return bz2.BZ2Decompressor()
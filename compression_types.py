@@ -1,7 +1,12 @@
 from enum import Enum
+from typing import Dict, Type
+from data_compression import DataCompression
 from rle_compression import RleCompression
 from huffman_compression import HuffmanCompression
 from lempel_ziv_compression import LempelZivCompression
+from zlib_compression import ZlibCompression
+from lzma_compression import LzmaCompression
+from bz2_compression import Bz2Compression
 
 
 class CompressionTypes(Enum):
@@ -14,9 +19,21 @@ class CompressionTypes(Enum):
         RLE (class): Represents the Run-Length Encoding compression.
         HUFFMAN (class): Represents the Huffman compression.
         LZ (class): Represents the Lempel-Ziv compression.
+        ZLIB (class): Represents the standard library zlib compression.
+        LZMA (class): Represents the standard library lzma compression.
+        BZ2 (class): Represents the standard library bz2 compression.
 
     """
 
     RLE = RleCompression
     HUFFMAN = HuffmanCompression
     LZ = LempelZivCompression
+    ZLIB = ZlibCompression
+    LZMA = LzmaCompression
+    BZ2 = Bz2Compression
+
+
+# registry of the compression algorithms by their archive header codec id
+CODECS_REGISTRY: Dict[int, Type[DataCompression]] = {
+    member.value.codec_id: member.value for member in CompressionTypes
+}
@@ -0,0 +1,138 @@
+import hashlib
+from typing import BinaryIO, Iterator, Tuple
+
+DEFAULT_CONTENT_CHUNK_SIZE = 1 << 16
+# the rolling (gear) hash of the last 64 bytes is a 64 bits integer
+FINGERPRINT_MASK = (1 << 64) - 1
+# a random and stable value for every byte value
+GEAR_TABLE: Tuple[int, ...] = tuple(
+    int.from_bytes(
+        hashlib.blake2b(bytes([value]), digest_size=8).digest(),
+        byteorder="big",
+    )
+    for value in range(256)
+)
+
+
+def chunk_digest(chunk: bytes) -> bytes:
+    """Hash the content of a chunk (BLAKE2b), so identical chunks are
+    found by their digest.
+
+    Args:
+        chunk (bytes): The chunk data.
+
+    Returns:
+        bytes: The 16 bytes digest of the chunk.
+    """
+    return hashlib.blake2b(chunk, digest_size=16).digest()
+
+
+class ContentChunker:
+    """ContentChunker splits data into content defined chunks (FastCDC
+    style) - a chunk ends where a rolling hash of the last bytes matches a
+    mask, so inserting or removing bytes only changes the chunks around
+    the change, and the rest of the chunks of near duplicate files are
+    identical.
+
+    The chunks sizes are normalized: a stricter mask is used before the
+    average size and a looser mask after it, so most of the chunks are
+    close to the average size.
+
+    Attributes:
+        _min_size (int): The minimum chunk size (no boundary is looked for
+        before it).
+        _average_size (int): The average chunk size.
+        _max_size (int): The maximum chunk size.
+        _strict_mask (int): The mask of the rolling hash before the
+        average size.
+        _loose_mask (int): The mask of the rolling hash after the average
+        size.
+
+    Methods:
+        find_boundary(data, start, end) -> int: Find the end of the chunk
+        which starts at an index.
+        iter_chunks(file) -> Iterator[bytes]: Read a file chunk by chunk.
+    """
+
+    def __init__(self, average_size: int = DEFAULT_CONTENT_CHUNK_SIZE) -> None:
+        """Initialize the ContentChunker.
+
+        Args:
+            average_size (int, optional): The average chunk size (a power
+            of 2). Defaults to DEFAULT_CONTENT_CHUNK_SIZE (64 KB).
+        """
+        self._average_size = average_size
+        self._min_size = average_size // 4
+        self._max_size = average_size * 4
+        bits = max(average_size.bit_length() - 1, 2)
+        # the masks use the high bits, which depend on the last 64 bytes
+        self._strict_mask = ((1 << (bits + 2)) - 1) << (64 - bits - 2)
+        self._loose_mask = ((1 << (bits - 2)) - 1) << (64 - bits + 2)
+
+    def find_boundary(self, data: bytearray, start: int, end: int) -> int:
+        """Find the end of the chunk which starts at an index.
+
+        Args:
+            data (bytearray): The data.
+            start (int): The index of the chunk.
+            end (int): The end of the data to look in.
+
+        Returns:
+            int: The index after the chunk.
+        """
+        if end - start <= self._min_size:
+            return end
+
+        gear_table = GEAR_TABLE
+        fingerprint = 0
+        index = start + self._min_size
+        normal_end = min(start + self._average_size, end)
+        mask = self._strict_mask
+        while index < normal_end:
+            fingerprint = (
+                (fingerprint << 1) + gear_table[data[index]]
+            ) & FINGERPRINT_MASK
+            index += 1
+            if not fingerprint & mask:
+                return index
+
+        max_end = min(start + self._max_size, end)
+        mask = self._loose_mask
+        while index < max_end:
+            fingerprint = (
+                (fingerprint << 1) + gear_table[data[index]]
+            ) & FINGERPRINT_MASK
+            index += 1
+            if not fingerprint & mask:
+                return index
+
+        return max_end
+
+    def iter_chunks(self, file: BinaryIO) -> Iterator[bytes]:
+        """Read a file chunk by chunk, so the memory in use is bounded by
+        the maximum chunk size regardless of the file size.
+
+        Args:
+            file (BinaryIO): The file, opened for binary reading.
+
+        Yields:
+            bytes: The next chunk of the file.
+        """
+        buffer = bytearray()
+        end_of_file = False
+        while True:
+            # a whole chunk of maximum size is buffered before looking for
+            # its boundary (only the last chunk may be shorter)
+            if not end_of_file and len(buffer) < self._max_size:
+                block = file.read(self._max_size)
+                end_of_file = not block
+                buffer.extend(block)
+                continue
+            if not buffer:
+                return
+
+            boundary = self.find_boundary(
+                data=buffer, start=0, end=len(buffer)
+            )
+            yield bytes(buffer[:boundary])
+            del buffer[:boundary]
@@ -1,6 +1,11 @@
+import re
 from abc import ABC, abstractmethod
-from typing import List
-from exceptions import InvalidDataForCompressionAlgorithem
+from typing import List, Set, Type, TypeVar
+from stream_compression import (
+    BlockCompressor, BlockDecompressor, StreamCompressor, StreamDecompressor
+)
+
+T = TypeVar("T", bound="DataCompression")
 
 class DataCompression(ABC):
     """DataCompression is an interface for data compression algorithms.
@@ -9,24 +14,44 @@ class DataCompression(ABC):
         ABC: A metaclass for defining abstract base classes.
 
     Attributes:
+        codec_id (int): The unique id of the compression algorithm inside
+        the archive header.
+        stream_compatible (bool): Whether the output of compress_data()
+        can be decompressed incrementally by decompressor().
         _max_bytes_range (int): The maximum range of bytes supported by
         the compression algorithm.
         _bigger_than_max_bytes_sign (bytes): A special sign used to indicate
         data exceeding the maximum byte range.
+        _escape_suffix (bytes): The byte appended after every escaped
+        occurrence of a special sign's first byte.
+        _signs_positions (set): Positions of the real special signs inside
+        the unescaped data that is being compressed or decompressed.
 
     Methods:
         compress_data(data: bytes): Abstract method for compressing data.
         decompress_data(compressed_data: bytes): Abstract method for decompressing data.
         get_metadata(): Abstract method for retrieving metadata related to the compression.
+        from_metadata(metadata: bytes): Create the compression algorithm from its metadata.
+        compressor(): Create an incremental compressor (block mode by default).
+        decompressor(): Create an incremental decompressor (block mode by default).
         get_special_signs(): special signs for the compression algorithm.
-        valid_append_for_compression(compress_data: bytearray, extra_append: int): check if extra append for compression is valid.
-        valid_extend_for_compression(compress_data: bytearray, extra_append: int): check if extra extend for compression is valid.
+        append_sign(compress_data: bytearray, sign: bytes): append a real special sign to the compressed data.
+        is_sign(data: bytes, i: int, sign: bytes): check if a real special sign starts at the given index.
+        escape_signs(compress_data: bytearray): escape all special signs bytes that are not real signs.
+        unescape_signs(compressed_data: bytes): remove the escaping and locate the real special signs.
+        get_signs_positions(): get the positions of the real special signs.
+        set_signs_positions(positions: Set[int]): set the positions of the real special signs.
     """
 
+    codec_id = 0
+    stream_compatible = False
+
     def __init__(self) -> None:
         """Initialize the DataCompression interface."""
         self._max_bytes_range = 256
         self._bigger_than_max_bytes_sign = b"*^&"
+        self._escape_suffix = b"\x00"
+        self._signs_positions: Set[int] = set()
 
     @abstractmethod
     def compress_data(self, data: bytes) -> bytes:
@@ -54,13 +79,43 @@ class DataCompression(ABC):
 
     @abstractmethod
     def get_metadata(self) -> bytes:
-        """Retrieves metadata related to the compression.
+        """Retrieves metadata related to the compression - the parameters
+        which are needed to create the same compression algorithm again.
 
         Returns:
             bytes: The metadata information.
         """
         pass
 
+    @classmethod
+    def from_metadata(cls: Type[T], metadata: bytes) -> T:
+        """Create the compression algorithm from its metadata.
+
+        Args:
+            metadata (bytes): The metadata returned by get_metadata().
+
+        Returns:
+            DataCompression: The compression algorithm instance.
+        """
+        return cls()
+
+    def compressor(self) -> StreamCompressor:
+        """Create an incremental compressor. By default the stream is
+        compressed in independent blocks with compress_data().
+
+        Returns:
+            StreamCompressor: An object with feed(chunk) and flush().
+        """
+        return BlockCompressor(compression_algorithem=self)
+
+    def decompressor(self) -> StreamDecompressor:
+        """Create an incremental decompressor matching compressor().
+
+        Returns:
+            StreamDecompressor: An object with feed(chunk) and flush().
+        """
+        return BlockDecompressor(compression_algorithem=self)
+
     def get_special_signs(self) -> List[bytes]:
         """Get the special signs for the compression algorithm.
 
@@ -72,55 +127,118 @@ class DataCompression(ABC):
         special_signs.append(self._bigger_than_max_bytes_sign)
 
         return special_signs
-    
-    def valid_append_for_compression(
-            self, compress_data: bytearray, extra_append: int) -> bool:
+
+    def append_sign(self, compress_data: bytearray, sign: bytes) -> None:
+        """Append a real special sign to the compressed data and remember
+        its position, so escape_signs() keeps it as is.
+
+        Args:
+            compress_data (bytearray): The compressed data.
+            sign (bytes): The special sign to append.
         """
-        Checks if appending extra data is valid for compression.
+        self._signs_positions.add(len(compress_data))
+        compress_data.extend(sign)
 
-        Parameters:
-        - compress_data (bytearray): The data to be compressed.
-        - extra_append (int): The extra data to append.
+    def is_sign(self, data: bytes, i: int, sign: bytes) -> bool:
+        """Check if a real special sign starts at the given index of data
+        that was unescaped by unescape_signs().
+
+        Args:
+            data (bytes): The unescaped compressed data.
+            i (int): The index to check.
+            sign (bytes): The special sign to look for.
 
         Returns:
-        bool: True if the append operation is valid, False otherwise.
+            bool: True if the sign starts at index i, False otherwise.
+        """
+        return i in self._signs_positions and data[i : i + len(sign)] == sign
+
+    def get_signs_positions(self) -> Set[int]:
+        """Get the positions of the real special signs, found by the last
+        unescape_signs() call or added by append_sign().
 
-        Raises:
-        InvalidDataForCompressionAlgorithem: If the data is invalid 
-        for compression.
+        Returns:
+            set: The positions of the real special signs.
         """
-        special_signs = self.get_special_signs()
-        for sign in special_signs:
-            if len(compress_data) > 1 and compress_data[-2] == sign[0] \
-                and compress_data[-1] == sign[1] and extra_append == sign[2]:
-                raise InvalidDataForCompressionAlgorithem('Error')
-            
-        return True
-    
-    def valid_extend_for_compression(
-                self, compress_data: bytearray, extra_extend: bytes) -> bool:
-            """
-            Checks if extending data is valid for compression.
-
-            Parameters:
-            - compress_data (bytearray): The data to be compressed.
-            - extra_extend (bytes): The extra data to extend with.
-
-            Returns:
-            bool: True if the extend operation is valid, False otherwise.
-
-            Raises:
-            InvalidDataForCompressionAlgorithem: If the data is invalid 
-            for compression.
-            """
-            
-            special_signs = self.get_special_signs()
-            for sign in special_signs:
-                if (sign in extra_extend) or (len(compress_data) > 1 and \
-                    compress_data[-2] == sign[0] and \
-                        compress_data[-1] == sign[1] and \
-                            extra_extend[0] == sign[2]):
-                    raise InvalidDataForCompressionAlgorithem('Error')
-                
-            return True
+        return self._signs_positions
+
+    def set_signs_positions(self, positions: Set[int]) -> None:
+        """Set the positions of the real special signs, used by
+        incremental decompressors that unescape data in parts.
+
+        Args:
+            positions (set): The positions of the real special signs.
+        """
+        self._signs_positions = positions
+
+    def escape_signs(self, compress_data: bytearray) -> bytes:
+        """Escape the compressed data in a single pass.
+
+        Every first byte of a special sign which is not part of a real
+        sign (added by append_sign()) is followed by the escape suffix,
+        so data bytes can never be confused with a special sign.
+        The escaping runs on whole segments between real signs with
+        bytes.replace, instead of checking every emitted byte.
 
+        Args:
+            compress_data (bytearray): The compressed data.
+
+        Returns:
+            bytes: The escaped compressed data.
+        """
+        escape_bytes = {sign[:1] for sign in self.get_special_signs()}
+        segments = []
+        start = 0
+        for position in sorted(self._signs_positions) + [len(compress_data)]:
+            segment = bytes(compress_data[start:position])
+            for escape_byte in escape_bytes:
+                segment = segment.replace(
+                    escape_byte, escape_byte + self._escape_suffix
+                )
+            segments.append(segment)
+
+            for sign in self.get_special_signs():
+                if compress_data[position : position + len(sign)] == sign:
+                    segments.append(sign)
+                    start = position + len(sign)
+                    break
+
+        self._signs_positions = set()
+        return b"".join(segments)
+
+    def unescape_signs(self, compressed_data: bytes) -> bytes:
+        """Remove the escaping added by escape_signs() in a single pass and
+        save the positions of the real special signs (see is_sign()).
+
+        Args:
+            compressed_data (bytes): The escaped compressed data.
+
+        Returns:
+            bytes: The unescaped compressed data.
+        """
+        self._signs_positions = set()
+        compressed_data = bytes(compressed_data)
+        special_signs = self.get_special_signs()
+        escape_bytes = {sign[:1] for sign in special_signs}
+        if not any(escape_byte in compressed_data
+                   for escape_byte in escape_bytes):
+            return compressed_data
+
+        tokens = [re.escape(sign) for sign in special_signs]
+        tokens += [
+            re.escape(escape_byte + self._escape_suffix)
+            for escape_byte in escape_bytes
+        ]
+        data = bytearray()
+        start = 0
+        for match in re.finditer(b"|".join(tokens), compressed_data):
+            data.extend(compressed_data[start : match.start()])
+            if match.group() in special_signs:
+                self._signs_positions.add(len(data))
+                data.extend(match.group())
+            else:
+                data.extend(match.group()[:1])
+            start = match.end()
+        data.extend(compressed_data[start:])
+
+        return bytes(data)
@@ -41,6 +41,8 @@ class DisplayActionInfo:
             Display compression information.
         show_remove_from_archive_info() -> None:
             Display information about removing files from the archive.
+        show_compact_archive_info() -> None:
+            Display the sizes of the compacted archives.
         show() -> None:
             Show information related to the action.
         alert() -> bool:
@@ -198,6 +200,22 @@ class DisplayActionInfo:
             print(print_colored(text=msg, color=self._clrs.green))
             return True
 
+    def show_compact_archive_info(self, input_paths_size: int) -> bool:
+        """Display the sizes of the compacted archives.
+
+        Args:
+            input_paths_size (int): Total size of the compacted archives.
+
+        Returns:
+            bool: True, the archives which could not be compacted were
+            already alerted.
+        """
+        clr_size = print_colored(
+            text=str(input_paths_size), color=self._clrs.yellow
+        )
+        print(f"Compacted Size: {clr_size} bytes")
+        return True
+
     def show_update_archive_info(self, 
         result: Union[int, str, bool, Dict[str,str], None]) -> bool:
         """Display information about updating files in archive.
@@ -254,6 +272,11 @@ class DisplayActionInfo:
         ):
             success = self.show_update_archive_info(result=result)
 
+        elif self._action_type == ActionTypes.COMPACT_ARCHIVE.value:
+            success = self.show_compact_archive_info(
+                input_paths_size=input_paths_size
+            )
+
         if success:
             self.display_elapsed_time()
 
@@ -27,3 +27,35 @@ class MissingInputPath(Exception):
     """
 
     pass
+
+
+class InvalidArchiveFormat(Exception):
+    """Exception raised when an archive does not have a valid format.
+
+    This exception is raised when the archive header or structure
+    can not be parsed, for example when the magic bytes are missing.
+    """
+
+    pass
+
+
+class UnsupportedArchiveVersion(Exception):
+    """Exception raised when an archive was written by an unsupported
+    format version.
+
+    This exception is raised when the archive format version is newer
+    than the reader, or when it uses unknown feature flags.
+    """
+
+    pass
+
+
+class ChecksumMismatch(Exception):
+    """Exception raised when archived data does not match its checksum.
+
+    This exception is raised when the CRC32 of decompressed file data,
+    or of a stored entry record, differs from the one in the central
+    directory - data which was corrupted even if it still decodes.
+    """
+
+    pass
@@ -1,10 +1,36 @@
+import io
 import os
+import mmap
+import shutil
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager, redirect_stdout
+from functools import partial
+from func_timeout import FunctionTimedOut, func_timeout
 from data_compression import DataCompression
-from compression_types import CompressionTypes
-from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+from compression_types import CODECS_REGISTRY
+from archive_format import (
+    ARCHIVE_MAGIC, DEFAULT_CHUNK_SIZE, ArchiveFlags,
+    ArchiveFooter, ArchiveHeader, CentralDirectory, EntryFlags, IndexEntry,
+    Manifest, ManifestEntry, crc32_combine, decode_varint, encode_varint,
+    is_under_paths, match_path
+)
+from content_chunker import ContentChunker, chunk_digest
+from parallel_workers import (
+    OrderedTaskQueue, SharedBuffers, compress_block_task, compress_chunk_task,
+    compress_file_task, hand_over, hash_file_task, init_worker
+)
+from typing import (
+    Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+)
 from exceptions import *
 
 
+# The size of the buffered copies of entry records (when they cannot be
+# copied in the kernel)
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+
 class FilesystemHandler:
     """Filesystem class for handling file compression and
     decompression operations.
@@ -21,7 +47,91 @@ class FilesystemHandler:
         data.
         _folder_suffix (str): The suffix used for indicating directories.
         _bytes_length (int): The number of bytes used for storing length
-        metadata.
+        metadata (fixed framing only).
+        _varint_framing (bool): Whether entries are framed with a flags
+        byte and varint lengths.
+        _central_directory (CentralDirectory): The index of the entries
+        written to the output file, written at its end on close (None when
+        the output file has no central directory).
+        _chunk_size (int): Files bigger than the chunk size are read and
+        compressed chunk by chunk.
+        _chunked_entries (bool): Whether chunked entries may be written.
+        _stream_buffer_size (int): The size of the compressed data slices
+        fed to the codec decompressor when files are decompressed.
+        _workers (int): The number of worker processes files are
+        compressed and extracted in (1 handles the files in the current
+        process).
+        _entries_queue (OrderedTaskQueue): The entries waiting to be
+        written while compressing with worker processes (None otherwise).
+        _chunked_entry (IndexEntry): The chunked entry being written (None
+        when no chunked entry is being written).
+        _shared_buffers (SharedBuffers): The shared memory segments worker
+        processes hand their results over through (None when no worker
+        processes are running).
+        _deduplicate (bool): Whether files with the content of an earlier
+        file are written as reference entries.
+        _reference_entries (bool): Whether the archive being written or
+        read may hold reference entries.
+        _files_by_size (dict): The files compressed so far by their size
+        - their paths and archive paths (only files of the same size are
+        hashed and compared).
+        _files_hashes (dict): The content hashes of the files compressed
+        so far, by their paths.
+        _written_entries (dict): The entries written to the output file
+        by their paths (while deduplicating).
+        _read_files (dict): The file entries read from the archive by
+        their offsets - the file they were written to (None if they were
+        not written), their size and CRC32 - so references to them are
+        not decompressed again.
+        _content_chunker (ContentChunker): Splits files into content
+        defined chunks, which are stored once (None when files are not
+        split into content defined chunks).
+        _chunk_list_entries (bool): Whether the archive being written may
+        hold chunk list entries.
+        _stored_chunks (dict): The offsets of the chunks stored in the
+        output file by their digests (None for chunks which are queued to
+        be stored).
+        _incremental (bool): Whether a manifest of the compressed files is
+        written, so later runs can write delta archives against it.
+        _base_archive_path (str): The archive the output file is a delta
+        archive of - only files which changed since it are written (None
+        when a full archive is written).
+        _base_manifest (dict): The manifest entries of the base archive by
+        their paths.
+        _record_checksum (int): The CRC32 of the part of the entry record
+        being written which was written so far.
+        _expected_checksums (dict): The sizes and CRC32 of the file data
+        of the entries of the archive being read, by their offsets (taken
+        from its central directory, if any).
+        _extracted_checksum (int): The CRC32 of the chunks of the chunked
+        entry being extracted which were written so far.
+        _removed_records (dict): The sizes of the records of the removed
+        entries of the archive being read, by their offsets (so reading
+        the entries one after the other skips them).
+        _solid_block_size (int): The size of the solid blocks small files
+        are concatenated into and compressed as one stream (None when
+        files are compressed one by one).
+        _solid_blocks (bool): Whether the archive being written may hold
+        solid entries.
+        _solid_files (list): The archive paths, paths and sizes of the
+        files waiting to be written in solid blocks.
+        _solid_block (tuple): The offset and the data of the last solid
+        block read, so the files of a block decompress it once (None
+        when no solid block was read).
+        _archive_header (ArchiveHeader): The header of the output file
+        (None when no header was written or loaded).
+        _replaced_index (tuple): The offset of the central directory of
+        the archive the output file appends to and the end of its footer -
+        the directory becomes dead space once the new one is written, and
+        the archive is truncated back to the end if the update fails (None
+        when a new archive is written).
+        _path_table (bool): Whether the paths of the entries are stored in
+        the path table of the central directory, compressed once, instead
+        of inside the entry records (every path compressed by itself).
+        _entries_paths (dict): The paths of the entries of the archive
+        being read, by their offsets (taken from its central directory, so
+        the records of an archive with a path table, which hold no path,
+        are read one after the other).
 
     Methods:
         __init__(self, data_compression_algorithem: DataCompression) -> None:
@@ -38,31 +148,171 @@ class FilesystemHandler:
             Open the output file for writing compressed data.
 
         close_output_file(self) -> None:
-            Close the output file.
+            Close the output file, writing its central directory.
+
+        discard_output_file() -> None:
+            Close the output file without writing it, removing it (or
+            truncating an updated archive back).
+
+        update_header_flags() -> None:
+            Set the header flags of the output file by its directory.
+
+        widen_header_flags() -> bool:
+            Make room in the header of an archive for the flag of removed
+            entries.
+
+        write_central_directory() -> None:
+            Write the central directory and footer to the output file.
 
         read_file() -> bytes:
             Read data from a file.
 
+        map_file() -> Iterator[memoryview]:
+            Map a file into memory for reading.
+
         write_file() -> None:
             Write data to a file.
 
+        write_output() -> None:
+            Write a part of an entry record to the output file.
+
+        write_length() -> None:
+            Write a length prefix according to the framing mode.
+
+        read_length() -> Tuple[int, int]:
+            Read a length prefix according to the framing mode.
+
         compress_data_to_file() -> None:
             Compress data and write it to the output file.
 
+        write_path() -> None:
+            Write the path of an entry to the output file.
+
+        read_path() -> Tuple[bytes, int]:
+            Read the path of an entry record.
+
+        skip_path() -> int:
+            Skip the path of an entry record.
+
+        write_entry() -> None:
+            Write an archive entry (flags, path and data).
+
+        write_chunked_entry() -> None:
+            Write an archive entry of a file, chunk by chunk.
+
+        write_compressed_entry() -> None:
+            Write an archive entry of already compressed file data.
+
+        start_chunked_entry() -> None:
+            Write the flags and the path of a chunked archive entry.
+
+        write_chunk() -> None:
+            Write the next chunk of the chunked entry being written.
+
+        add_chunk_checksum() -> None:
+            Add a chunk to the checksum and size of the chunked entry.
+
+        end_chunked_entry() -> None:
+            End the chunked entry being written.
+
+        write_file_entry() -> None:
+            Write or queue the archive entry of a file.
+
+        queue_entry() -> None:
+            Queue a part of an archive entry for worker processes.
+
+        write_queued_entry() -> None:
+            Write a part of an archive entry queued by queue_entry().
+
+        find_duplicate() -> bytes | None:
+            Find an earlier file with the same content as a file.
+
+        hash_files() -> List[bytes]:
+            Hash the content of files.
+
+        write_reference_entry() -> None:
+            Write an archive entry which refers to an earlier entry.
+
+        write_chunk_list_entry() -> None:
+            Write an archive entry of a file as a list of content defined
+            chunks.
+
+        write_entry_parts() -> None:
+            Write or queue the parts of an archive entry.
+
+        write_stored_chunk() -> None:
+            Store the next chunk of the chunk list entry being written.
+
+        write_chunk_reference() -> None:
+            Refer to a stored chunk from the chunk list entry being
+            written.
+
+        write_solid_blocks() -> None:
+            Write the files waiting to be written in solid blocks.
+
+        write_solid_block() -> None:
+            Compress the files of a solid block as one stream.
+
+        write_solid_entries() -> None:
+            Write the entries of the files of a solid block.
+
+        add_manifest_entry() -> bool:
+            Add a file to the manifest, checking whether it changed since
+            the base archive.
+
+        compress_in_workers() -> str | None:
+            Compress files and directories in worker processes.
+
+        create_shared_buffers() -> SharedBuffers:
+            Create the shared memory segments of worker processes.
+
+        close_shared_buffers() -> None:
+            Close and unlink the shared memory segments.
+
+        add_index_entry() -> None:
+            Add a written entry to the central directory.
+
         get_decompressed_data() -> Tuple[bytes, int]:
             Get decompressed data from compressed data.
 
         define_compression_algorithem() -> None:
-            Define the compression algorithm based on metadata.
+            Define the compression algorithm based on the archive header.
 
-        valid_for_compression() -> bool:
-            True if the data is valid for compression, False otherwise.
+        get_header_codec() -> DataCompression:
+            Get the compression algorithm of an archive header.
+
+        get_path_codec() -> Optional[DataCompression]:
+            Get the compression algorithm of the path table of an archive.
 
         write_metadata(self) -> None:
-            Write metadata about the compression algorithm to the output file.
+            Write the archive header to the output file.
+
+        load_base_manifest() -> Manifest:
+            Load the manifest of the base archive of a delta archive.
 
-        read_metadata() -> Tuple[str, int]:
-            Read metadata from compressed data.
+        read_metadata() -> Tuple[ArchiveHeader, int]:
+            Read the archive header from compressed data.
+
+        apply_metadata() -> None:
+            Set the compression algorithm and framing from the header.
+
+        read_archive_index() -> Tuple[ArchiveHeader, CentralDirectory,
+        ArchiveFooter]:
+            Read the header and the central directory of an archive.
+
+        load_archive_index() -> Tuple[ArchiveHeader, CentralDirectory,
+        ArchiveFooter]:
+            Load the header and the central directory of an archive.
+
+        expect_entries() -> None:
+            Keep the checksums and the removed entries of the archive being
+            read.
+
+        read_central_directory() -> CentralDirectory | None:
+            Read the central directory of mapped archive data.
+
+        get_entries_data() -> memoryview:
+            Get the part of an archive which holds the entries.
 
         compress() -> None:
             Compress files and directories recursively.
@@ -79,42 +329,270 @@ class FilesystemHandler:
         handle_init_decompression() -> int:
             Handle initialization for decompression.
 
+        read_entry() -> Tuple[IndexEntry, bytes]:
+            Read the archive entry record that starts at an index.
+
+        iter_entries() -> Iterator[Tuple[IndexEntry, bytes]]:
+            Iterate over the entries of an archive.
+
+        verify_checksum() -> None:
+            Verify the size and CRC32 of the file data of an entry.
+
+        read_file_data() -> Tuple[bytes, int, int]:
+            Decompress the file data of an entry.
+
+        read_reference() -> Tuple[bytes, int, int]:
+            Read the file data of a reference entry.
+
+        skip_file_data() -> int:
+            Skip the file data of an entry.
+
+        iter_file_data() -> Iterator[bytes]:
+            Decompress the file data of an entry piece by piece.
+
+        read_stored_chunk() -> Tuple[bytes, int]:
+            Read and decompress a chunk stored by a chunk list entry.
+
+        read_solid_file() -> bytes:
+            Read the file data of a solid entry out of its block.
+
+        write_file_pieces() -> Tuple[int, int]:
+            Write data to a file piece by piece.
+
+        get_entries_output_path() -> Optional[str]:
+            Get the path the decompressed entries are written to.
+
+        handle_entry() -> None:
+            Print a decompressed archive entry.
+
         get_next_path_from_archive() -> int:
             Get the next path from the compressed archive.
 
         decompress() -> None:
-            Decompress files and directories recursively.
+            Decompress all the files and directories of an archive.
 
         decompress_files() -> None:
             Decompress multiple files.
 
+        decompress_archive() -> str | None:
+            Decompress a single archive, removing the files of an invalid
+            one.
+
+        decompress_archive_paths() -> None:
+            Decompress a single archive.
+
+        capture_decompress_archive() -> Tuple[str | None, str]:
+            Decompress a single archive, capturing what it prints.
+
+        decompress_files_in_workers() -> dict:
+            Decompress multiple archives in worker processes.
+
+        view_archive() -> bool:
+            Print the entries of an archive using its central directory.
+
+        scan_entries() -> CentralDirectory:
+            Build an index of an archive by reading only the entry paths.
+
+        extract() -> List[str]:
+            Extract the entries matching glob patterns from an archive.
+
+        extract_files() -> dict:
+            Extract the entries matching glob patterns from archives.
+
+        extract_entries() -> None:
+            Extract archive entries located by their offsets.
+
+        get_archives_chain() -> List[Tuple[str, ArchiveHeader,
+        CentralDirectory]]:
+            Get a delta archive and the chain of its base archives.
+
+        restore_archive() -> List[str]:
+            Restore the files of a delta archive from its archives chain.
+
+        get_entries_batches() -> List[List[IndexEntry]]:
+            Split archive entries into batches for worker processes.
+
+        get_solid_block_index() -> int:
+            Get the index of the block of a solid entry.
+
+        get_chunks_positions() -> List[int]:
+            Get the positions of the chunks of a chunked entry.
+
+        read_entries() -> List[Tuple[IndexEntry, Exception | None]]:
+            Read and write archive entries located by their offsets.
+
+        read_chunk() -> Tuple[bytes, Exception | None]:
+            Read and decompress a chunk of a chunked entry.
+
+        handle_read_entries() -> Exception | None:
+            Report the entries read by read_entries().
+
+        write_extracted_chunk() -> Exception | None:
+            Write a decompressed chunk to the file of its entry.
+
+        write_extracted_reference() -> Exception | None:
+            Write the file of a reference entry in the current process.
+
+        iter_extract_tasks() -> Iterator[Tuple[Callable, Callable, Tuple]]:
+            Iterate over the tasks which extract archive entries.
+
+        extract_in_workers() -> None:
+            Extract archive entries in worker processes.
+
         def remove_paths() -> None:
             Removes files specified by a list of file paths.
 
         remove_from_archive() -> int:
             Remove files from an archive and update the archive.
 
+        remove_from_indexed_archive() -> int:
+            Remove files from an archive with a central directory.
+
+        compact_archives() -> dict:
+            Compact archives, reclaiming the records of their removed
+            entries.
+
+        compact_archive() -> int:
+            Reclaim the records of the removed entries of an archive.
+
+        relocate_record() -> Optional[bytes]:
+            Get the record of an entry moved to a new offset if it changes.
+
+        copy_record() -> None:
+            Copy a record from one file into another.
+
+        relocate_reference() -> bytes:
+            Get the record of a reference entry moved to a new offset.
+
+        relocate_chunk_list() -> bytes:
+            Get the data of a chunk list entry moved to a new offset.
+
+        relocate_stored_chunk() -> Tuple[bytes, int]:
+            Get the tag of a chunk or a solid block moved to a new offset.
+
         update_archive() -> None:
             Update an existing archive with new files.
 
+        update_indexed_archive() -> None:
+            Update an archive with a central directory without writing it
+            again.
+
         check_validation() -> dict:
             Check the validation of archived files and directories.
 
+        validate_archive_records() -> bool:
+            Verify the CRC32 of the entry records of an archive.
+
     """
 
-    def __init__(self, data_compression_algorithem: DataCompression) -> None:
+    def __init__(
+        self,
+        data_compression_algorithem: DataCompression,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: int = 1,
+        deduplicate: bool = False,
+        content_chunk_size: Optional[int] = None,
+        incremental: bool = False,
+        base_archive_path: Optional[str] = None,
+        solid_block_size: Optional[int] = None,
+    ) -> None:
         """Initialize the FilesystemHandler object with a specified
         compression algorithm.
 
         Args:
             data_compression_algorithem (DataCompression):
             The data compression algorithm instance.
+            chunk_size (int, optional): The size of the chunks big files
+            are compressed in. Defaults to DEFAULT_CHUNK_SIZE.
+            workers (int, optional): The number of worker processes files
+            are compressed and extracted in. Defaults to 1 (no worker
+            processes).
+            deduplicate (bool, optional): Whether files with the content of
+            an earlier file are written as reference entries to it.
+            Defaults to False.
+            content_chunk_size (int, optional): The average size of the
+            content defined chunks files are split into, so identical
+            chunks of different files are stored once. Defaults to None
+            (files are not split into content defined chunks).
+            incremental (bool, optional): Whether a manifest of the
+            compressed files is written, so later runs can write delta
+            archives against the archive. Defaults to False.
+            base_archive_path (str, optional): The archive to write a delta
+            archive of - only files which changed since it are written.
+            Defaults to None (a full archive is written).
+            solid_block_size (int, optional): The size of the solid blocks
+            files smaller than it are concatenated into, each compressed as
+            one stream. Defaults to None (files are compressed one by one).
         """
         self._compression_algorithem: DataCompression = \
             data_compression_algorithem
         self._output_file: Optional[BinaryIO] = None
         self._folder_suffix = "/"
         self._bytes_length = 16
+        self._varint_framing = True
+        self._central_directory: Optional[CentralDirectory] = None
+        self._chunk_size = chunk_size
+        self._chunked_entries = True
+        self._stream_buffer_size = 1 << 16
+        self._workers = workers
+        self._entries_queue: Optional[OrderedTaskQueue] = None
+        self._chunked_entry: Optional[IndexEntry] = None
+        self._shared_buffers: Optional[SharedBuffers] = None
+        self._deduplicate = deduplicate
+        self._reference_entries = False
+        self._files_by_size: Dict[int, List[Tuple[str, bytes]]] = {}
+        self._files_hashes: Dict[str, bytes] = {}
+        self._written_entries: Dict[bytes, IndexEntry] = {}
+        self._read_files: Dict[int, Tuple[Optional[str], int, int]] = {}
+        self._content_chunker: Optional[ContentChunker] = None
+        if content_chunk_size is not None:
+            self._content_chunker = ContentChunker(
+                average_size=content_chunk_size
+            )
+        self._chunk_list_entries = False
+        self._stored_chunks: Dict[bytes, Optional[int]] = {}
+        self._incremental = incremental or base_archive_path is not None
+        self._base_archive_path = base_archive_path
+        self._base_manifest: Dict[str, ManifestEntry] = {}
+        self._record_checksum = 0
+        self._expected_checksums: Dict[int, Tuple[int, int]] = {}
+        self._extracted_checksum = 0
+        self._removed_records: Dict[int, int] = {}
+        self._solid_block_size = solid_block_size
+        self._solid_blocks = False
+        self._solid_files: List[Tuple[bytes, str, int]] = []
+        self._solid_block: Optional[Tuple[int, bytes]] = None
+        self._path_table = False
+        self._entries_paths: Dict[int, str] = {}
+        self._archive_header: Optional[ArchiveHeader] = None
+        self._replaced_index: Optional[Tuple[int, int]] = None
+
+    def __getstate__(self) -> Dict[str, object]:
+        """Get the state of the handler which is sent to worker processes
+        - without the output file, the entries being written and workers.
+
+        Returns:
+            dict: The attributes of the handler.
+        """
+        state = self.__dict__.copy()
+        state["_output_file"] = None
+        state["_central_directory"] = None
+        state["_entries_queue"] = None
+        state["_shared_buffers"] = None
+        state["_files_by_size"] = {}
+        state["_files_hashes"] = {}
+        state["_written_entries"] = {}
+        state["_read_files"] = {}
+        state["_stored_chunks"] = {}
+        state["_base_manifest"] = {}
+        state["_solid_files"] = []
+        state["_solid_block"] = None
+        # the checksums are verified by the current process
+        state["_expected_checksums"] = {}
+        state["_entries_paths"] = {}
+        # worker processes do not start worker processes of their own
+        state["_workers"] = 1
+        return state
 
     def get_compression_algorithem_name(self) -> str:
         """Get the name of the compression algorithm.
@@ -138,15 +616,174 @@ class FilesystemHandler:
     def open_output_file(self, output_file_path: str) -> None:
         """Open the output file for writing compressed data.
 
+        If the output file is an existing archive with a central
+        directory, the directory is loaded and new entries are appended
+        after its footer - the entries of the archive are not touched, and
+        its directory and footer stay valid until the new ones are written
+        on close (see discard_output_file() for failed updates).
+
         Args:
             output_file_path (str): The path to the output file.
         """
+        self._central_directory = None
+        self._reference_entries = False
+        self._files_by_size = {}
+        self._files_hashes = {}
+        self._written_entries = {}
+        self._chunk_list_entries = False
+        self._solid_blocks = False
+        self._stored_chunks = {}
+        self._base_manifest = {}
+        self._solid_files = []
+        self._record_checksum = 0
+        self._archive_header = None
+        self._replaced_index = None
         self._output_file = open(output_file_path, "ab")
+        if self._output_file.tell() < len(ARCHIVE_MAGIC):
+            return
+
+        with open(output_file_path, "rb") as f:
+            is_archive = f.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+        if not is_archive:
+            return
+        header, directory, footer = self.load_archive_index(
+            archive_path=output_file_path
+        )
+        if directory is None or footer is None:
+            return
+
+        # the header flags are set in place on close
+        self._output_file.close()
+        self._output_file = open(output_file_path, "r+b")
+        end = self._output_file.seek(0, os.SEEK_END)
+        self._archive_header = header
+        self._replaced_index = (footer.index_offset, end)
+        self._central_directory = directory
 
     def close_output_file(self) -> None:
-        """Close the output file."""
-        if self._output_file is not None:
+        """Close the output file, writing its central directory first (and
+        the header flags it requires). The central directory an updated
+        archive replaces becomes dead space, and the archive is synced to
+        the disk."""
+        if self._output_file is not None and not self._output_file.closed:
+            if self._central_directory is not None:
+                if self._replaced_index is not None:
+                    offset, end = self._replaced_index
+                    self._central_directory.replace_index(
+                        offset=offset, length=end - offset
+                    )
+                self.update_header_flags()
+                self.write_central_directory()
+            if self._replaced_index is not None:
+                self._output_file.flush()
+                os.fsync(self._output_file.fileno())
             self._output_file.close()
+        self._central_directory = None
+        self._replaced_index = None
+
+    def discard_output_file(self) -> None:
+        """Close the output file without writing its central directory and
+        remove it - an archive being updated is truncated back to the end
+        of its footer, and its header is written again if it changed, so
+        it is left as it was."""
+        if self._output_file is None:
+            return
+        if not self._output_file.closed:
+            self._output_file.close()
+        if self._replaced_index is not None:
+            _, end = self._replaced_index
+            header_data = self._archive_header.to_bytes()
+            with open(self._output_file.name, "r+b") as f:
+                if f.read(len(header_data)) != header_data:
+                    f.seek(0)
+                    f.write(header_data)
+                if f.seek(0, os.SEEK_END) != end:
+                    f.truncate(end)
+        elif os.path.exists(self._output_file.name):
+            os.remove(self._output_file.name)
+        self._central_directory = None
+        self._replaced_index = None
+
+    def update_header_flags(self) -> None:
+        """Set the header flags of the output file according to its central
+        directory - the REMOVED_ENTRIES flag is set while the directory
+        holds tombstones, so older readers reject the archive instead of
+        reading the records of removed entries (or replaced directories).
+
+        Raises:
+            InvalidArchiveFormat: If the header has no room for the flags
+            (their varint is longer than the written one - archives are
+            made room in by widen_header_flags() before they are updated).
+        """
+        header = self._archive_header
+        if header is None:
+            return
+
+        directory = self._central_directory
+        flags = header.flags & ~ArchiveFlags.REMOVED_ENTRIES
+        if directory.removed_entries or directory.replaced_indexes:
+            flags |= ArchiveFlags.REMOVED_ENTRIES
+        if flags == header.flags:
+            return
+        updated_header = ArchiveHeader(
+            codec_id=header.codec_id,
+            codec_parameters=header.codec_parameters,
+            flags=flags,
+            version=header.version,
+            flags_size=header.flags_size,
+        )
+        header_data = updated_header.to_bytes()
+        if len(header_data) != len(header.to_bytes()):
+            raise InvalidArchiveFormat(
+                "The archive header has no room for its flags."
+            )
+
+        # the loaded header is kept, so a failed update writes it back
+        end = self._output_file.tell()
+        self._output_file.seek(0)
+        self._output_file.write(header_data)
+        self._output_file.seek(end)
+
+    def widen_header_flags(self, archive_path: str) -> bool:
+        """Make room in the header of an archive for the REMOVED_ENTRIES
+        flag, which removals and updates set in place (see
+        update_header_flags()). The flags of archives written before the
+        flags became a varint take a single byte, and the flag needs two -
+        such archives are compacted once (see compact_archive()) into a
+        header with room for it, which moves all their records.
+
+        Args:
+            archive_path (str): Path to the archive.
+
+        Returns:
+            bool: True if the archive was compacted, False if its header
+            already has room for the flag.
+        """
+        header, _, _ = self.read_archive_index(archive_path=archive_path)
+        flags_size = len(encode_varint(
+            int(header.flags | ArchiveFlags.REMOVED_ENTRIES)
+        ))
+        if header.flags_size >= flags_size:
+            return False
+
+        print(f"{archive_path} - the archive header has no room for the "
+              f"flag of removed entries, compacting the archive once.")
+        self.compact_archive(archive_path=archive_path, flags_size=flags_size)
+        return True
+
+    def write_central_directory(self) -> None:
+        """Write the central directory and the footer which locates it
+        to the end of the output file."""
+        if self._output_file is None or self._central_directory is None:
+            return
+
+        index_offset = self._output_file.tell()
+        index_data = self._central_directory.to_bytes()
+        footer = ArchiveFooter(
+            index_offset=index_offset, index_length=len(index_data)
+        )
+        self._output_file.write(index_data)
+        self._output_file.write(footer.to_bytes())
 
     def read_file(self, file: str) -> bytes:
         """Read data from a file.
@@ -160,6 +797,36 @@ class FilesystemHandler:
         with open(file, "rb") as f:
             return f.read()
 
+    @contextmanager
+    def map_file(self, file: str) -> Iterator[memoryview]:
+        """Map a file into memory for reading, so only the pages that are
+        actually touched are read from the disk.
+
+        Args:
+            file (str): The path to the file.
+
+        Yields:
+            memoryview: A read only view of the file data.
+        """
+        with open(file, "rb") as f:
+            # empty files can not be mapped
+            if os.fstat(f.fileno()).st_size == 0:
+                yield memoryview(b"")
+                return
+            mapped_file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(mapped_file)
+        try:
+            yield view
+        finally:
+            view.release()
+            try:
+                mapped_file.close()
+            except BufferError:
+                # slices of the view are still alive - the mapping is
+                # closed when they are released
+                pass
+
     def write_file(self, file: str, data: bytes) -> None:
         """Write data to a file.
 
@@ -174,515 +841,3294 @@ class FilesystemHandler:
             with open(file, "wb") as f:
                 f.write(data)
 
-    def compress_data_to_file(self, data: bytes) -> None:
-        """Compress data and write it to the output file.
+    def write_output(self, data: Union[bytes, memoryview]) -> None:
+        """Write a part of an entry record to the output file, updating
+        the CRC32 of the record.
 
         Args:
-            data (bytes): The data to compress and write.
+            data (bytes | memoryview): The data to write.
         """
-        compressed_data = self._compression_algorithem.compress_data(
-            data=data)
-        data_len = len(compressed_data).to_bytes(
-            self._bytes_length, byteorder="big"
-        )
         if self._output_file:
-            self._output_file.write(data_len)
-            self._output_file.write(compressed_data)
+            self._output_file.write(data)
+            self._record_checksum = zlib.crc32(data, self._record_checksum)
 
-    def get_decompressed_data(
-        self, compressed_data: bytes, index: int = 0
-    ) -> Tuple[bytes, int]:
-        """Get decompressed data from compressed data.
+    def write_length(self, length: int) -> None:
+        """Write a length prefix to the output file, as a varint or as
+        fixed size bytes according to the framing mode.
 
         Args:
-            compressed_data (bytes): The compressed data.
-            index (int, optional): The index to start reading from in the
-            compressed data. Defaults to 0.
-
-        Returns:
-            Tuple[bytes, int]: The decompressed data and the next index
-            in the compressed data.
+            length (int): The length to write.
         """
-        bytes_len = compressed_data[index : index + self._bytes_length][::-1]
-        compressed_len = int.from_bytes(bytes_len, byteorder="little")
-        next_index = self._bytes_length + index + compressed_len
-        compressed = compressed_data[index + self._bytes_length : next_index]
-        decompress_data = self._compression_algorithem.decompress_data(
-            compressed_data=compressed
-        )
-
-        return decompress_data, next_index
+        if self._varint_framing:
+            data_len = encode_varint(length)
+        else:
+            data_len = length.to_bytes(self._bytes_length, byteorder="big")
+        self.write_output(data_len)
 
-    def define_compression_algorithem(self, algorithem_type: bytes) -> None:
-        """Define the compression algorithm based on metadata.
+    def read_length(
+        self, compressed_data: memoryview, index: int = 0
+    ) -> Tuple[int, int]:
+        """Read a length prefix from compressed data according to the
+        framing mode.
 
         Args:
-            algorithem_type (bytes): The metadata indicating the
-            compression algorithm type.
-        """
+            compressed_data (memoryview): The compressed data.
+            index (int, optional): The index of the length prefix.
+            Defaults to 0.
 
-        algo: Optional[DataCompression] = None
-        
-        # RLE algorithem
-        if algorithem_type.startswith(
-            CompressionTypes.RLE.value.__name__.encode()
-        ):
-            rle_len = len(CompressionTypes.RLE.value.__name__)
-            bytes_size = int.from_bytes(
-                algorithem_type[rle_len:][::-1], byteorder="little"
-            )
-            algo = CompressionTypes.RLE.value(bytes_size=bytes_size)
+        Returns:
+            Tuple[int, int]: The length and the index of the first byte
+            after the length prefix.
+        """
+        if self._varint_framing:
+            return decode_varint(data=compressed_data, index=index)
 
-        # HUFFMAN algorithem
-        elif algorithem_type.startswith(
-            CompressionTypes.HUFFMAN.value.__name__.encode()
-        ):
-            algo = CompressionTypes.HUFFMAN.value()
+        next_index = index + self._bytes_length
+        length = int.from_bytes(
+            compressed_data[index:next_index], byteorder="big"
+        )
+        return length, next_index
 
-        # LEMPEL_ZIV algorithem
-        elif algorithem_type.startswith(
-            CompressionTypes.LZ.value.__name__.encode()
-        ):
-            algo = CompressionTypes.LZ.value()
+    def compress_data_to_file(self, data: bytes) -> None:
+        """Compress data and write it to the output file.
 
-        else:
-            raise InvalidCompressionAlgorithem(f"Invalid compression format!")
+        Args:
+            data (bytes): The data to compress and write.
+        """
+        compressed_data = self._compression_algorithem.compress_data(
+            data=data)
+        self.write_length(length=len(compressed_data))
+        self.write_output(compressed_data)
 
-        self.set_compression_algorithem(compression_algorithem=algo)
+    def write_path(self, path: bytes) -> None:
+        """Write the compressed path of an entry to the output file -
+        nothing is written when the paths are stored in the path table of
+        the central directory (see add_index_entry()).
 
-    def write_metadata(self) -> None:
-        """Write metadata about the compression algorithm to the output file.
+        Args:
+            path (bytes): The path of the entry.
         """
-        algo_metadata = self._compression_algorithem.get_metadata()
-        metadata_len = len(algo_metadata).to_bytes(
-            self._bytes_length, byteorder="big"
-        )
-        if self._output_file:
-            self._output_file.write(metadata_len)
-            self._output_file.write(algo_metadata)
+        if not self._path_table:
+            self.compress_data_to_file(data=path)
 
-    def read_metadata(
-        self, compressed_data: bytes, index: int = 0
+    def read_path(
+        self, compressed_data: memoryview, index: int, offset: int
     ) -> Tuple[bytes, int]:
-        """Read metadata from compressed data.
+        """Read the path of an entry record - from the central directory
+        when the paths are stored in its path table.
 
         Args:
-            compressed_data (bytes): The compressed data.
-            index (int, optional): The index to start reading from in the
-            compressed data. Defaults to 0.
+            compressed_data (memoryview): The archive entries data.
+            index (int): The index of the path.
+            offset (int): The offset of the entry record.
 
         Returns:
-            Tuple[str, int]: The metadata and the next index in the
-            compressed data.
+            Tuple[bytes, int]: The path and the index after it.
+
+        Raises:
+            InvalidArchiveFormat: If the path is truncated, or the entry is
+            not in the central directory.
         """
-        location = compressed_data[index : index + self._bytes_length][::-1]
-        metadata_len = int.from_bytes(location, byteorder="little")
-        next_index = self._bytes_length + index + metadata_len
-        metadata = compressed_data[index + self._bytes_length : next_index]
+        if not self._path_table:
+            return self.get_decompressed_data(
+                compressed_data=compressed_data, index=index
+            )
 
-        return metadata, next_index
+        path = self._entries_paths.get(offset)
+        if path is None:
+            raise InvalidArchiveFormat(
+                f"The entry record at {offset} is not in the central "
+                f"directory."
+            )
+        return path.encode(), index
 
-    def valid_for_compression(self, data: bytes) -> bool:
-        """Checks if the data is valid for compression based on special signs.
+    def skip_path(self, compressed_data: memoryview, index: int) -> int:
+        """Skip the path of an entry record using its length prefix.
 
         Args:
-            data (bytes): The data to be checked for special signs.
+            compressed_data (memoryview): The archive entries data.
+            index (int): The index of the path.
 
         Returns:
-            bool: True if the data is valid for compression, False otherwise.
+            int: The index after the path.
         """
-        special_signs = self._compression_algorithem.get_special_signs()
-        for sign in special_signs:
-            if sign in data:
-                return False
+        if self._path_table:
+            return index
 
-        return True
+        path_len, index = self.read_length(
+            compressed_data=compressed_data, index=index
+        )
+        return index + path_len
 
-    def compress_with_error(
-            self, should_remove_output: bool, exception_type: Exception) -> str:
-        """
-        Handles compression errors and raises exceptions.
+    def write_entry(
+        self,
+        path: bytes,
+        data: bytes = b"",
+        flags: EntryFlags = EntryFlags.NONE,
+    ) -> None:
+        """Write an archive entry - the entry flags (varint framing only),
+        the compressed path (unless it is stored in the path table) and, for
+        files, the compressed data.
 
-        Parameters:
-        - should_remove_output (bool): Whether to remove the output file 
-        if an error occurs.
-        - exception_type (Exception): The type of exception to raise 
-        (default: Exception).
-        - aborted_msg (str): The error message to use if no message
-          is provided (default: '').
-        - full_dir_path (str): The full directory path related to the 
-        compression operation (default: '').
+        Args:
+            path (bytes): The path of the entry.
+            data (bytes, optional): The file data. Defaults to b''.
+            flags (EntryFlags, optional): The entry flags.
+            Defaults to EntryFlags.NONE.
+        """
+        offset = self._output_file.tell() if self._output_file else 0
+        if self._varint_framing:
+            self.write_output(bytes([flags]))
+        self.write_path(path=path)
+        if not flags & EntryFlags.DIRECTORY:
+            self.compress_data_to_file(data=data)
+
+        self.add_index_entry(
+            path=path,
+            offset=offset,
+            uncompressed_size=len(data),
+            checksum=zlib.crc32(data),
+            flags=flags,
+        )
 
-        Returns:
-            str: invalid data for compression exception.
+    def write_chunked_entry(self, path: bytes, file_path: str) -> None:
+        """Write an archive entry of a file, reading and compressing its
+        data chunk by chunk, so the memory in use is bounded by the chunk
+        size regardless of the file size.
 
-        Notes:
-        - If should_remove_output is True, the output file will be 
-        removed if an error occurs.
-        - exception_type will be printed.
+        Args:
+            path (bytes): The path of the entry.
+            file_path (str): The path of the file to read.
         """
-        self.close_output_file()
-        if should_remove_output and self._output_file:
-            os.remove(self._output_file.name)
+        self.start_chunked_entry(path=path)
+        entry = self._chunked_entry
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(self._chunk_size), b""):
+                compressed_chunk = self._compression_algorithem.compress_data(
+                    data=chunk)
+                self.write_chunk(
+                    compressed_chunk=compressed_chunk,
+                    chunk_size=len(chunk),
+                    entry_checksum=zlib.crc32(chunk, entry.checksum),
+                )
+        self.end_chunked_entry()
 
-        return f"{type(exception_type).__name__}({exception_type})"
+    def start_chunked_entry(
+        self, path: bytes, flags: EntryFlags = EntryFlags.CHUNKED
+    ) -> None:
+        """Write the flags and the path of a chunked archive entry - its
+        chunks are written by write_chunk() (or by write_stored_chunk() and
+        write_chunk_reference() for chunk list entries).
 
-    def compress(
+        Args:
+            path (bytes): The path of the entry.
+            flags (EntryFlags, optional): The entry flags.
+            Defaults to EntryFlags.CHUNKED.
+        """
+        offset = self._output_file.tell() if self._output_file else 0
+        self.write_output(bytes([flags]))
+        self.write_path(path=path)
+        self._chunked_entry = IndexEntry(
+            path=path.decode(),
+            offset=offset,
+            compressed_size=0,
+            uncompressed_size=0,
+            checksum=0,
+            codec_id=self._compression_algorithem.codec_id,
+            flags=flags,
+        )
+
+    def write_chunk(
         self,
-        directories: List[str],
-        subfolder: str = "",
-        ignore_folders: List[str] = [],
-        ignore_files: List[str] = [],
-        ignore_extensions: List[str] = [],
-        init_compression: bool = False,
-        remove_output: bool = True,
-    ) -> Union[str, None]:
-        """Compress files and directories recursively.
+        compressed_chunk: bytes,
+        chunk_size: int,
+        checksum: Optional[int] = None,
+        entry_checksum: Optional[int] = None,
+    ) -> None:
+        """Write the next chunk of the chunked entry being written.
 
         Args:
-            directories (list): List of directories to compress.
-            subfolder (str, optional): Subfolder path. Defaults to ''.
-            ignore_folders (list, optional): List of folders to ignore.
-            Defaults to [].
-            ignore_files (list, optional): List of files to ignore.
-            Defaults to [].
-            ignore_extensions (list, optional): List of file extensions
-            to ignore. Defaults to [].
-            init_compression (bool, optional): Whether it's the initial
-            compression operation. Defaults to False.
-            remove_output (bool, optional): Whether an error occured,
-            option to remove the output path. Defaults to True.
+            compressed_chunk (bytes): The compressed chunk.
+            chunk_size (int): The size of the chunk data.
+            checksum (int, optional): The CRC32 of the chunk data (of
+            chunks checksummed in worker processes).
+            entry_checksum (int, optional): The CRC32 of the entry data up
+            to the end of the chunk, when it is already known (so the chunk
+            checksum is not combined into the one of the entry).
+        """
+        # an empty chunk (of a file which got shorter) would end the entry
+        if chunk_size == 0:
+            return
+        self.write_length(length=len(compressed_chunk))
+        self.write_output(compressed_chunk)
+        self.add_chunk_checksum(
+            chunk_size=chunk_size, checksum=checksum,
+            entry_checksum=entry_checksum)
+
+    def add_chunk_checksum(
+        self, chunk_size: int, checksum: Optional[int] = None,
+        entry_checksum: Optional[int] = None
+    ) -> None:
+        """Add a chunk to the checksum and size of the chunked entry being
+        written.
 
-        Returns:
-            str | None: exception as string or None
+        Args:
+            chunk_size (int): The size of the chunk data.
+            checksum (int, optional): The CRC32 of the chunk data (of
+            chunks checksummed in worker processes).
+            entry_checksum (int, optional): The CRC32 of the entry data up
+            to the end of the chunk, when it is already known (so the chunk
+            checksum is not combined into the one of the entry).
         """
-        if init_compression:
-            self.write_metadata()
+        entry = self._chunked_entry
+        if entry_checksum is None:
+            entry_checksum = crc32_combine(
+                entry.checksum, checksum, chunk_size)
+        entry.checksum = entry_checksum
+        entry.uncompressed_size += chunk_size
+
+    def end_chunked_entry(self) -> None:
+        """End the chunked entry being written and add it to the central
+        directory."""
+        # zero length marks the last chunk
+        self.write_length(length=0)
+
+        entry = self._chunked_entry
+        self._chunked_entry = None
+        self.add_index_entry(
+            path=entry.path.encode(),
+            offset=entry.offset,
+            uncompressed_size=entry.uncompressed_size,
+            checksum=entry.checksum,
+            flags=entry.flags,
+        )
 
-        ignore_folders = [os.path.normpath(path) for path in ignore_folders]
-        # pass on each given directory
-        for dir in directories:
-            full_dir_path = os.path.join(subfolder, dir)
-            # if it is directory to folder
+    def write_compressed_entry(
+        self,
+        path: bytes,
+        compressed_data: bytes,
+        uncompressed_size: int,
+        checksum: int,
+    ) -> None:
+        """Write an archive entry of a file whose data was already
+        compressed (by a worker process).
+
+        Args:
+            path (bytes): The path of the entry.
+            compressed_data (bytes): The compressed file data.
+            uncompressed_size (int): The size of the file data.
+            checksum (int): The CRC32 of the file data.
+        """
+        flags = EntryFlags.NONE
+        offset = self._output_file.tell() if self._output_file else 0
+        if self._varint_framing:
+            self.write_output(bytes([flags]))
+        self.write_path(path=path)
+        self.write_length(length=len(compressed_data))
+        self.write_output(compressed_data)
+
+        self.add_index_entry(
+            path=path,
+            offset=offset,
+            uncompressed_size=uncompressed_size,
+            checksum=checksum,
+            flags=flags,
+        )
+
+    def write_file_entry(self, path: bytes, file_path: str) -> None:
+        """Write the archive entry of a file - big files chunk by chunk,
+        files with the content of an earlier file as references to it
+        (while deduplicating) and files as lists of content defined chunks
+        (when files are split into content defined chunks). Files which did
+        not change since the base archive are only added to the manifest
+        (while writing a delta archive), and files smaller than the solid
+        block size wait to be written in solid blocks (see
+        write_solid_blocks()). While
+        compressing in worker processes the entry is queued (big files
+        chunk by chunk, so their chunks are compressed concurrently), and
+        the oldest queued entries are written when the queue is full.
+
+        Args:
+            path (bytes): The path of the entry.
+            file_path (str): The path of the file to read.
+        """
+        if self._central_directory is not None \
+                and self._central_directory.manifest is not None \
+                and not self.add_manifest_entry(
+                    path=path.decode(), file_path=file_path
+                ):
+            return
+
+        file_size = os.path.getsize(file_path)
+        if self._solid_block_size is not None and self._solid_blocks \
+                and file_size < self._solid_block_size:
+            self._solid_files.append((path, file_path, file_size))
+            return
+
+        if self._deduplicate and self._reference_entries:
+            target_path = self.find_duplicate(
+                path=path, file_path=file_path, file_size=file_size
+            )
+            if target_path is not None and self._entries_queue is None:
+                self.write_reference_entry(path=path, target_path=target_path)
+                return
+            if target_path is not None:
+                self.queue_entry((file_path, partial(
+                    self.write_reference_entry, path, target_path
+                )))
+                return
+
+        if self._content_chunker is not None and self._chunk_list_entries \
+                and file_size > 0:
+            self.write_chunk_list_entry(path=path, file_path=file_path)
+            return
+
+        is_big = self._chunked_entries and file_size > self._chunk_size
+        if self._entries_queue is None:
+            if is_big:
+                self.write_chunked_entry(path=path, file_path=file_path)
+            else:
+                self.write_entry(
+                    path=path, data=self.read_file(file=file_path))
+            return
+
+        if not is_big:
+            self.queue_entry(
+                (file_path, partial(self.write_compressed_entry, path)),
+                compress_file_task,
+                file_path,
+            )
+            return
+
+        self.queue_entry(
+            (file_path, partial(self.start_chunked_entry, path))
+        )
+        for chunk_offset in range(0, file_size, self._chunk_size):
+            self.queue_entry(
+                (file_path, self.write_chunk),
+                compress_chunk_task,
+                file_path,
+                chunk_offset,
+                self._chunk_size,
+            )
+        self.queue_entry((file_path, self.end_chunked_entry))
+
+    def queue_entry(
+        self,
+        item: Tuple[str, Callable],
+        task: Optional[Callable] = None,
+        *args: Any,
+    ) -> None:
+        """Queue a part of an archive entry while compressing in worker
+        processes, writing the oldest queued parts while the queue is full.
+
+        Args:
+            item (Tuple[str, Callable]): The path of the file and the
+            method which writes the part (called with the task result).
+            task (Callable, optional): The task which compresses the part
+            in a worker process. Defaults to None.
+            *args (Any): The task arguments.
+        """
+        while self._entries_queue.full():
+            self.write_queued_entry(*self._entries_queue.get())
+        slot = None
+        if task is not None:
+            # the task hands its result over through a shared segment
+            buffer = self._shared_buffers.acquire()
+            if buffer is not None:
+                slot, buffer_name = buffer
+                args = args + (buffer_name,)
+        self._entries_queue.put(item + (slot,), task, *args)
+
+    def write_queued_entry(
+        self,
+        item: Tuple[str, Callable, Optional[int]],
+        result: Optional[Tuple],
+    ) -> None:
+        """Write a part of an archive entry queued by queue_entry(),
+        directly from the shared segment its task result was handed over
+        through.
+
+        Args:
+            item (Tuple[str, Callable, int | None]): The path of the file,
+            the method which writes the part and the shared segment of the
+            task result.
+            result (Tuple | None): The result of the part task - the
+            compressed data (see hand_over()), size and CRC32 (the sizes
+            and CRC32 of the files of solid blocks, None for parts without
+            a task).
+
+        Raises:
+            InvalidDataForCompressionAlgorithem: If the file could not be
+            compressed.
+        """
+        file_path, write, slot = item
+        try:
+            if result is None:
+                write()
+            else:
+                compressed_data, uncompressed_size, checksum = result
+                with self._shared_buffers.read(
+                    slot=slot, result=compressed_data
+                ) as data:
+                    write(data, uncompressed_size, checksum)
+        except Exception:
+            raise self.get_invalid_data_exception(full_dir_path=file_path)
+        finally:
+            self._shared_buffers.release(slot=slot)
+
+    def find_duplicate(
+        self, path: bytes, file_path: str, file_size: int
+    ) -> Optional[bytes]:
+        """Find an earlier compressed file with the same content as a
+        file. Only files of the same size are hashed and compared, so
+        files of a unique size are never hashed.
+
+        Args:
+            path (bytes): The archive path of the file.
+            file_path (str): The path of the file.
+            file_size (int): The size of the file.
+
+        Returns:
+            bytes | None: The archive path of the earlier file, or None if
+            the content of the file is unique so far.
+        """
+        candidates = self._files_by_size.setdefault(file_size, [])
+        candidates.append((file_path, path))
+        if len(candidates) == 1:
+            return None
+
+        unhashed_files = [
+            candidate_file for candidate_file, _ in candidates
+            if candidate_file not in self._files_hashes
+        ]
+        self._files_hashes.update(zip(
+            unhashed_files, self.hash_files(file_paths=unhashed_files)
+        ))
+        file_hash = self._files_hashes[file_path]
+        for candidate_file, candidate_path in candidates[:-1]:
+            if self._files_hashes[candidate_file] == file_hash:
+                # only the first file with this content is referred to
+                candidates.pop()
+                return candidate_path
+
+        return None
+
+    def hash_files(self, file_paths: List[str]) -> List[bytes]:
+        """Hash the content of files - concurrently in the worker
+        processes while compressing in worker processes.
+
+        Args:
+            file_paths (list): The paths of the files.
+
+        Returns:
+            list: The content hashes of the files.
+        """
+        if self._entries_queue is not None and len(file_paths) > 1:
+            return self._entries_queue.map(hash_file_task, file_paths)
+        return [hash_file_task(file_path) for file_path in file_paths]
+
+    def write_reference_entry(self, path: bytes, target_path: bytes) -> None:
+        """Write an archive entry of a file with the content of an earlier
+        entry - its data is the offset of the earlier entry, so the
+        content is stored (and decompressed) once.
+
+        Args:
+            path (bytes): The path of the entry.
+            target_path (bytes): The path of the earlier entry.
+        """
+        target = self._written_entries[target_path]
+        flags = EntryFlags.REFERENCE
+        offset = self._output_file.tell() if self._output_file else 0
+        self.write_output(bytes([flags]))
+        self.write_path(path=path)
+        self.write_output(encode_varint(target.offset))
+
+        self.add_index_entry(
+            path=path,
+            offset=offset,
+            uncompressed_size=target.uncompressed_size,
+            checksum=target.checksum,
+            flags=flags,
+        )
+
+    def write_chunk_list_entry(self, path: bytes, file_path: str) -> None:
+        """Write an archive entry of a file as a list of content defined
+        chunks - chunks which were already stored in the archive (by any
+        entry) are referred to, so every unique chunk is compressed and
+        stored once. While compressing in worker processes the new chunks
+        are queued, so they are compressed concurrently.
+
+        Args:
+            path (bytes): The path of the entry.
+            file_path (str): The path of the file to read.
+        """
+        parts: List[Tuple[Callable, Optional[Callable], Tuple]] = [(
+            partial(self.start_chunked_entry, path, EntryFlags.CHUNK_LIST),
+            None,
+            (),
+        )]
+        with open(file_path, "rb") as f:
+            chunk_offset = 0
+            # the entry checksum, while the chunks are written in order
+            entry_checksum = 0
+            for chunk in self._content_chunker.iter_chunks(file=f):
+                digest = chunk_digest(chunk=chunk)
+                if self._entries_queue is None:
+                    entry_checksum = zlib.crc32(chunk, entry_checksum)
+                if digest in self._stored_chunks:
+                    if self._entries_queue is None:
+                        write_reference = partial(
+                            self.write_chunk_reference, digest, len(chunk),
+                            entry_checksum=entry_checksum)
+                    else:
+                        write_reference = partial(
+                            self.write_chunk_reference, digest, len(chunk),
+                            zlib.crc32(chunk))
+                    parts.append((write_reference, None, ()))
+                elif self._entries_queue is None:
+                    self._stored_chunks[digest] = None
+                    parts.append((partial(
+                        self.write_stored_chunk,
+                        digest,
+                        self._compression_algorithem.compress_data(
+                            data=chunk
+                        ),
+                        len(chunk),
+                        entry_checksum=entry_checksum,
+                    ), None, ()))
+                else:
+                    self._stored_chunks[digest] = None
+                    parts.append((
+                        partial(self.write_stored_chunk, digest),
+                        compress_chunk_task,
+                        (file_path, chunk_offset, len(chunk)),
+                    ))
+                chunk_offset += len(chunk)
+                # the parts are written (or queued) as soon as they are
+                # ready, so the memory in use is bounded
+                self.write_entry_parts(file_path=file_path, parts=parts)
+        parts.append((self.end_chunked_entry, None, ()))
+        self.write_entry_parts(file_path=file_path, parts=parts)
+
+    def write_entry_parts(
+        self,
+        file_path: str,
+        parts: List[Tuple[Callable, Optional[Callable], Tuple]],
+    ) -> None:
+        """Write the parts of an archive entry - or queue them while
+        compressing in worker processes - and clear the parts list.
+
+        Args:
+            file_path (str): The path of the file of the entry.
+            parts (list): The methods which write the parts, the tasks
+            which compress them in worker processes (None for parts
+            without a task) and the tasks arguments.
+        """
+        for write, task, args in parts:
+            if self._entries_queue is None:
+                write()
+            else:
+                self.queue_entry((file_path, write), task, *args)
+        parts.clear()
+
+    def write_stored_chunk(
+        self,
+        digest: bytes,
+        compressed_chunk: bytes,
+        chunk_size: int,
+        checksum: Optional[int] = None,
+        entry_checksum: Optional[int] = None,
+    ) -> None:
+        """Store the next chunk of the chunk list entry being written, so
+        the next entries can refer to it.
+
+        Args:
+            digest (bytes): The digest of the chunk data.
+            compressed_chunk (bytes): The compressed chunk.
+            chunk_size (int): The size of the chunk data.
+            checksum (int, optional): The CRC32 of the chunk data (of
+            chunks checksummed in worker processes).
+            entry_checksum (int, optional): The CRC32 of the entry data up
+            to the end of the chunk, when it is already known (so the chunk
+            checksum is not combined into the one of the entry).
+        """
+        self._stored_chunks[digest] = (
+            self._output_file.tell() if self._output_file else 0
+        )
+        self.write_length(length=len(compressed_chunk) << 1)
+        self.write_output(compressed_chunk)
+        self.add_chunk_checksum(
+            chunk_size=chunk_size, checksum=checksum,
+            entry_checksum=entry_checksum)
+
+    def write_chunk_reference(
+        self, digest: bytes, chunk_size: int, checksum: Optional[int] = None,
+        entry_checksum: Optional[int] = None
+    ) -> None:
+        """Refer to a chunk stored earlier in the archive from the chunk
+        list entry being written.
+
+        Args:
+            digest (bytes): The digest of the chunk data.
+            chunk_size (int): The size of the chunk data.
+            checksum (int, optional): The CRC32 of the chunk data (of
+            chunks checksummed in worker processes).
+            entry_checksum (int, optional): The CRC32 of the entry data up
+            to the end of the chunk, when it is already known (so the chunk
+            checksum is not combined into the one of the entry).
+        """
+        self.write_length(length=self._stored_chunks[digest] << 1 | 1)
+        self.add_chunk_checksum(
+            chunk_size=chunk_size, checksum=checksum,
+            entry_checksum=entry_checksum)
+
+    def write_solid_blocks(self) -> None:
+        """Write the files waiting to be written in solid blocks, ordered
+        by their extensions (so similar files share a block and give the
+        codec more context) and split into blocks of up to the solid block
+        size.
+
+        Raises:
+            InvalidDataForCompressionAlgorithem: If the files of a block
+            could not be compressed.
+        """
+        solid_files = sorted(self._solid_files, key=lambda solid_file: (
+            os.path.splitext(solid_file[1])[1].lower(), solid_file[1]
+        ))
+        self._solid_files = []
+        block: List[Tuple[bytes, str, int]] = []
+        block_size = 0
+        for solid_file in solid_files:
+            if block and block_size + solid_file[2] > self._solid_block_size:
+                self.write_solid_block(block=block)
+                block = []
+                block_size = 0
+            block.append(solid_file)
+            block_size += solid_file[2]
+        if block:
+            self.write_solid_block(block=block)
+
+    def write_solid_block(self, block: List[Tuple[bytes, str, int]]) -> None:
+        """Compress the files of a solid block as one stream and write
+        their entries - while compressing in worker processes the block is
+        queued, so blocks are compressed concurrently.
+
+        Args:
+            block (list): The archive paths, paths and sizes of the files.
+
+        Raises:
+            InvalidDataForCompressionAlgorithem: If the files could not be
+            compressed.
+        """
+        paths = [path for path, _, _ in block]
+        file_paths = [file_path for _, file_path, _ in block]
+        if self._entries_queue is not None:
+            self.queue_entry(
+                (file_paths[0], partial(self.write_solid_entries, paths)),
+                compress_block_task,
+                file_paths,
+            )
+            return
+
+        files_data = []
+        file_path = file_paths[0]
+        try:
+            for file_path in file_paths:
+                files_data.append(self.read_file(file=file_path))
+            compressed_block = self._compression_algorithem.compress_data(
+                data=b"".join(files_data)
+            )
+        except Exception:
+            raise self.get_invalid_data_exception(full_dir_path=file_path)
+        self.write_solid_entries(
+            paths=paths,
+            compressed_block=compressed_block,
+            sizes=[len(data) for data in files_data],
+            checksums=[zlib.crc32(data) for data in files_data],
+        )
+
+    def write_solid_entries(
+        self,
+        paths: List[bytes],
+        compressed_block: Union[bytes, memoryview],
+        sizes: List[int],
+        checksums: List[int],
+    ) -> None:
+        """Write the entries of the files of a solid block - the first
+        entry stores the compressed block and the next entries refer to
+        it.
+
+        Args:
+            paths (list): The archive paths of the files.
+            compressed_block (bytes | memoryview): The compressed block.
+            sizes (list): The sizes of the files data.
+            checksums (list): The CRC32 of the files data.
+        """
+        block_offset = None
+        start = 0
+        for path, size, checksum in zip(paths, sizes, checksums):
+            offset = self._output_file.tell() if self._output_file else 0
+            self.write_output(bytes([EntryFlags.SOLID]))
+            self.write_path(path=path)
+            if block_offset is None:
+                block_offset = (
+                    self._output_file.tell() if self._output_file else 0
+                )
+                self.write_length(length=len(compressed_block) << 1)
+                self.write_output(compressed_block)
+            else:
+                self.write_length(length=block_offset << 1 | 1)
+            self.write_length(length=start)
+            self.write_length(length=size)
+            self.add_index_entry(
+                path=path,
+                offset=offset,
+                uncompressed_size=size,
+                checksum=checksum,
+                flags=EntryFlags.SOLID,
+            )
+            start += size
+
+    def add_manifest_entry(
+        self, path: str, file_path: str, is_dir: bool = False
+    ) -> bool:
+        """Add a file to the manifest of the output file, checking whether
+        it changed since the base archive. A file with the size and the
+        modification time of the base archive is not read at all - the
+        content of other files is hashed and compared.
+
+        Args:
+            path (str): The archive path of the file.
+            file_path (str): The path of the file.
+            is_dir (bool, optional): Whether it is an empty directory.
+            Defaults to False.
+
+        Returns:
+            bool: True if the file changed (or is new) and its entry must
+            be written, False otherwise.
+        """
+        base_entry = self._base_manifest.get(path)
+        stat = os.stat(file_path)
+        entry = ManifestEntry(path=path, mtime=max(stat.st_mtime_ns, 0))
+        self._central_directory.manifest.entries.append(entry)
+        if is_dir:
+            return base_entry is None
+
+        entry.size = stat.st_size
+        if (
+            base_entry is not None
+            and base_entry.size == entry.size
+            and base_entry.mtime == entry.mtime
+        ):
+            entry.content_hash = base_entry.content_hash
+            return False
+
+        if file_path not in self._files_hashes:
+            self._files_hashes[file_path] = hash_file_task(file_path)
+        entry.content_hash = self._files_hashes[file_path]
+        return (
+            base_entry is None
+            or base_entry.size != entry.size
+            or base_entry.content_hash != entry.content_hash
+        )
+
+    def add_index_entry(
+        self,
+        path: bytes,
+        offset: int,
+        uncompressed_size: int,
+        checksum: int,
+        flags: EntryFlags = EntryFlags.NONE,
+    ) -> None:
+        """Add an entry which was just written to the output file to the
+        central directory (if the output file has one), with the CRC32 of
+        its record.
+
+        Args:
+            path (bytes): The path of the entry.
+            offset (int): The offset of the entry record.
+            uncompressed_size (int): The size of the file data.
+            checksum (int): The CRC32 of the file data.
+            flags (EntryFlags, optional): The entry flags.
+            Defaults to EntryFlags.NONE.
+        """
+        record_checksum = self._record_checksum
+        self._record_checksum = 0
+        if self._central_directory is None or not self._output_file:
+            return
+
+        entry = IndexEntry(
+            path=path.decode(),
+            offset=offset,
+            compressed_size=self._output_file.tell() - offset,
+            uncompressed_size=uncompressed_size,
+            checksum=checksum,
+            codec_id=self._compression_algorithem.codec_id,
+            codec_parameters=self._compression_algorithem.get_metadata(),
+            flags=flags,
+            record_checksum=record_checksum,
+        )
+        self._central_directory.entries.append(entry)
+        if self._deduplicate:
+            self._written_entries[path] = entry
+
+    def get_decompressed_data(
+        self, compressed_data: Union[bytes, memoryview], index: int = 0
+    ) -> Tuple[bytes, int]:
+        """Get decompressed data from compressed data.
+
+        Args:
+            compressed_data (bytes | memoryview): The compressed data.
+            index (int, optional): The index to start reading from in the
+            compressed data. Defaults to 0.
+
+        Returns:
+            Tuple[bytes, int]: The decompressed data and the next index
+            in the compressed data.
+        """
+        view = memoryview(compressed_data)
+        compressed_len, start_index = self.read_length(
+            compressed_data=view, index=index
+        )
+        next_index = start_index + compressed_len
+        if next_index > len(view):
+            raise InvalidArchiveFormat("Truncated archive entry.")
+        decompress_data = self._compression_algorithem.decompress_data(
+            compressed_data=view[start_index:next_index]
+        )
+
+        return decompress_data, next_index
+
+    def define_compression_algorithem(self, header: ArchiveHeader) -> None:
+        """Define the compression algorithm based on the archive header.
+
+        The codec id is resolved with a single lookup in the codecs
+        registry.
+
+        Args:
+            header (ArchiveHeader): The archive header holding the codec id
+            and the codec parameters.
+
+        Raises:
+            InvalidCompressionAlgorithem: If the codec id is unknown.
+        """
+        self.set_compression_algorithem(
+            compression_algorithem=self.get_header_codec(header=header)
+        )
+
+    @staticmethod
+    def get_header_codec(header: ArchiveHeader) -> DataCompression:
+        """Get the compression algorithm of an archive header.
+
+        Args:
+            header (ArchiveHeader): The archive header holding the codec id
+            and the codec parameters.
+
+        Returns:
+            DataCompression: The compression algorithm.
+
+        Raises:
+            InvalidCompressionAlgorithem: If the codec id is unknown.
+        """
+        algo_class = CODECS_REGISTRY.get(header.codec_id)
+        if algo_class is None:
+            raise InvalidCompressionAlgorithem(
+                f"Invalid compression format - unknown codec id "
+                f"{header.codec_id}!"
+            )
+
+        return algo_class.from_metadata(metadata=header.codec_parameters)
+
+    def get_path_codec(
+        self, header: ArchiveHeader
+    ) -> Optional[DataCompression]:
+        """Get the compression algorithm of the path table of an archive.
+
+        Args:
+            header (ArchiveHeader): The archive header.
+
+        Returns:
+            DataCompression | None: The compression algorithm (None for
+            archives without a path table).
+        """
+        if not header.flags & ArchiveFlags.PATH_TABLE:
+            return None
+        return self.get_header_codec(header=header)
+
+    def write_metadata(self) -> None:
+        """Write the archive header (format version, feature flags and
+        compression algorithm) to the output file. The manifest of the base
+        archive is loaded when a delta archive is written.
+
+        Raises:
+            InvalidArchiveFormat: If the base archive has no manifest.
+        """
+        flags = ArchiveFlags.NONE
+        if self._varint_framing:
+            flags |= ArchiveFlags.VARINT_FRAMING
+            flags |= ArchiveFlags.CENTRAL_DIRECTORY
+            flags |= ArchiveFlags.CHUNKED_ENTRIES
+            flags |= ArchiveFlags.RECORD_CHECKSUMS
+            flags |= ArchiveFlags.PATH_TABLE
+            if self._deduplicate:
+                flags |= ArchiveFlags.REFERENCE_ENTRIES
+            if self._content_chunker is not None:
+                flags |= ArchiveFlags.CHUNK_LISTS
+            if self._solid_block_size is not None:
+                flags |= ArchiveFlags.SOLID_BLOCKS
+            self._central_directory = CentralDirectory(record_checksums=True)
+            if self._incremental:
+                flags |= ArchiveFlags.MANIFEST
+                self._central_directory.manifest = self.load_base_manifest()
+        self._reference_entries = bool(
+            flags & ArchiveFlags.REFERENCE_ENTRIES
+        )
+        self._chunk_list_entries = bool(flags & ArchiveFlags.CHUNK_LISTS)
+        self._solid_blocks = bool(flags & ArchiveFlags.SOLID_BLOCKS)
+        self._path_table = bool(flags & ArchiveFlags.PATH_TABLE)
+        if self._path_table:
+            self._central_directory.path_codec = self._compression_algorithem
+        header = ArchiveHeader(
+            codec_id=self._compression_algorithem.codec_id,
+            codec_parameters=self._compression_algorithem.get_metadata(),
+            flags=flags,
+        )
+        if self._output_file:
+            self._output_file.write(header.to_bytes())
+        self._archive_header = header
+        self._record_checksum = 0
+
+    def load_base_manifest(self) -> Manifest:
+        """Load the manifest of the base archive (if any) and create the
+        manifest of the output file, which refers to the base archive by
+        its path relative to the output file and by its manifest digest.
+
+        Returns:
+            Manifest: The empty manifest of the output file.
+
+        Raises:
+            InvalidArchiveFormat: If the base archive has no manifest.
+        """
+        self._base_manifest = {}
+        if self._base_archive_path is None:
+            return Manifest()
+
+        _, directory, _ = self.read_archive_index(
+            archive_path=self._base_archive_path
+        )
+        if directory is None or directory.manifest is None:
+            raise InvalidArchiveFormat(
+                f"The base archive {self._base_archive_path} has no "
+                f"manifest."
+            )
+        self._base_manifest = {
+            entry.path: entry for entry in directory.manifest.entries
+        }
+        output_dir = os.path.dirname(os.path.abspath(self._output_file.name))
+        return Manifest(
+            base_path=os.path.relpath(
+                os.path.abspath(self._base_archive_path), output_dir
+            ),
+            base_digest=directory.manifest.digest(),
+        )
+
+    def read_metadata(
+        self, compressed_data: Union[bytes, memoryview], index: int = 0
+    ) -> Tuple[ArchiveHeader, int]:
+        """Read the archive header from compressed data.
+
+        Args:
+            compressed_data (bytes | memoryview): The compressed data.
+            index (int, optional): The index to start reading from in the
+            compressed data. Defaults to 0.
+
+        Returns:
+            Tuple[ArchiveHeader, int]: The archive header and the next
+            index in the compressed data.
+        """
+        return ArchiveHeader.from_bytes(
+            data=memoryview(compressed_data), index=index
+        )
+
+    def apply_metadata(self, header: ArchiveHeader) -> None:
+        """Set the compression algorithm and the framing mode according
+        to the archive header.
+
+        Args:
+            header (ArchiveHeader): The archive header.
+        """
+        self.define_compression_algorithem(header=header)
+        self._varint_framing = bool(
+            header.flags & ArchiveFlags.VARINT_FRAMING
+        )
+        self._chunked_entries = bool(
+            header.flags & ArchiveFlags.CHUNKED_ENTRIES
+        )
+        self._reference_entries = bool(
+            header.flags & ArchiveFlags.REFERENCE_ENTRIES
+        )
+        self._chunk_list_entries = bool(
+            header.flags & ArchiveFlags.CHUNK_LISTS
+        )
+        self._solid_blocks = bool(header.flags & ArchiveFlags.SOLID_BLOCKS)
+        self._read_files = {}
+        self._expected_checksums = {}
+        self._removed_records = {}
+        self._solid_block = None
+        self._path_table = bool(header.flags & ArchiveFlags.PATH_TABLE)
+
+    def expect_entries(
+        self, directory: Optional[CentralDirectory]
+    ) -> None:
+        """Keep the sizes and CRC32 of the file data of the entries of the
+        archive being read, so every entry is verified when it is read,
+        and the records of its removed entries, so they are skipped (and
+        the paths of its entries, for archives with a path table).
+
+        Args:
+            directory (CentralDirectory | None): The central directory of
+            the archive (None for archives without one).
+        """
+        if directory is None:
+            self._expected_checksums = {}
+            self._removed_records = {}
+            self._entries_paths = {}
+            return
+
+        self._entries_paths = {
+            entry.offset: entry.path for entry in directory.entries
+        } if directory.path_codec is not None else {}
+        self._expected_checksums = {
+            entry.offset: (entry.uncompressed_size, entry.checksum)
+            for entry in directory.entries
+        }
+        self._removed_records = {
+            entry.offset: entry.compressed_size
+            for entry in directory.removed_entries + directory.replaced_indexes
+        }
+
+    def load_archive_index(
+        self, archive_path: str
+    ) -> Tuple[
+        ArchiveHeader, Optional[CentralDirectory], Optional[ArchiveFooter]
+    ]:
+        """Load the header and the central directory of an archive (see
+        read_archive_index()), set the compression algorithm according to
+        the header and keep the checksums of the entries.
+
+        Args:
+            archive_path (str): Path to the archive.
+
+        Returns:
+            Tuple[ArchiveHeader, CentralDirectory | None,
+            ArchiveFooter | None]: The archive header, central directory
+            and footer (None for archives without a central directory).
+
+        Raises:
+            InvalidArchiveFormat: If the archive header or footer is
+            not valid.
+        """
+        header, directory, footer = self.read_archive_index(
+            archive_path=archive_path
+        )
+        self.apply_metadata(header=header)
+        self.expect_entries(directory=directory)
+
+        return header, directory, footer
+
+    def read_archive_index(
+        self, archive_path: str
+    ) -> Tuple[
+        ArchiveHeader, Optional[CentralDirectory], Optional[ArchiveFooter]
+    ]:
+        """Read the header and the central directory of an archive,
+        reading only the header, the footer and the directory itself.
+
+        Args:
+            archive_path (str): Path to the archive.
+
+        Returns:
+            Tuple[ArchiveHeader, CentralDirectory | None,
+            ArchiveFooter | None]: The archive header, central directory
+            and footer (None for archives without a central directory).
+
+        Raises:
+            InvalidArchiveFormat: If the archive header or footer is
+            not valid.
+        """
+        with open(archive_path, "rb") as f:
+            header, data_start = self.read_metadata(
+                compressed_data=f.read(len(ARCHIVE_MAGIC) + 4 + 255)
+            )
+            if not header.flags & ArchiveFlags.CENTRAL_DIRECTORY:
+                return header, None, None
+
+            archive_size = f.seek(0, os.SEEK_END)
+            if archive_size < data_start + ArchiveFooter.SIZE:
+                raise InvalidArchiveFormat("Truncated archive.")
+            f.seek(archive_size - ArchiveFooter.SIZE)
+            footer = ArchiveFooter.from_bytes(data=f.read(ArchiveFooter.SIZE))
+            if (
+                footer.index_offset < data_start
+                or footer.index_offset + footer.index_length
+                > archive_size - ArchiveFooter.SIZE
+            ):
+                raise InvalidArchiveFormat("Invalid central directory.")
+            f.seek(footer.index_offset)
+            directory = CentralDirectory.from_bytes(
+                data=f.read(footer.index_length),
+                record_checksums=bool(
+                    header.flags & ArchiveFlags.RECORD_CHECKSUMS
+                ),
+                path_codec=self.get_path_codec(header=header),
+            )
+
+        return header, directory, footer
+
+    def read_central_directory(
+        self, compressed_data: Union[bytes, memoryview]
+    ) -> Optional[CentralDirectory]:
+        """Read the central directory of a whole archive data (e.g. a mapped
+        archive).
+
+        Args:
+            compressed_data (bytes | memoryview): The whole archive data.
+
+        Returns:
+            CentralDirectory | None: The central directory (None for
+            archives without one).
+        """
+        view = memoryview(compressed_data)
+        header, _ = self.read_metadata(compressed_data=view)
+        if not header.flags & ArchiveFlags.CENTRAL_DIRECTORY:
+            return None
+
+        footer = ArchiveFooter.from_bytes(data=view[-ArchiveFooter.SIZE:])
+        return CentralDirectory.from_bytes(
+            data=view[
+                footer.index_offset:footer.index_offset + footer.index_length
+            ],
+            record_checksums=bool(
+                header.flags & ArchiveFlags.RECORD_CHECKSUMS
+            ),
+            path_codec=self.get_path_codec(header=header),
+        )
+
+    def get_entries_data(
+        self, compressed_data: Union[bytes, memoryview]
+    ) -> memoryview:
+        """Get the part of an archive which holds the entries, without the
+        central directory and footer at its end.
+
+        Args:
+            compressed_data (bytes | memoryview): The whole archive data.
+
+        Returns:
+            memoryview: The archive data up to the central directory.
+        """
+        view = memoryview(compressed_data)
+        header, _ = self.read_metadata(compressed_data=view)
+        if header.flags & ArchiveFlags.CENTRAL_DIRECTORY:
+            footer = ArchiveFooter.from_bytes(data=view[-ArchiveFooter.SIZE:])
+            return view[:footer.index_offset]
+
+        return view
+
+    def compress_with_error(
+            self, should_remove_output: bool, exception_type: Exception) -> str:
+        """
+        Handles compression errors and raises exceptions.
+
+        Parameters:
+        - should_remove_output (bool): Whether to remove the output file 
+        if an error occurs.
+        - exception_type (Exception): The type of exception to raise 
+        (default: Exception).
+        - aborted_msg (str): The error message to use if no message
+          is provided (default: '').
+        - full_dir_path (str): The full directory path related to the 
+        compression operation (default: '').
+
+        Returns:
+            str: invalid data for compression exception.
+
+        Notes:
+        - If should_remove_output is True, the output file will be 
+        removed if an error occurs.
+        - exception_type will be printed.
+        """
+        if should_remove_output:
+            self.discard_output_file()
+        else:
+            self.close_output_file()
+
+        return f"{type(exception_type).__name__}({exception_type})"
+
+    def compress(
+        self,
+        directories: List[str],
+        subfolder: str = "",
+        ignore_folders: List[str] = [],
+        ignore_files: List[str] = [],
+        ignore_extensions: List[str] = [],
+        init_compression: bool = False,
+        remove_output: bool = True,
+    ) -> Union[str, None]:
+        """Compress files and directories recursively.
+
+        Args:
+            directories (list): List of directories to compress.
+            subfolder (str, optional): Subfolder path. Defaults to ''.
+            ignore_folders (list, optional): List of folders to ignore.
+            Defaults to [].
+            ignore_files (list, optional): List of files to ignore.
+            Defaults to [].
+            ignore_extensions (list, optional): List of file extensions
+            to ignore. Defaults to [].
+            init_compression (bool, optional): Whether it's the initial
+            compression operation. Defaults to False.
+            remove_output (bool, optional): Whether an error occured,
+            option to remove the output path. Defaults to True.
+
+        Returns:
+            str | None: exception as string or None
+        """
+        if init_compression:
+            try:
+                self.write_metadata()
+            except (InvalidArchiveFormat, OSError) as e:
+                return self.compress_with_error(
+                    should_remove_output=remove_output, exception_type=e
+                )
+
+        if self._workers > 1 and self._entries_queue is None:
+            return self.compress_in_workers(
+                directories=directories,
+                subfolder=subfolder,
+                ignore_folders=ignore_folders,
+                ignore_files=ignore_files,
+                ignore_extensions=ignore_extensions,
+                remove_output=remove_output,
+            )
+
+        ignore_folders = [os.path.normpath(path) for path in ignore_folders]
+        # pass on each given directory
+        for dir in directories:
+            full_dir_path = os.path.join(subfolder, dir)
+            # if it is directory to folder
             if os.path.isdir(full_dir_path):
 
-                if os.path.normpath(full_dir_path) not in ignore_folders:
+                if os.path.normpath(full_dir_path) not in ignore_folders:
+
+                    files_in_folder = os.listdir(full_dir_path)
+                    # if it is an empty folder, compress full folder path name
+                    # (only if it is new while writing a delta archive)
+                    if len(files_in_folder) == 0 and (
+                        self._central_directory is None
+                        or self._central_directory.manifest is None
+                        or self.add_manifest_entry(
+                            path=full_dir_path + self._folder_suffix,
+                            file_path=full_dir_path,
+                            is_dir=True,
+                        )
+                    ):
+                        full_dir_path += self._folder_suffix
+                        if self._entries_queue is None:
+                            self.write_entry(
+                                path=full_dir_path.encode(),
+                                flags=EntryFlags.DIRECTORY,
+                            )
+                        else:
+                            self.queue_entry((full_dir_path, partial(
+                                self.write_entry,
+                                full_dir_path.encode(),
+                                b"",
+                                EntryFlags.DIRECTORY,
+                            )))
+
+                    # compress recursive the files which inside the directory to current folder
+                    invalid = self.compress(
+                        directories=files_in_folder,
+                        subfolder=full_dir_path,
+                        ignore_files=ignore_files,
+                        ignore_extensions=ignore_extensions,
+                        ignore_folders=ignore_folders,
+                    )
+
+                    if invalid:
+                        return invalid
+
+            # if it is directory to file
+            elif os.path.isfile(full_dir_path):
+
+                if (
+                    full_dir_path not in ignore_files
+                    and not full_dir_path.endswith(tuple(ignore_extensions))
+                ):
+                    file_path = full_dir_path.encode()
+
+                    exception_type = self.get_invalid_data_exception(
+                                full_dir_path=full_dir_path)
+
+                    try: 
+                        # compress full file path name and file data
+                        self.write_file_entry(
+                            path=file_path, file_path=full_dir_path)
+                    except InvalidDataForCompressionAlgorithem as e:
+                        # a queued entry (of another file) failed
+                        return self.compress_with_error(
+                            should_remove_output=remove_output,
+                            exception_type=e
+                        )
+                    except Exception:
+                        return self.compress_with_error(
+                            should_remove_output=remove_output,
+                            exception_type=exception_type
+                        )
+
+            else:
+                aborted_msg = f"Error - {full_dir_path} does not exist."
+                return self.compress_with_error(
+                    should_remove_output=remove_output, 
+                    exception_type=MissingInputPath(aborted_msg),
+                    )
+
+        # the solid blocks are written once all the files were found
+        if not subfolder and self._solid_files:
+            try:
+                self.write_solid_blocks()
+            except InvalidDataForCompressionAlgorithem as e:
+                return self.compress_with_error(
+                    should_remove_output=remove_output, exception_type=e
+                )
+            
+        return None     
+                
+    def compress_in_workers(
+        self,
+        directories: List[str],
+        subfolder: str = "",
+        ignore_folders: List[str] = [],
+        ignore_files: List[str] = [],
+        ignore_extensions: List[str] = [],
+        remove_output: bool = True,
+    ) -> Union[str, None]:
+        """Compress files and directories recursively, reading and
+        compressing the files in a pool of worker processes while the
+        current process writes the finished entries in the order they
+        were found - so the archive is the same as a serial compression.
+        At most two entries per worker are in flight, so the memory in
+        use is bounded by the chunk size and the number of workers. The
+        compressed data is handed over through shared memory segments.
+
+        Args:
+            directories (list): List of directories to compress.
+            subfolder (str, optional): Subfolder path. Defaults to ''.
+            ignore_folders (list, optional): List of folders to ignore.
+            Defaults to [].
+            ignore_files (list, optional): List of files to ignore.
+            Defaults to [].
+            ignore_extensions (list, optional): List of file extensions
+            to ignore. Defaults to [].
+            remove_output (bool, optional): Whether an error occured,
+            option to remove the output path. Defaults to True.
+
+        Returns:
+            str | None: exception as string or None
+        """
+        with ExitStack() as stack:
+            self._shared_buffers = self.create_shared_buffers()
+            stack.callback(self.close_shared_buffers)
+            executor = stack.enter_context(ProcessPoolExecutor(
+                max_workers=self._workers,
+                initializer=init_worker,
+                initargs=(
+                    self._compression_algorithem.codec_id,
+                    self._compression_algorithem.get_metadata(),
+                ),
+            ))
+            self._entries_queue = OrderedTaskQueue(
+                executor=executor, max_in_flight=2 * self._workers
+            )
+            try:
+                invalid = self.compress(
+                    directories=directories,
+                    subfolder=subfolder,
+                    ignore_folders=ignore_folders,
+                    ignore_files=ignore_files,
+                    ignore_extensions=ignore_extensions,
+                    remove_output=remove_output,
+                )
+                while not invalid and len(self._entries_queue):
+                    try:
+                        self.write_queued_entry(*self._entries_queue.get())
+                    except InvalidDataForCompressionAlgorithem as e:
+                        invalid = self.compress_with_error(
+                            should_remove_output=remove_output,
+                            exception_type=e,
+                        )
+            finally:
+                self._entries_queue.cancel()
+                self._entries_queue = None
+
+        return invalid
+
+    def create_shared_buffers(self) -> SharedBuffers:
+        """Create the shared memory segments worker processes hand their
+        results over through - a segment per task in flight, big enough
+        for a (slightly expanded) compressed chunk or solid block.
+
+        Returns:
+            SharedBuffers: The shared memory segments.
+        """
+        max_size = max(self._chunk_size, self._solid_block_size or 0)
+        return SharedBuffers(
+            slots_num=2 * self._workers,
+            slot_size=max_size + (max_size >> 3),
+        )
+
+    def close_shared_buffers(self) -> None:
+        """Close and unlink the shared memory segments."""
+        if self._shared_buffers is not None:
+            self._shared_buffers.close()
+            self._shared_buffers = None
+
+    def get_invalid_data_exception(self, full_dir_path: str) -> Exception:
+        """Returns invalid data for compression exception according
+        to the full dir path.
+
+        Args:
+            full_dir_path (str): Path to the compressed file.
+
+        Returns:
+            Exception: invalid data for compression exception.
+        """
+        algo_name = self.get_compression_algorithem_name()
+        aborted_msg = f"Could not compress {full_dir_path} "
+        aborted_msg += f"using {algo_name}."
+        return InvalidDataForCompressionAlgorithem(aborted_msg)
+
+    def should_stop(
+        self, compressed_file_path: str = "", compressed_data: bytes = b""
+    ) -> bool:
+        """Check if the compression or decompression process should stop.
+
+        Args:
+            compressed_file_path (str, optional): Path to the compressed file.
+            Defaults to ''.
+            compressed_data (bytes, optional): Compressed data.
+            Defaults to b''.
+
+        Returns:
+            bool: True if the process should stop, False otherwise.
+        """
+
+        # if compressed_data is empty & compressed file path was not inserted
+        if compressed_data == b"" and not compressed_file_path:
+            return True
+        return False
+
+    def should_read_compressed_file(
+        self, compressed_file_path: str = "", compressed_data: bytes = b""
+    ) -> bool:
+        """Check if a compressed file should be read.
+
+        Args:
+            compressed_file_path (str, optional): Path to the compressed file.
+            Defaults to ''.
+            compressed_data (bytes, optional): Compressed data.
+            Defaults to b''.
+
+        Returns:
+            bool: True if the compressed file should be read, False otherwise.
+        """
+        # if compressed_data is empty and compressed file path was inserted
+        if compressed_data == b"" and compressed_file_path:
+            return True
+        return False
+
+    def handle_init_decompression(
+        self,
+        compressed_data: bytes,
+        view_mode: bool = False,
+        debug_mode: bool = False,
+        compressed_file_path: str = "",
+    ) -> int:
+        """Handle initialization for decompression - apply the archive
+        header and keep the entries of its central directory (see
+        expect_entries()).
+
+        Args:
+            compressed_data: The whole archive data.
+            view_mode (bool, optional): Whether to display the decompression
+            mode. Defaults to False.
+            debug_mode (bool, optional): Whether to enable debug mode.
+            Defaults to False.
+            compressed_file_path (str, optional): Path to the compressed file.
+            Defaults to ''.
+
+        Returns:
+            int: The next index in the compressed data.
+        """
+        # get the archive header from compressed data
+        header, next_index = self.read_metadata(
+            compressed_data=compressed_data
+        )
+        self.apply_metadata(header=header)
+        self.expect_entries(directory=self.read_central_directory(
+            compressed_data=compressed_data
+        ))
+        if view_mode and not debug_mode:
+            algo_name = self.get_compression_algorithem_name()
+            msg = f"{compressed_file_path} - [{algo_name}] "
+            msg += "compressed file contains:"
+            print(msg)
+
+        return next_index
+
+    def read_entry(
+        self,
+        compressed_data: memoryview,
+        index: int = 0,
+        read_data: bool = True,
+        output_path: Optional[str] = None,
+        keep_data: bool = True,
+    ) -> Tuple[IndexEntry, bytes]:
+        """Read the archive entry record that starts at the given index.
+
+        Args:
+            compressed_data (memoryview): The archive entries data.
+            index (int, optional): The index of the entry record.
+            Defaults to 0.
+            read_data (bool, optional): Whether to decompress the file
+            data, or only skip it using its length prefix.
+            Defaults to True.
+            output_path (str, optional): When given, the file data is
+            written piece by piece to the entry path inside the output
+            path instead of being returned. Defaults to None.
+            keep_data (bool, optional): Whether to return the file data,
+            or only decompress it (to validate it). Defaults to True.
+
+        Returns:
+            Tuple[IndexEntry, bytes]: The entry (with the record offset and
+            size) and the file data (b'' for folders or when the data was
+            not read, written or not kept).
+
+        Raises:
+            InvalidArchiveFormat: If the entry record is truncated.
+            ChecksumMismatch: If the file data does not match the checksum
+            in the central directory.
+        """
+        offset = index
+        flags = EntryFlags.NONE
+        if self._varint_framing:
+            flags = EntryFlags(compressed_data[index])
+            index += 1
+
+        # get full file path from compressed data
+        path, index = self.read_path(
+            compressed_data=compressed_data, index=index, offset=offset
+        )
+        file_name = path.decode()
+
+        file_data = b""
+        uncompressed_size = 0
+        checksum = 0
+        file = None
+        if output_path is not None and file_name:
+            file = os.path.join(output_path, file_name)
+        # if path presents a file
+        if not (flags & EntryFlags.DIRECTORY or (
+            not self._varint_framing
+            and file_name.endswith(self._folder_suffix)
+        )):
+            data_index = index
+            index = self.skip_file_data(
+                compressed_data=compressed_data, index=index, flags=flags
+            )
+            if read_data and flags & EntryFlags.REFERENCE:
+                target_offset, _ = decode_varint(
+                    data=compressed_data, index=data_index
+                )
+                file_data, uncompressed_size, checksum = self.read_reference(
+                    compressed_data=compressed_data,
+                    offset=offset,
+                    target_offset=target_offset,
+                    file=file,
+                    keep_data=keep_data,
+                )
+            elif read_data:
+                file_data, uncompressed_size, checksum = self.read_file_data(
+                    compressed_data=compressed_data,
+                    index=data_index,
+                    flags=flags,
+                    file=file,
+                    keep_data=keep_data,
+                )
+            if read_data:
+                self.verify_checksum(
+                    path=file_name,
+                    offset=offset,
+                    uncompressed_size=uncompressed_size,
+                    checksum=checksum,
+                    file=file,
+                )
+                if self._reference_entries \
+                        and not flags & EntryFlags.REFERENCE:
+                    self._read_files[offset] = (
+                        file, uncompressed_size, checksum
+                    )
+        elif file is not None:
+            self.write_file(file=file, data=b"")
+
+        entry = IndexEntry(
+            path=file_name,
+            offset=offset,
+            compressed_size=index - offset,
+            uncompressed_size=uncompressed_size,
+            checksum=checksum,
+            codec_id=self._compression_algorithem.codec_id,
+            flags=flags,
+        )
+        return entry, file_data
+
+    def verify_checksum(
+        self,
+        path: str,
+        offset: int,
+        uncompressed_size: int,
+        checksum: int,
+        file: Optional[str] = None,
+    ) -> None:
+        """Verify the size and CRC32 of the file data of an entry against
+        the central directory of the archive being read (entries of
+        archives without a central directory are not verified). The file
+        the data was written to is removed if it does not match.
+
+        Args:
+            path (str): The path of the entry.
+            offset (int): The offset of the entry record.
+            uncompressed_size (int): The size of the file data.
+            checksum (int): The CRC32 of the file data.
+            file (str, optional): The file the data was written to.
+            Defaults to None.
+
+        Raises:
+            ChecksumMismatch: If the file data does not match.
+        """
+        expected = self._expected_checksums.get(offset)
+        if expected is None or expected == (uncompressed_size, checksum):
+            return
+
+        if file is not None and os.path.isfile(file):
+            os.remove(file)
+        raise ChecksumMismatch(
+            f"The data of {path} does not match its checksum."
+        )
+
+    def read_file_data(
+        self,
+        compressed_data: memoryview,
+        index: int,
+        flags: EntryFlags,
+        file: Optional[str] = None,
+        keep_data: bool = True,
+    ) -> Tuple[bytes, int, int]:
+        """Decompress the file data of an entry, writing it to a file
+        piece by piece, keeping it or only validating it.
+
+        Args:
+            compressed_data (memoryview): The archive entries data.
+            index (int): The index of the file data.
+            flags (EntryFlags): The entry flags.
+            file (str, optional): The file the data is written to.
+            Defaults to None (the data is not written).
+            keep_data (bool, optional): Whether to return the data (when it
+            is not written). Defaults to True.
+
+        Returns:
+            Tuple[bytes, int, int]: The file data (b'' when it was written
+            or not kept), its size and its CRC32.
+        """
+        pieces = self.iter_file_data(
+            compressed_data=compressed_data, index=index, flags=flags
+        )
+        if file is not None:
+            uncompressed_size, checksum = self.write_file_pieces(
+                file=file, pieces=pieces
+            )
+            return b"", uncompressed_size, checksum
+        if keep_data:
+            file_data = b"".join(pieces)
+            return file_data, len(file_data), zlib.crc32(file_data)
+
+        uncompressed_size = 0
+        checksum = 0
+        for piece in pieces:
+            uncompressed_size += len(piece)
+            checksum = zlib.crc32(piece, checksum)
+
+        return b"", uncompressed_size, checksum
+
+    def read_reference(
+        self,
+        compressed_data: memoryview,
+        offset: int,
+        target_offset: int,
+        file: Optional[str] = None,
+        keep_data: bool = True,
+    ) -> Tuple[bytes, int, int]:
+        """Read the file data of a reference entry - the data of the entry
+        it refers to. The data is decompressed once: a file which was
+        already written is copied and a file which was already validated
+        is not decompressed again.
+
+        Args:
+            compressed_data (memoryview): The archive entries data.
+            offset (int): The offset of the reference entry.
+            target_offset (int): The offset of the entry it refers to.
+            file (str, optional): The file the data is written to.
+            Defaults to None (the data is not written).
+            keep_data (bool, optional): Whether to return the data (when it
+            is not written). Defaults to True.
+
+        Returns:
+            Tuple[bytes, int, int]: The file data (b'' when it was written
+            or not kept), its size and its CRC32.
+
+        Raises:
+            InvalidArchiveFormat: If the reference does not refer to an
+            earlier file entry.
+        """
+        # references refer to earlier entries only, so they never loop
+        if target_offset >= offset:
+            raise InvalidArchiveFormat("Invalid reference entry.")
+
+        read_file = self._read_files.get(target_offset)
+        if read_file is not None:
+            target_file, uncompressed_size, checksum = read_file
+            if file is None and not keep_data:
+                return b"", uncompressed_size, checksum
+            if target_file is not None and file is not None:
+                sub_directories = os.path.dirname(file)
+                if sub_directories:
+                    os.makedirs(sub_directories, exist_ok=True)
+                shutil.copyfile(target_file, file)
+                return b"", uncompressed_size, checksum
+            if target_file is not None:
+                return (
+                    self.read_file(file=target_file),
+                    uncompressed_size,
+                    checksum,
+                )
+
+        target_flags = EntryFlags(compressed_data[target_offset])
+        if target_flags & (EntryFlags.DIRECTORY | EntryFlags.REFERENCE):
+            raise InvalidArchiveFormat("Invalid reference entry.")
+        # skip the path of the entry it refers to
+        index = self.skip_path(
+            compressed_data=compressed_data, index=target_offset + 1
+        )
+        file_data, uncompressed_size, checksum = self.read_file_data(
+            compressed_data=compressed_data,
+            index=index,
+            flags=target_flags,
+            file=file,
+            keep_data=keep_data,
+        )
+        self._read_files[target_offset] = (file, uncompressed_size, checksum)
+
+        return file_data, uncompressed_size, checksum
+
+    def skip_file_data(
+        self, compressed_data: memoryview, index: int, flags: EntryFlags
+    ) -> int:
+        """Skip the file data of an entry using its length prefixes.
+
+        Args:
+            compressed_data (memoryview): The archive entries data.
+            index (int): The index of the file data.
+            flags (EntryFlags): The entry flags.
+
+        Returns:
+            int: The index after the file data.
+
+        Raises:
+            InvalidArchiveFormat: If the file data is truncated.
+        """
+        # the data of a reference is the offset of the entry it refers to
+        if flags & EntryFlags.REFERENCE:
+            _, index = decode_varint(data=compressed_data, index=index)
+            return index
+        if flags & EntryFlags.SOLID:
+            tag, index = decode_varint(data=compressed_data, index=index)
+            # only the first entry of a block stores it
+            if not tag & 1:
+                index += tag >> 1
+            _, index = decode_varint(data=compressed_data, index=index)
+            _, index = decode_varint(data=compressed_data, index=index)
+            return index
+        while flags & EntryFlags.CHUNK_LIST:
+            tag, index = decode_varint(data=compressed_data, index=index)
+            if tag == 0:
+                return index
+            # only stored chunks have data
+            if not tag & 1:
+                index += tag >> 1
+            if index > len(compressed_data):
+                raise InvalidArchiveFormat("Truncated archive entry.")
+        while True:
+            compressed_len, index = self.read_length(
+                compressed_data=compressed_data, index=index
+            )
+            index += compressed_len
+            if index > len(compressed_data):
+                raise InvalidArchiveFormat("Truncated archive entry.")
+            # chunked data ends with a zero length
+            if not flags & EntryFlags.CHUNKED or compressed_len == 0:
+                return index
+
+    def iter_file_data(
+        self, compressed_data: memoryview, index: int, flags: EntryFlags
+    ) -> Iterator[bytes]:
+        """Decompress the file data of an entry piece by piece - chunk by
+        chunk for chunked and chunk list entries, or by feeding the codec
+        decompressor with bounded slices of the compressed data when the
+        codec streams its one-shot format (the data of solid entries is
+        sliced out of their block).
+
+        Args:
+            compressed_data (memoryview): The archive entries data.
+            index (int): The index of the file data.
+            flags (EntryFlags): The entry flags.
+
+        Yields:
+            bytes: The next piece of the file data.
+        """
+        if flags & EntryFlags.SOLID:
+            yield self.read_solid_file(
+                compressed_data=compressed_data, index=index
+            )
+            return
+
+        while flags & EntryFlags.CHUNK_LIST:
+            tag, next_index = decode_varint(data=compressed_data, index=index)
+            if tag == 0:
+                return
+            if tag & 1:
+                # a chunk stored earlier in the archive
+                chunk_offset = tag >> 1
+                if chunk_offset >= index:
+                    raise InvalidArchiveFormat("Invalid chunk reference.")
+                chunk, _ = self.read_stored_chunk(
+                    compressed_data=compressed_data, index=chunk_offset
+                )
+                index = next_index
+            else:
+                chunk, index = self.read_stored_chunk(
+                    compressed_data=compressed_data, index=index
+                )
+            yield chunk
+
+        if flags & EntryFlags.CHUNKED:
+            while True:
+                compressed_len, _ = self.read_length(
+                    compressed_data=compressed_data, index=index
+                )
+                if compressed_len == 0:
+                    return
+                chunk, index = self.get_decompressed_data(
+                    compressed_data=compressed_data, index=index
+                )
+                yield chunk
+
+        if not self._compression_algorithem.stream_compatible:
+            file_data, _ = self.get_decompressed_data(
+                compressed_data=compressed_data, index=index
+            )
+            yield file_data
+            return
+
+        compressed_len, start = self.read_length(
+            compressed_data=compressed_data, index=index
+        )
+        decompressor = self._compression_algorithem.decompressor()
+        for piece_start in range(
+            start, start + compressed_len, self._stream_buffer_size
+        ):
+            piece_end = min(
+                piece_start + self._stream_buffer_size,
+                start + compressed_len,
+            )
+            yield decompressor.feed(
+                chunk=compressed_data[piece_start:piece_end]
+            )
+        yield decompressor.flush()
+
+    def read_stored_chunk(
+        self, compressed_data: memoryview, index: int
+    ) -> Tuple[bytes, int]:
+        """Read and decompress a chunk stored by a chunk list entry.
+
+        Args:
+            compressed_data (memoryview): The archive entries data.
+            index (int): The index of the chunk tag.
+
+        Returns:
+            Tuple[bytes, int]: The chunk data and the index after it.
+
+        Raises:
+            InvalidArchiveFormat: If no chunk is stored at the index or the
+            chunk is truncated.
+        """
+        tag, start = decode_varint(data=compressed_data, index=index)
+        if tag == 0 or tag & 1:
+            raise InvalidArchiveFormat("Invalid chunk reference.")
+        end = start + (tag >> 1)
+        if end > len(compressed_data):
+            raise InvalidArchiveFormat("Truncated archive entry.")
+        chunk = self._compression_algorithem.decompress_data(
+            compressed_data=compressed_data[start:end]
+        )
+
+        return chunk, end
+
+    def read_solid_file(
+        self, compressed_data: memoryview, index: int
+    ) -> bytes:
+        """Read the file data of a solid entry out of its block. The last
+        block read is kept, so the files of a block decompress it once.
+
+        Args:
+            compressed_data (memoryview): The archive entries data.
+            index (int): The index of the file data (the block tag).
+
+        Returns:
+            bytes: The file data.
+
+        Raises:
+            InvalidArchiveFormat: If the block is not stored at the index
+            it refers to or the file data is outside of the block.
+        """
+        tag, next_index = decode_varint(data=compressed_data, index=index)
+        block_index = index
+        if tag & 1:
+            block_index = tag >> 1
+            # solid entries refer to blocks stored earlier only
+            if block_index >= index:
+                raise InvalidArchiveFormat("Invalid solid block reference.")
+        else:
+            next_index += tag >> 1
+        start, next_index = decode_varint(
+            data=compressed_data, index=next_index
+        )
+        size, _ = decode_varint(data=compressed_data, index=next_index)
+
+        if self._solid_block is None or self._solid_block[0] != block_index:
+            block, _ = self.read_stored_chunk(
+                compressed_data=compressed_data, index=block_index
+            )
+            self._solid_block = (block_index, block)
+        block = self._solid_block[1]
+        if start + size > len(block):
+            raise InvalidArchiveFormat("Truncated solid block.")
+
+        return block[start:start + size]
+
+    def write_file_pieces(
+        self, file: str, pieces: Iterator[bytes]
+    ) -> Tuple[int, int]:
+        """Write data to a file piece by piece. A partially written file
+        is removed if reading the pieces fails.
+
+        Args:
+            file (str): The path to the file.
+            pieces (Iterator[bytes]): The pieces of the data.
+
+        Returns:
+            Tuple[int, int]: The size and the CRC32 of the data.
+        """
+        sub_directories = os.path.dirname(file)
+        if sub_directories:
+            os.makedirs(sub_directories, exist_ok=True)
+
+        size = 0
+        checksum = 0
+        try:
+            with open(file, "wb") as f:
+                for piece in pieces:
+                    f.write(piece)
+                    size += len(piece)
+                    checksum = zlib.crc32(piece, checksum)
+        except Exception:
+            if os.path.isfile(file):
+                os.remove(file)
+            raise
+
+        return size, checksum
+
+    def iter_entries(
+        self,
+        compressed_data: Union[bytes, memoryview],
+        index: int = 0,
+        read_data: bool = True,
+        output_path: Optional[str] = None,
+        keep_data: bool = True,
+    ) -> Iterator[Tuple[IndexEntry, bytes]]:
+        """Iterate over the entries of an archive, walking a single view of
+        the archive data by offset without copying it. The records of
+        removed entries are skipped.
+
+        Args:
+            compressed_data (bytes | memoryview): The archive entries data.
+            index (int, optional): The index of the first entry.
+            Defaults to 0.
+            read_data (bool, optional): Whether to decompress the files
+            data. Defaults to True.
+            output_path (str, optional): When given, the files data is
+            written to the entries paths inside the output path (see
+            read_entry()). Defaults to None.
+            keep_data (bool, optional): Whether to return the files data.
+            Defaults to True.
+
+        Yields:
+            Tuple[IndexEntry, bytes]: The next entry and its file data.
+        """
+        view = memoryview(compressed_data)
+        while index < len(view):
+            if index in self._removed_records:
+                index += self._removed_records[index]
+                continue
+            entry, file_data = self.read_entry(
+                compressed_data=view,
+                index=index,
+                read_data=read_data,
+                output_path=output_path,
+                keep_data=keep_data,
+            )
+            yield entry, file_data
+            index = entry.offset + entry.compressed_size
+
+    def get_entries_output_path(
+        self, view_mode: bool = False, debug_mode: bool = True,
+        output_path: str = ""
+    ) -> Optional[str]:
+        """Get the path the decompressed entries are written to.
+
+        Args:
+            view_mode (bool, optional): Whether to display the
+            decompression mode. Defaults to False.
+            debug_mode (bool, optional): Whether to enable debug mode.
+            Defaults to True.
+            output_path (str, optional): The output path for decompressed
+            files. Defaults to "".
+
+        Returns:
+            str | None: The output path, or None if the entries are only
+            displayed or validated.
+        """
+        if view_mode or debug_mode:
+            return None
+        return output_path
+
+    def handle_entry(
+        self,
+        entry: IndexEntry,
+        view_mode: bool = False,
+        debug_mode: bool = True,
+        output_path: str = "",
+    ) -> None:
+        """Print a decompressed archive entry.
+
+        Args:
+            entry (IndexEntry): The archive entry.
+            view_mode (bool, optional): Whether to display the
+            decompression mode. Defaults to False.
+            debug_mode (bool, optional): Whether to enable debug mode.
+            Defaults to True.
+            output_path (str, optional): The output path for decompressed
+            files. Defaults to "".
+        """
+        if entry.path and view_mode and not debug_mode:
+            print(f"{entry.path} - size [{entry.uncompressed_size}]")
+        elif entry.path and not debug_mode:
+            file_path = os.path.join(output_path, entry.path)
+            print(f"Done extract & write {file_path}.")
+
+    def get_next_path_from_archive(
+        self,
+        compressed_data: Union[bytes, memoryview],
+        view_mode: bool = False,
+        debug_mode: bool = True,
+        index: int = 0,
+        output_path: str = "",
+    ) -> Tuple[int, bytes]:
+        """Get the next path from the compressed archive.
+
+        Args:
+            compressed_data: The compressed data.
+            view_mode (bool, optional): Whether to display the
+            decompression mode. Defaults to False.
+            debug_mode (bool, optional): Whether to enable debug mode.
+            Defaults to True.
+            index (int, optional): The index to start reading from in
+            the compressed data. Defaults to 0.
+            Defaults to False.
+            output_path (str, optional): The output path for decompressed
+            files. Defaults to "".
+
+        Returns:
+            int: The next index in the compressed data.
+        """
+        entry, _ = self.read_entry(
+            compressed_data=memoryview(compressed_data),
+            index=index,
+            output_path=self.get_entries_output_path(
+                view_mode=view_mode,
+                debug_mode=debug_mode,
+                output_path=output_path,
+            ),
+            keep_data=False,
+        )
+        self.handle_entry(
+            entry=entry,
+            view_mode=view_mode,
+            debug_mode=debug_mode,
+            output_path=output_path,
+        )
+
+        return entry.offset + entry.compressed_size, entry.path.encode()
+
+    def decompress(
+        self,
+        compressed_file_path: str = "",
+        compressed_data: Union[bytes, memoryview] = b"",
+        view_mode: bool = False,
+        debug_mode: bool = False,
+        init_decompression: bool = False,
+        output_path: str = "",
+        internal_paths: Optional[List[str]] = None
+    ) -> None:
+        """Decompress all the files and directories of an archive, one
+        entry after the other.
+
+        Args:
+            compressed_file_path (str, optional): Path to the
+            compressed file. Defaults to ''.
+            compressed_data (bytes | memoryview, optional): Compressed data.
+            Defaults to b''.
+            view_mode (bool, optional): Whether to display the
+            decompression mode. Defaults to False.
+            debug_mode (bool, optional): Whether to enable debug mode.
+            Defaults to False.
+            init_decompression (bool, optional): Whether the compressed
+            data starts with the archive header. Defaults to False.
+            output_path (str, optional): The output path for decompressed
+            files. Defaults to "".
+            internal_paths (list, optional): Collects the paths of all the
+            decompressed files and dirs. Defaults to None.
+        """
+        if self.should_stop(
+            compressed_file_path=compressed_file_path,
+            compressed_data=compressed_data,
+        ):
+            return
+
+        with ExitStack() as stack:
+            if self.should_read_compressed_file(
+                compressed_file_path=compressed_file_path,
+                compressed_data=compressed_data,
+            ):
+                compressed_data = stack.enter_context(
+                    self.map_file(file=compressed_file_path)
+                )
+
+            next_index = 0
+            if init_decompression:
+                next_index = self.handle_init_decompression(
+                    compressed_data=compressed_data,
+                    view_mode=view_mode,
+                    debug_mode=debug_mode,
+                    compressed_file_path=compressed_file_path,
+                )
+                compressed_data = self.get_entries_data(
+                    compressed_data=compressed_data
+                )
+
+            # the files data is written to the output files piece by piece
+            for entry, _ in self.iter_entries(
+                compressed_data=compressed_data,
+                index=next_index,
+                output_path=self.get_entries_output_path(
+                    view_mode=view_mode,
+                    debug_mode=debug_mode,
+                    output_path=output_path,
+                ),
+                keep_data=False,
+            ):
+                # save data about all files and dirs inside archive file
+                if internal_paths is not None:
+                    internal_paths.append(
+                        os.path.join(output_path, entry.path)
+                    )
+                self.handle_entry(
+                    entry=entry,
+                    view_mode=view_mode,
+                    debug_mode=debug_mode,
+                    output_path=output_path,
+                )
+            # release the entries view so the mapped file can be closed
+            del compressed_data
+
+    def decompress_files(
+        self,
+        directories: List[str],
+        output_path: str = "",
+        view_mode: bool = False,
+        debug_mode: bool = False,
+        timeout_seconds: Optional[int] = None,
+    ) -> Dict[str, str]:
+        """Decompress multiple files - in worker processes (an archive per
+        worker) when there are several archives and workers.
+
+        Args:
+            directories (list): List of compressed files to decompress.
+            output_path (str, optional): The output path for decompressed
+            files. Defaults to ''.
+            view_mode (bool, optional): Whether to display the decompression
+            mode. Defaults to False.
+            debug_mode (bool, optional): Whether to enable debug mode.
+            timeout_seconds (int, optional): Timeout in seconds for every
+            archive. Defaults to None (no timeout).
+
+        Returns:
+            dict: A dictionary containing non-valid archive paths
+            and their corresponding error messages.
+        """
+        if self._workers > 1 and len(directories) > 1:
+            return self.decompress_files_in_workers(
+                directories=directories,
+                output_path=output_path,
+                view_mode=view_mode,
+                debug_mode=debug_mode,
+                timeout_seconds=timeout_seconds,
+            )
+
+        non_valid_archive_paths = {}
+        for compressed_file in directories:
+            error_msg = self.decompress_archive(
+                compressed_file=compressed_file,
+                output_path=output_path,
+                view_mode=view_mode,
+                debug_mode=debug_mode,
+                timeout_seconds=timeout_seconds,
+            )
+            if error_msg is not None:
+                non_valid_archive_paths[compressed_file] = error_msg
+
+        return non_valid_archive_paths
+
+    def decompress_archive(
+        self,
+        compressed_file: str,
+        output_path: str = "",
+        view_mode: bool = False,
+        debug_mode: bool = False,
+        timeout_seconds: Optional[int] = None,
+    ) -> Optional[str]:
+        """Decompress a single archive. All the files of an invalid
+        archive are removed.
+
+        Args:
+            compressed_file (str): The archive to decompress.
+            output_path (str, optional): The output path for decompressed
+            files. Defaults to ''.
+            view_mode (bool, optional): Whether to display the decompression
+            mode. Defaults to False.
+            debug_mode (bool, optional): Whether to enable debug mode.
+            timeout_seconds (int, optional): Timeout in seconds for the
+            archive. Defaults to None (no timeout).
+
+        Returns:
+            str | None: The error message of an invalid archive, or None.
+        """
+        internal_paths: List[str] = []
+        try:
+            if timeout_seconds is None:
+                self.decompress_archive_paths(
+                    compressed_file=compressed_file,
+                    output_path=output_path,
+                    view_mode=view_mode,
+                    debug_mode=debug_mode,
+                    internal_paths=internal_paths,
+                )
+            else:
+                try:
+                    func_timeout(
+                        timeout_seconds,
+                        self.decompress_archive_paths,
+                        args=(compressed_file, output_path, view_mode,
+                              debug_mode, internal_paths),
+                    )
+                except FunctionTimedOut:
+                    raise TimeoutError(
+                        f"Decompress execution timed out "
+                        f"[{timeout_seconds} seconds]."
+                    )
+        except Exception as e:
+            # remove all files of an invalid archive path
+            self.remove_paths(paths=internal_paths)
+            return f"raise {type(e).__name__}({e})"
+
+        return None
+
+    def decompress_archive_paths(
+        self,
+        compressed_file: str,
+        output_path: str = "",
+        view_mode: bool = False,
+        debug_mode: bool = False,
+        internal_paths: Optional[List[str]] = None,
+    ) -> None:
+        """Decompress a single archive - using its central directory to
+        view it, and worker processes to extract it when possible. The
+        files of a delta archive are restored from it and its base
+        archives.
+
+        Args:
+            compressed_file (str): The archive to decompress.
+            output_path (str, optional): The output path for decompressed
+            files. Defaults to ''.
+            view_mode (bool, optional): Whether to display the decompression
+            mode. Defaults to False.
+            debug_mode (bool, optional): Whether to enable debug mode.
+            internal_paths (list, optional): Collects the paths of all the
+            decompressed files and dirs. Defaults to None.
+        """
+        if view_mode and not debug_mode and self.view_archive(
+            compressed_file_path=compressed_file
+        ):
+            return
+        if not view_mode and not debug_mode:
+            _, directory, _ = self.load_archive_index(
+                archive_path=compressed_file
+            )
+            if directory is not None and directory.manifest is not None \
+                    and directory.manifest.base_path:
+                self.restore_archive(
+                    archive_path=compressed_file,
+                    output_path=output_path,
+                    internal_paths=internal_paths,
+                )
+                return
+            if directory is not None and self._workers > 1:
+                self.extract_in_workers(
+                    archive_path=compressed_file,
+                    entries=directory.entries,
+                    output_path=output_path,
+                    internal_paths=internal_paths,
+                )
+                return
+        self.decompress(
+            compressed_file_path=compressed_file,
+            view_mode=view_mode,
+            init_decompression=True,
+            output_path=output_path,
+            debug_mode=debug_mode,
+            internal_paths=internal_paths
+        )
+
+    def capture_decompress_archive(
+        self,
+        compressed_file: str,
+        output_path: str = "",
+        view_mode: bool = False,
+        debug_mode: bool = False,
+        timeout_seconds: Optional[int] = None,
+    ) -> Tuple[Optional[str], str]:
+        """Decompress a single archive, capturing what it prints - the
+        task of a worker process, so the output of the archives is printed
+        in order by the current process.
+
+        Args:
+            compressed_file (str): The archive to decompress.
+            output_path (str, optional): The output path for decompressed
+            files. Defaults to ''.
+            view_mode (bool, optional): Whether to display the decompression
+            mode. Defaults to False.
+            debug_mode (bool, optional): Whether to enable debug mode.
+            timeout_seconds (int, optional): Timeout in seconds for the
+            archive. Defaults to None (no timeout).
+
+        Returns:
+            Tuple[str | None, str]: The error message of an invalid archive
+            (or None) and the printed output.
+        """
+        output = io.StringIO()
+        with redirect_stdout(output):
+            error_msg = self.decompress_archive(
+                compressed_file=compressed_file,
+                output_path=output_path,
+                view_mode=view_mode,
+                debug_mode=debug_mode,
+                timeout_seconds=timeout_seconds,
+            )
+
+        return error_msg, output.getvalue()
+
+    def decompress_files_in_workers(
+        self,
+        directories: List[str],
+        output_path: str = "",
+        view_mode: bool = False,
+        debug_mode: bool = False,
+        timeout_seconds: Optional[int] = None,
+    ) -> Dict[str, str]:
+        """Decompress multiple archives in a pool of worker processes, an
+        archive per worker. The timeout of every archive is enforced
+        inside its worker, and an invalid archive does not stop the
+        others.
+
+        Args:
+            directories (list): List of compressed files to decompress.
+            output_path (str, optional): The output path for decompressed
+            files. Defaults to ''.
+            view_mode (bool, optional): Whether to display the decompression
+            mode. Defaults to False.
+            debug_mode (bool, optional): Whether to enable debug mode.
+            timeout_seconds (int, optional): Timeout in seconds for every
+            archive. Defaults to None (no timeout).
+
+        Returns:
+            dict: A dictionary containing non-valid archive paths
+            and their corresponding error messages.
+        """
+        non_valid_archive_paths = {}
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            futures = [
+                executor.submit(
+                    self.capture_decompress_archive,
+                    compressed_file,
+                    output_path,
+                    view_mode,
+                    debug_mode,
+                    timeout_seconds,
+                )
+                for compressed_file in directories
+            ]
+
+            for compressed_file, future in zip(directories, futures):
+                try:
+                    error_msg, output = future.result()
+                except Exception as e:
+                    # the worker process itself failed
+                    error_msg = f"raise {type(e).__name__}({e})"
+                    output = ""
+                print(output, end="")
+                if error_msg is not None:
+                    non_valid_archive_paths[compressed_file] = error_msg
+
+        return non_valid_archive_paths
 
-                    files_in_folder = os.listdir(full_dir_path)
-                    # if it is an empty folder, compress full folder path name
-                    if len(files_in_folder) == 0:
-                        full_dir_path += self._folder_suffix
-                        self.compress_data_to_file(
-                            data=full_dir_path.encode())
+    def view_archive(self, compressed_file_path: str) -> bool:
+        """Print the entries of an archive using its central directory,
+        without decompressing any entry. The files of a delta archive which
+        are stored in its base archives are printed as well.
 
-                    # compress recursive the files which inside the directory to current folder
-                    invalid = self.compress(
-                        directories=files_in_folder,
-                        subfolder=full_dir_path,
-                        ignore_files=ignore_files,
-                        ignore_extensions=ignore_extensions,
-                        ignore_folders=ignore_folders,
+        Args:
+            compressed_file_path (str): Path to the archive.
+
+        Returns:
+            bool: True if the archive has a central directory and was
+            printed, False otherwise.
+        """
+        _, directory, _ = self.load_archive_index(
+            archive_path=compressed_file_path
+        )
+        if directory is None:
+            return False
+
+        algo_name = self.get_compression_algorithem_name()
+        msg = f"{compressed_file_path} - [{algo_name}] "
+        msg += "compressed file contains:"
+        print(msg)
+        for entry in directory.entries:
+            print(f"{entry.path} - size [{entry.uncompressed_size}]")
+        manifest = directory.manifest
+        if manifest is not None and manifest.base_path:
+            stored_paths = {entry.path for entry in directory.entries}
+            for manifest_entry in manifest.entries:
+                if manifest_entry.path not in stored_paths:
+                    print(
+                        f"{manifest_entry.path} - size [{manifest_entry.size}]"
+                        f" - unchanged since {manifest.base_path}"
                     )
 
-                    if invalid:
-                        return invalid
+        return True
 
-            # if it is directory to file
-            elif os.path.isfile(full_dir_path):
+    def scan_entries(
+        self, compressed_data: Union[bytes, memoryview], index: int = 0
+    ) -> CentralDirectory:
+        """Build an index of the entries of an archive without a central
+        directory. Only the entry paths are decompressed - the entries
+        data is skipped using its length prefix.
 
-                if (
-                    full_dir_path not in ignore_files
-                    and not full_dir_path.endswith(tuple(ignore_extensions))
-                ):
-                    # read data from current file
-                    full_file_data = self.read_file(file=full_dir_path)
-                    file_path = full_dir_path.encode()
+        Args:
+            compressed_data (bytes | memoryview): The archive entries data.
+            index (int, optional): The index of the first entry.
+            Defaults to 0.
 
-                    exception_type = self.get_invalid_data_exception(
-                                full_dir_path=full_dir_path)
+        Returns:
+            CentralDirectory: The index of the archive entries (without
+            sizes and checksums of the original data).
+        """
+        return CentralDirectory(entries=[
+            entry for entry, _ in self.iter_entries(
+                compressed_data=compressed_data, index=index,
+                read_data=False,
+            )
+        ])
 
-                    if self.valid_for_compression(
-                        data=full_file_data
-                    ) and self.valid_for_compression(data=file_path):
-                        try: 
-                            # compress full file path name
-                            self.compress_data_to_file(data=file_path)
-                            # compress file data
-                            self.compress_data_to_file(data=full_file_data)
-                        except Exception:
-                            return self.compress_with_error(
-                            should_remove_output=remove_output,
-                            exception_type=exception_type
-                        )
-                    else: 
-                        return self.compress_with_error(
-                            should_remove_output=remove_output,
-                            exception_type=exception_type
-                        ) 
+    def extract(
+        self, archive_path: str, entries: List[str], output_path: str = ""
+    ) -> List[str]:
+        """Extract the entries matching glob patterns from an archive.
 
-            else:
-                aborted_msg = f"Error - {full_dir_path} does not exist."
-                return self.compress_with_error(
-                    should_remove_output=remove_output, 
-                    exception_type=MissingInputPath(aborted_msg),
+        The matching entries are located using the central directory (or
+        a scan of the entry paths for archives without one), and only
+        their records are read and decompressed. The entries of a delta
+        archive are restored from it and its base archives.
+
+        Args:
+            archive_path (str): Path to the archive.
+            entries (list): Glob patterns of the entries to extract (a
+            directory path extracts all the entries inside it).
+            output_path (str, optional): The output path for extracted
+            files. Defaults to ''.
+
+        Returns:
+            list: The paths of the extracted files and directories.
+
+        Raises:
+            MissingInputPath: If no archive entry matches the patterns.
+        """
+        _, directory, _ = self.load_archive_index(archive_path=archive_path)
+        if directory is not None and directory.manifest is not None \
+                and directory.manifest.base_path:
+            return self.restore_archive(
+                archive_path=archive_path,
+                output_path=output_path,
+                patterns=entries,
+            )
+        if directory is None:
+            with self.map_file(file=archive_path) as compressed_data:
+                _, next_index = self.read_metadata(
+                    compressed_data=compressed_data
+                )
+                directory = self.scan_entries(
+                    compressed_data=compressed_data, index=next_index
+                )
+
+        matched_entries = directory.match_entries(patterns=entries)
+        if not matched_entries:
+            raise MissingInputPath(
+                f"No entries inside {archive_path} match {entries}."
+            )
+
+        extracted_paths: List[str] = []
+        self.extract_entries(
+            archive_path=archive_path,
+            entries=matched_entries,
+            output_path=output_path,
+            internal_paths=extracted_paths,
+        )
+
+        return extracted_paths
+
+    def extract_entries(
+        self,
+        archive_path: str,
+        entries: List[IndexEntry],
+        output_path: str = "",
+        internal_paths: Optional[List[str]] = None,
+    ) -> None:
+        """Extract archive entries located by their offsets - in worker
+        processes when possible. The compression algorithm must already be
+        set according to the archive header.
+
+        Args:
+            archive_path (str): Path to the archive.
+            entries (list): The entries to extract.
+            output_path (str, optional): The output path for extracted
+            files. Defaults to ''.
+            internal_paths (list, optional): Collects the paths of all the
+            extracted files and dirs. Defaults to None.
+        """
+        if self._workers > 1:
+            self.extract_in_workers(
+                archive_path=archive_path,
+                entries=entries,
+                output_path=output_path,
+                internal_paths=internal_paths,
+            )
+            return
+
+        # entries are read by their offsets in the archive, so references
+        # find the entries they refer to
+        with self.map_file(file=archive_path) as compressed_data:
+            for entry in entries:
+                _, file_path = self.get_next_path_from_archive(
+                    compressed_data=compressed_data,
+                    debug_mode=False,
+                    index=entry.offset,
+                    output_path=output_path,
+                )
+                if internal_paths is not None:
+                    internal_paths.append(
+                        os.path.join(output_path, file_path.decode())
                     )
-            
-        return None     
-                
-    def get_invalid_data_exception(self, full_dir_path: str) -> Exception:
-        """Returns invalid data for compression exception according
-        to the full dir path.
+            del compressed_data
+
+    def get_archives_chain(
+        self, archive_path: str
+    ) -> List[Tuple[str, ArchiveHeader, CentralDirectory]]:
+        """Get a delta archive and the chain of its base archives, newest
+        first. Every base archive is found by its path relative to the
+        archive which refers to it, and must still have the manifest that
+        archive was written against.
 
         Args:
-            full_dir_path (str): Path to the compressed file.
+            archive_path (str): Path to the delta archive.
 
         Returns:
-            Exception: invalid data for compression exception.
+            list: The path, the header and the central directory of every
+            archive of the chain.
+
+        Raises:
+            InvalidArchiveFormat: If an archive of the chain has no
+            manifest, a base archive changed, or the chain is a loop.
         """
-        algo_name = self.get_compression_algorithem_name()
-        aborted_msg = f"Could not compress {full_dir_path} "
-        aborted_msg += f"using {algo_name}."
-        return InvalidDataForCompressionAlgorithem(aborted_msg)
+        chain: List[Tuple[str, ArchiveHeader, CentralDirectory]] = []
+        visited_paths = set()
+        base_digest = None
+        while True:
+            real_path = os.path.realpath(archive_path)
+            if real_path in visited_paths:
+                raise InvalidArchiveFormat(
+                    f"The base archives of {chain[0][0]} are a loop."
+                )
+            visited_paths.add(real_path)
+            header, directory, _ = self.read_archive_index(
+                archive_path=archive_path
+            )
+            if directory is None or directory.manifest is None:
+                raise InvalidArchiveFormat(
+                    f"The archive {archive_path} has no manifest."
+                )
+            if base_digest is not None \
+                    and directory.manifest.digest() != base_digest:
+                raise InvalidArchiveFormat(
+                    f"The base archive {archive_path} changed since "
+                    f"{chain[-1][0]} was written."
+                )
+            chain.append((archive_path, header, directory))
+            if not directory.manifest.base_path:
+                return chain
 
-    def should_stop(
-        self, compressed_file_path: str = "", compressed_data: bytes = b""
-    ) -> bool:
-        """Check if the compression or decompression process should stop.
+            base_digest = directory.manifest.base_digest
+            archive_path = os.path.join(
+                os.path.dirname(archive_path), directory.manifest.base_path
+            )
+
+    def restore_archive(
+        self,
+        archive_path: str,
+        output_path: str = "",
+        internal_paths: Optional[List[str]] = None,
+        patterns: Optional[List[str]] = None,
+    ) -> List[str]:
+        """Restore the files of a delta archive at the time it was written
+        - every file of its manifest is extracted from the newest archive
+        of the chain (see get_archives_chain()) which stores it.
 
         Args:
-            compressed_file_path (str, optional): Path to the compressed file.
-            Defaults to ''.
-            compressed_data (bytes, optional): Compressed data.
-            Defaults to b''.
+            archive_path (str): Path to the delta archive.
+            output_path (str, optional): The output path for restored
+            files. Defaults to ''.
+            internal_paths (list, optional): Collects the paths of all the
+            restored files and dirs. Defaults to None.
+            patterns (list, optional): Glob patterns of the files to
+            restore. Defaults to None (all the files).
 
         Returns:
-            bool: True if the process should stop, False otherwise.
+            list: The paths of the restored files and directories.
+
+        Raises:
+            MissingInputPath: If no file matches the patterns.
+            InvalidArchiveFormat: If a file is not stored in any archive of
+            the chain.
         """
+        chain = self.get_archives_chain(archive_path=archive_path)
+        remaining_paths = {
+            entry.path for entry in chain[0][2].manifest.entries
+            if patterns is None or match_path(
+                path=entry.path, patterns=patterns
+            )
+        }
+        if patterns is not None and not remaining_paths:
+            raise MissingInputPath(
+                f"No entries inside {archive_path} match {patterns}."
+            )
 
-        # if compressed_data is empty & compressed file path was not inserted
-        if compressed_data == b"" and not compressed_file_path:
-            return True
-        return False
+        restored_paths = [] if internal_paths is None else internal_paths
+        for chain_path, header, directory in chain:
+            entries = [
+                entry for entry in directory.entries
+                if entry.path in remaining_paths
+            ]
+            if not entries:
+                continue
+            remaining_paths.difference_update(
+                entry.path for entry in entries
+            )
+            self.apply_metadata(header=header)
+            self.expect_entries(directory=directory)
+            self.extract_entries(
+                archive_path=chain_path,
+                entries=entries,
+                output_path=output_path,
+                internal_paths=restored_paths,
+            )
 
-    def should_read_compressed_file(
-        self, compressed_file_path: str = "", compressed_data: bytes = b""
-    ) -> bool:
-        """Check if a compressed file should be read.
+        if remaining_paths:
+            raise InvalidArchiveFormat(
+                f"The archives of {archive_path} do not store "
+                f"{sorted(remaining_paths)}."
+            )
+
+        return restored_paths
+
+    def extract_files(
+        self, directories: List[str], entries: List[str],
+        output_path: str = ""
+    ) -> Dict[str, str]:
+        """Extract the entries matching glob patterns from multiple
+        archives.
 
         Args:
-            compressed_file_path (str, optional): Path to the compressed file.
-            Defaults to ''.
-            compressed_data (bytes, optional): Compressed data.
-            Defaults to b''.
+            directories (list): List of archives to extract from.
+            entries (list): Glob patterns of the entries to extract.
+            output_path (str, optional): The output path for extracted
+            files. Defaults to ''.
 
         Returns:
-            bool: True if the compressed file should be read, False otherwise.
+            dict: A dictionary containing non-valid archive paths
+            and their corresponding error messages.
         """
-        # if compressed_data is empty and compressed file path was inserted
-        if compressed_data == b"" and compressed_file_path:
-            return True
-        return False
+        non_valid_archive_paths = {}
+        for archive_path in directories:
+            try:
+                self.extract(
+                    archive_path=archive_path,
+                    entries=entries,
+                    output_path=output_path,
+                )
+            except Exception as e:
+                non_valid_archive_paths[archive_path] = (
+                    f"raise {type(e).__name__}({e})"
+                )
 
-    def handle_init_decompression(
+        return non_valid_archive_paths
+
+    def get_entries_batches(
         self,
-        compressed_data: bytes,
-        view_mode: bool = False,
-        debug_mode: bool = False,
-        compressed_file_path: str = "",
+        entries: List[IndexEntry],
+        compressed_data: Optional[memoryview] = None,
+    ) -> List[List[IndexEntry]]:
+        """Split archive entries into batches of about the chunk size of
+        compressed data, so small entries are not sent to worker processes
+        one by one. Every chunked entry and reference entry gets a batch of
+        its own, and the entries of a solid block share a batch (so its
+        block is decompressed once).
+
+        Args:
+            entries (list): The archive entries.
+            compressed_data (memoryview, optional): The archive data, to
+            find the blocks of solid entries. Defaults to None.
+
+        Returns:
+            list: The batches of entries, in archive order.
+        """
+        batches: List[List[IndexEntry]] = []
+        batch_size = self._chunk_size
+        block_index = None
+        for entry in entries:
+            if entry.flags & (EntryFlags.CHUNKED | EntryFlags.REFERENCE):
+                batches.append([entry])
+                batch_size = self._chunk_size
+                continue
+            if entry.flags & EntryFlags.SOLID and compressed_data is not None:
+                entry_block_index = self.get_solid_block_index(
+                    compressed_data=compressed_data, entry=entry
+                )
+                if batches and entry_block_index == block_index:
+                    batches[-1].append(entry)
+                    batch_size += entry.compressed_size
+                    continue
+                block_index = entry_block_index
+            if batch_size + entry.compressed_size > self._chunk_size:
+                batches.append([])
+                batch_size = 0
+            batches[-1].append(entry)
+            batch_size += entry.compressed_size
+
+        return batches
+
+    def get_solid_block_index(
+        self, compressed_data: memoryview, entry: IndexEntry
     ) -> int:
-        """Handle initialization for decompression.
+        """Get the index of the block of a solid entry.
 
         Args:
-            compressed_data: The compressed data.
-            view_mode (bool, optional): Whether to display the decompression
-            mode. Defaults to False.
-            debug_mode (bool, optional): Whether to enable debug mode.
-            Defaults to False.
-            compressed_file_path (str, optional): Path to the compressed file.
-            Defaults to ''.
+            compressed_data (memoryview): The archive data.
+            entry (IndexEntry): The solid entry.
 
         Returns:
-            int: The next index in the compressed data.
+            int: The index of the block tag.
         """
-        # get full file path from compressed data
-        algorithem_type, next_index = self.read_metadata(
-            compressed_data=compressed_data
+        # skip the flags byte and the path
+        index = self.skip_path(
+            compressed_data=compressed_data, index=entry.offset + 1
         )
-        self.define_compression_algorithem(algorithem_type=algorithem_type)
-        if view_mode and not debug_mode:
-            algo_name = self.get_compression_algorithem_name()
-            msg = f"{compressed_file_path} - [{algo_name}] "
-            msg += "compressed file contains:"
-            print(msg)
+        tag, _ = decode_varint(data=compressed_data, index=index)
 
-        return next_index
+        return tag >> 1 if tag & 1 else index
 
-    def get_next_path_from_archive(
+    def get_chunks_positions(
+        self, compressed_data: memoryview, entry: IndexEntry
+    ) -> List[int]:
+        """Get the positions of the chunks of a chunked entry (the chunks
+        table), reading only their length prefixes.
+
+        Args:
+            compressed_data (memoryview): The archive data.
+            entry (IndexEntry): The chunked entry.
+
+        Returns:
+            list: The indexes of the chunks length prefixes.
+
+        Raises:
+            InvalidArchiveFormat: If the chunks are truncated.
+        """
+        # skip the flags byte and the path
+        index = self.skip_path(
+            compressed_data=compressed_data, index=entry.offset + 1
+        )
+
+        positions = []
+        while True:
+            compressed_len, next_index = self.read_length(
+                compressed_data=compressed_data, index=index
+            )
+            if compressed_len == 0:
+                return positions
+            positions.append(index)
+            index = next_index + compressed_len
+            if index > len(compressed_data):
+                raise InvalidArchiveFormat("Truncated archive entry.")
+
+    def read_entries(
+        self, archive_path: str, entries: List[IndexEntry],
+        output_path: str = ""
+    ) -> List[Tuple[IndexEntry, Optional[Exception]]]:
+        """Read archive entries located by their offsets and write them
+        to the output path - the task of an extraction worker process,
+        which maps the archive by itself. Reading stops at the first
+        entry which fails.
+
+        Args:
+            archive_path (str): Path to the archive.
+            entries (list): The entries to read.
+            output_path (str, optional): The output path for extracted
+            files. Defaults to ''.
+
+        Returns:
+            list: The entries which were read, each with the exception it
+            failed with (None for entries which were written).
+        """
+        results: List[Tuple[IndexEntry, Optional[Exception]]] = []
+        self._entries_paths.update(
+            (entry.offset, entry.path) for entry in entries
+        )
+        with self.map_file(file=archive_path) as compressed_data:
+            for entry in entries:
+                try:
+                    written_entry, _ = self.read_entry(
+                        compressed_data=compressed_data,
+                        index=entry.offset,
+                        output_path=output_path,
+                        keep_data=False,
+                    )
+                except Exception as e:
+                    results.append((entry, e))
+                    break
+                results.append((written_entry, None))
+
+        return results
+
+    def read_chunk(
+        self, archive_path: str, index: int,
+        buffer_name: Optional[str] = None
+    ) -> Tuple[Union[bytes, int], Optional[Exception]]:
+        """Read and decompress a chunk of a chunked entry - the task of an
+        extraction worker process, which maps the archive by itself.
+
+        Args:
+            archive_path (str): Path to the archive.
+            index (int): The index of the chunk length prefix.
+            buffer_name (str, optional): The shared memory segment for the
+            chunk data. Defaults to None.
+
+        Returns:
+            Tuple[bytes | int, Exception | None]: The chunk data (see
+            hand_over()) and the exception the chunk failed with (None if
+            it did not fail).
+        """
+        try:
+            with self.map_file(file=archive_path) as compressed_data:
+                chunk, _ = self.get_decompressed_data(
+                    compressed_data=compressed_data, index=index
+                )
+        except Exception as e:
+            return b"", e
+
+        return hand_over(chunk, buffer_name), None
+
+    def handle_read_entries(
         self,
-        compressed_data: bytes,
-        view_mode: bool = False,
-        debug_mode: bool = True,
-        index: int = 0,
+        results: List[Tuple[IndexEntry, Optional[Exception]]],
         output_path: str = "",
-    ) -> Tuple[int, bytes]:
-        """Get the next path from the compressed archive.
+        internal_paths: Optional[List[str]] = None,
+        failed: bool = False,
+    ) -> Optional[Exception]:
+        """Report the entries read by read_entries(), verifying their
+        checksums.
 
         Args:
-            compressed_data: The compressed data.
-            view_mode (bool, optional): Whether to display the
-            decompression mode. Defaults to False.
-            debug_mode (bool, optional): Whether to enable debug mode.
-            Defaults to True.
-            index (int, optional): The index to start reading from in
-            the compressed data. Defaults to 0.
-            Defaults to False.
-            output_path (str, optional): The output path for decompressed
-            files. Defaults to "".
+            results (list): The entries and their exceptions.
+            output_path (str, optional): The output path for extracted
+            files. Defaults to ''.
+            internal_paths (list, optional): Collects the paths of all the
+            extracted files and dirs. Defaults to None.
+            failed (bool, optional): Whether the extraction already
+            failed, so the entries are only collected. Defaults to False.
 
         Returns:
-            int: The next index in the compressed data.
+            Exception | None: The exception of the entry which failed.
         """
-        # get full file path from compressed data
-        path, next_index = self.get_decompressed_data(
-            compressed_data=compressed_data, index=index
-        )
+        for entry, error in results:
+            file_path = os.path.join(output_path, entry.path)
+            # save data about all files and dirs inside archive file
+            if internal_paths is not None:
+                internal_paths.append(file_path)
+            if error is None:
+                try:
+                    self.verify_checksum(
+                        path=entry.path,
+                        offset=entry.offset,
+                        uncompressed_size=entry.uncompressed_size,
+                        checksum=entry.checksum,
+                        file=file_path,
+                    )
+                except ChecksumMismatch as e:
+                    error = e
+            if error is not None:
+                return error
+            if self._reference_entries:
+                self._read_files[entry.offset] = (
+                    file_path, entry.uncompressed_size, entry.checksum
+                )
+            if not failed:
+                self.handle_entry(
+                    entry=entry, debug_mode=False, output_path=output_path
+                )
 
-        # if path presents a folder
-        if path.decode().endswith(self._folder_suffix):
-            file_data = b""
+        return None
 
-        # if path presents a file
-        else:
-            # get original file data from compressed data
-            file_data, next_index = self.get_decompressed_data(
-                compressed_data=compressed_data, index=next_index
+    def write_extracted_chunk(
+        self,
+        result: Tuple[Union[bytes, int], Optional[Exception]],
+        entry: IndexEntry,
+        chunk_number: int,
+        chunks_num: int,
+        slot: Optional[int] = None,
+        output_path: str = "",
+        internal_paths: Optional[List[str]] = None,
+        failed: bool = False,
+    ) -> Optional[Exception]:
+        """Write a chunk decompressed by read_chunk() to the file of its
+        chunked entry, directly from its shared segment. The checksum of
+        the file is verified after its last chunk. A partially written
+        file is removed if the chunk failed.
+
+        Args:
+            result (Tuple[bytes | int, Exception | None]): The chunk data
+            (see hand_over()) and its exception.
+            entry (IndexEntry): The chunked entry.
+            chunk_number (int): The number of the chunk in the entry.
+            chunks_num (int): The number of chunks of the entry.
+            slot (int, optional): The shared segment of the chunk data.
+            Defaults to None.
+            output_path (str, optional): The output path for extracted
+            files. Defaults to ''.
+            internal_paths (list, optional): Collects the paths of all the
+            extracted files and dirs. Defaults to None.
+            failed (bool, optional): Whether the extraction already
+            failed, so the chunk is dropped. Defaults to False.
+
+        Returns:
+            Exception | None: The exception of the chunk.
+        """
+        file_path = os.path.join(output_path, entry.path)
+        chunk, error = result
+        if failed or error is not None:
+            self._shared_buffers.release(slot=slot)
+        if failed:
+            return None
+        if error is not None:
+            if chunk_number > 0 and os.path.isfile(file_path):
+                os.remove(file_path)
+            return error
+
+        if chunk_number == 0:
+            self._extracted_checksum = 0
+            # save data about all files and dirs inside archive file
+            if internal_paths is not None:
+                internal_paths.append(file_path)
+            sub_directories = os.path.dirname(file_path)
+            if sub_directories:
+                os.makedirs(sub_directories, exist_ok=True)
+        try:
+            with open(file_path, "wb" if chunk_number == 0 else "ab") as f:
+                with self._shared_buffers.read(
+                    slot=slot, result=chunk
+                ) as data:
+                    f.write(data)
+                    self._extracted_checksum = zlib.crc32(
+                        data, self._extracted_checksum
+                    )
+        finally:
+            self._shared_buffers.release(slot=slot)
+        if chunk_number == chunks_num - 1:
+            try:
+                self.verify_checksum(
+                    path=entry.path,
+                    offset=entry.offset,
+                    uncompressed_size=os.path.getsize(file_path),
+                    checksum=self._extracted_checksum,
+                    file=file_path,
+                )
+            except ChecksumMismatch as e:
+                return e
+            if self._reference_entries:
+                self._read_files[entry.offset] = (
+                    file_path, entry.uncompressed_size, entry.checksum
+                )
+            self.handle_entry(
+                entry=entry, debug_mode=False, output_path=output_path
             )
 
-        file_name = path.decode()
-        if file_name and view_mode and not debug_mode:
-            print(f"{file_name} - size [{len(file_data)}]")
-        elif file_name and not debug_mode:
-            file_path = os.path.join(output_path, file_name)
-            self.write_file(file=file_path, data=file_data)
-            print(f"Done extract & write {file_path}.")
+        return None
+
+    def write_extracted_reference(
+        self,
+        result: None,
+        compressed_data: memoryview,
+        entry: IndexEntry,
+        output_path: str = "",
+        internal_paths: Optional[List[str]] = None,
+        failed: bool = False,
+    ) -> Optional[Exception]:
+        """Write the file of a reference entry in the current process,
+        after the entry it refers to was written - so the file is copied
+        instead of being decompressed again.
+
+        Args:
+            result (None): The result of the (missing) task.
+            compressed_data (memoryview): The archive data.
+            entry (IndexEntry): The reference entry.
+            output_path (str, optional): The output path for extracted
+            files. Defaults to ''.
+            internal_paths (list, optional): Collects the paths of all the
+            extracted files and dirs. Defaults to None.
+            failed (bool, optional): Whether the extraction already
+            failed, so the entry is dropped. Defaults to False.
+
+        Returns:
+            Exception | None: The exception of the entry.
+        """
+        if failed:
+            return None
+        # save data about all files and dirs inside archive file
+        if internal_paths is not None:
+            internal_paths.append(os.path.join(output_path, entry.path))
+        try:
+            self.read_entry(
+                compressed_data=compressed_data,
+                index=entry.offset,
+                output_path=output_path,
+                keep_data=False,
+            )
+        except Exception as e:
+            return e
+        self.handle_entry(
+            entry=entry, debug_mode=False, output_path=output_path
+        )
 
-        return next_index, path
-        
+        return None
 
-    def decompress(
+    def iter_extract_tasks(
         self,
-        compressed_file_path: str = "",
-        compressed_data: bytes = b"",
-        subfolder: str = "",
-        view_mode: bool = False,
-        debug_mode: bool = False,
-        init_decompression: bool = False,
+        compressed_data: memoryview,
+        archive_path: str,
+        entries: List[IndexEntry],
         output_path: str = "",
-        internal_paths: List[str] = []
-    ) -> None:
-        """Decompress files and directories recursively.
+        internal_paths: Optional[List[str]] = None,
+    ) -> Iterator[Tuple[Callable, Callable, Tuple]]:
+        """Iterate over the tasks which extract archive entries - a task
+        per batch of entries, and a task per chunk of chunked entries
+        (reference entries are written by the current process, without a
+        task).
 
         Args:
-            compressed_file_path (str, optional): Path to the
-            compressed file. Defaults to ''.
-            compressed_data (bytes, optional): Compressed data.
-            Defaults to b''.
-            subfolder (str, optional): Subfolder path. Defaults to ''.
-            view_mode (bool, optional): Whether to display the
-            decompression mode. Defaults to False.
-            debug_mode (bool, optional): Whether to enable debug mode.
-            Defaults to False.
-            init_decompression (bool, optional): Whether it's the initial
-            decompression operation. Defaults to False.
-            output_path (str, optional): The output path for decompressed
-            files. Defaults to "".
-        """
-        if self.should_stop(
-            compressed_file_path=compressed_file_path,
-            compressed_data=compressed_data,
-        ):
-            return
+            compressed_data (memoryview): The archive data.
+            archive_path (str): Path to the archive.
+            entries (list): The entries to extract.
+            output_path (str, optional): The output path for extracted
+            files. Defaults to ''.
+            internal_paths (list, optional): Collects the paths of all the
+            extracted files and dirs. Defaults to None.
 
-        if self.should_read_compressed_file(
-            compressed_file_path=compressed_file_path,
-            compressed_data=compressed_data,
+        Yields:
+            Tuple[Callable, Callable, Tuple]: The method which handles the
+            task result, the task and the task arguments.
+        """
+        for batch in self.get_entries_batches(
+            entries=entries, compressed_data=compressed_data
         ):
-            compressed_data = self.read_file(file=compressed_file_path)
+            entry = batch[0]
+            if entry.flags & EntryFlags.REFERENCE:
+                yield partial(
+                    self.write_extracted_reference,
+                    compressed_data=compressed_data,
+                    entry=entry,
+                    output_path=output_path,
+                    internal_paths=internal_paths,
+                ), None, ()
+                continue
+            if not entry.flags & EntryFlags.CHUNKED:
+                yield partial(
+                    self.handle_read_entries,
+                    output_path=output_path,
+                    internal_paths=internal_paths,
+                ), self.read_entries, (archive_path, batch, output_path)
+                continue
 
-        if init_decompression:
-            next_index = self.handle_init_decompression(
-                compressed_data=compressed_data,
-                view_mode=view_mode,
-                debug_mode=debug_mode,
-                compressed_file_path=compressed_file_path,
+            positions = self.get_chunks_positions(
+                compressed_data=compressed_data, entry=entry
             )
-        else:
-            next_index = 0
-
-        next_index, file_path = self.get_next_path_from_archive(
-            compressed_data=compressed_data,
-            view_mode=view_mode,
-            debug_mode=debug_mode,
-            index=next_index,
-            output_path=output_path,
-        )
-
-        # save data about all files and dirs inside archive file        
-        internal_paths.append(os.path.join(output_path, file_path.decode()))
-
-        # decompress the original data recursivlly from the
-        # rest of the compressed data
-        self.decompress(
-            compressed_data=compressed_data[next_index:],
-            subfolder=subfolder,
-            view_mode=view_mode,
-            debug_mode=debug_mode,
-            output_path=output_path,
-            internal_paths=internal_paths
-        )
+            for chunk_number, index in enumerate(positions):
+                # the chunk is handed over through a shared segment
+                slot, buffer_name = None, None
+                buffer = self._shared_buffers.acquire()
+                if buffer is not None:
+                    slot, buffer_name = buffer
+                yield partial(
+                    self.write_extracted_chunk,
+                    entry=entry,
+                    chunk_number=chunk_number,
+                    chunks_num=len(positions),
+                    slot=slot,
+                    output_path=output_path,
+                    internal_paths=internal_paths,
+                ), self.read_chunk, (archive_path, index, buffer_name)
 
-    def decompress_files(
+    def extract_in_workers(
         self,
-        directories: List[str],
+        archive_path: str,
+        entries: List[IndexEntry],
         output_path: str = "",
-        view_mode: bool = False,
-        debug_mode: bool = False,
-    ) -> Dict[str, str]:
-        """Decompress multiple files.
+        internal_paths: Optional[List[str]] = None,
+    ) -> None:
+        """Extract archive entries in a pool of worker processes. Batches
+        of entries are dispatched by offset, and the chunks of chunked
+        entries are decompressed concurrently as well (at most two tasks
+        per worker are in flight). Every worker maps the archive, files
+        are written by the workers (chunked files by the current process,
+        in order, from the shared memory segments the chunks are handed
+        over through) and the results are reported in archive order.
 
         Args:
-            directories (list): List of compressed files to decompress.
-            output_path (str, optional): The output path for decompressed
+            archive_path (str): Path to the archive.
+            entries (list): The entries to extract.
+            output_path (str, optional): The output path for extracted
             files. Defaults to ''.
-            view_mode (bool, optional): Whether to display the decompression
-            mode. Defaults to False.
-            debug_mode (bool, optional): Whether to enable debug mode.
+            internal_paths (list, optional): Collects the paths of all the
+            extracted files and dirs. Defaults to None.
 
-        Returns:
-            dict: A dictionary containing non-valid archive paths
-            and their corresponding error messages.
+        Raises:
+            Exception: The exception of the first entry which failed.
         """
-        non_valid_archive_paths = {}
-        for compressed_file in directories:
-            internal_paths: List[str] = []
+        first_error: Optional[Exception] = None
+        with ExitStack() as stack:
+            self._shared_buffers = self.create_shared_buffers()
+            stack.callback(self.close_shared_buffers)
+            compressed_data = stack.enter_context(
+                self.map_file(file=archive_path)
+            )
+            executor = stack.enter_context(
+                ProcessPoolExecutor(max_workers=self._workers)
+            )
+            entries_queue = OrderedTaskQueue(
+                executor=executor, max_in_flight=2 * self._workers
+            )
+            tasks = self.iter_extract_tasks(
+                compressed_data=compressed_data,
+                archive_path=archive_path,
+                entries=entries,
+                output_path=output_path,
+                internal_paths=internal_paths,
+            )
             try:
-                self.decompress(
-                    compressed_file_path=compressed_file,
-                    view_mode=view_mode,
-                    init_decompression=True,
-                    output_path=output_path,
-                    debug_mode=debug_mode,
-                    internal_paths=internal_paths
-                )
-            except Exception as e:
-                non_valid_archive_paths[compressed_file] = (
-                    f"raise {type(e).__name__}({e})"
-                )
-                # remove all files of an invalid archive path
-                self.remove_paths(paths=internal_paths)
+                while True:
+                    try:
+                        for handle, task, args in tasks:
+                            entries_queue.put(handle, task, *args)
+                            if entries_queue.full():
+                                break
+                    except Exception as e:
+                        first_error = e
+                        entries_queue.cancel()
+                        tasks = iter([])
+                    if not len(entries_queue):
+                        break
+
+                    # the tasks which already started are handled after an
+                    # error as well, to collect the paths they wrote
+                    handle, result = entries_queue.get()
+                    error = handle(result, failed=first_error is not None)
+                    if first_error is None and error is not None:
+                        first_error = error
+                        entries_queue.cancel()
+                        tasks = iter([])
+            finally:
+                entries_queue.cancel()
+                del compressed_data, tasks
+
+        if first_error is not None:
+            raise first_error
 
-        return non_valid_archive_paths
-    
     def remove_paths(self, paths: List[str]) -> None:
         """
         Removes files specified by a list of file paths.
@@ -724,40 +4170,468 @@ class FilesystemHandler:
             int | None: Number of files removed from the archive.
         """
         try:
-            count_files_removes = 0
-            update_compressed_data = bytearray()
-            compressed_data = self.read_file(file=archive_path)
-
-            next_index = self.handle_init_decompression(
-                compressed_data=compressed_data
+            _, directory, _ = self.load_archive_index(
+                archive_path=archive_path
             )
-            update_compressed_data.extend(compressed_data[0:next_index])
+            if directory is not None:
+                return self.remove_from_indexed_archive(
+                    input_paths=input_paths,
+                    archive_path=archive_path,
+                    directory=directory,
+                )
 
-            i = next_index
-            while i < len(compressed_data):
+            count_files_removes = 0
+            with self.map_file(file=archive_path) as compressed_data:
+                next_index = self.handle_init_decompression(
+                    compressed_data=compressed_data
+                )
+                update_compressed_data = bytearray(
+                    compressed_data[0:next_index]
+                )
 
-                next_index, file_path = self.get_next_path_from_archive(
+                for entry, _ in self.iter_entries(
                     compressed_data=compressed_data,
                     index=next_index,
-                )
-                if file_path.decode().startswith(tuple(input_paths)):
-                    count_files_removes += 1
-                else:
-                    update_compressed_data.extend(
-                        compressed_data[i:next_index]
-                    )
-
-                i = next_index
+                    read_data=False,
+                ):
+                    if is_under_paths(path=entry.path, paths=input_paths):
+                        count_files_removes += 1
+                    else:
+                        update_compressed_data.extend(compressed_data[
+                            entry.offset:entry.offset + entry.compressed_size
+                        ])
         except Exception as e:
             return None
 
         self.write_file(file=archive_path, data=bytes(update_compressed_data))
         return count_files_removes
 
+    def remove_from_indexed_archive(
+        self,
+        input_paths: List[str],
+        archive_path: str,
+        directory: CentralDirectory,
+    ) -> int:
+        """Remove files from an archive with a central directory.
+
+        The removed entries are moved to the tombstones of the directory
+        and only the directory is written again, after the archive data
+        (see open_output_file()) - the records of the removed entries and
+        the replaced directory stay in the archive as dead space (entries
+        which refer to them are still valid) until it is compacted (see
+        compact_archive()). The removed files are removed from the
+        manifest as well.
+
+        Args:
+            input_paths (list): List of paths to remove from the archive.
+            archive_path (str): Path to the archive.
+            directory (CentralDirectory): The archive central directory.
+
+        Returns:
+            int: Number of files removed from the archive.
+        """
+        removed_entries = directory.find_entries(paths=input_paths)
+        manifest = directory.manifest
+        manifest_entries = [
+            entry for entry in manifest.entries
+            if not is_under_paths(path=entry.path, paths=input_paths)
+        ] if manifest is not None else []
+        # files of a delta archive may only be listed in its manifest
+        if not removed_entries and (
+            manifest is None
+            or len(manifest_entries) == len(manifest.entries)
+        ):
+            return 0
+        if self.widen_header_flags(archive_path=archive_path):
+            # the records were moved
+            _, directory, _ = self.load_archive_index(
+                archive_path=archive_path
+            )
+            return self.remove_from_indexed_archive(
+                input_paths=input_paths,
+                archive_path=archive_path,
+                directory=directory,
+            )
+        if manifest is not None:
+            manifest.entries = manifest_entries
+
+        directory.remove_entries(entries=removed_entries)
+        self.open_output_file(output_file_path=archive_path)
+        try:
+            self._central_directory = directory
+            self.close_output_file()
+        except BaseException:
+            self.discard_output_file()
+            raise
+
+        return len(removed_entries)
+
+    def compact_archives(self, archive_paths: List[str]) -> Dict[str, str]:
+        """Compact archives with a central directory, reclaiming the
+        records of their removed entries.
+
+        Args:
+            archive_paths (list): List of paths to the archives.
+
+        Returns:
+            dict: A dictionary containing the archive paths which could not
+            be compacted and their corresponding error messages.
+        """
+        non_valid_archive_paths = {}
+        for archive_path in archive_paths:
+            try:
+                self.compact_archive(archive_path=archive_path)
+            except Exception as e:
+                non_valid_archive_paths[archive_path] = (
+                    f"raise {type(e).__name__}({e})"
+                )
+        return non_valid_archive_paths
+
+    def compact_archive(
+        self, archive_path: str, flags_size: int = 1
+    ) -> int:
+        """Compact an archive with a central directory, reclaiming the
+        records of its removed entries.
+
+        The remaining records are streamed as is into a new archive next
+        to the original, which then replaces it atomically - nothing is
+        decompressed (only the offsets of reference and chunk list
+        entries are updated - entries which refer to a removed entry take
+        its data).
+
+        Args:
+            archive_path (str): Path to the archive.
+            flags_size (int, optional): The minimum number of bytes of the
+            header flags of the compacted archive (see
+            widen_header_flags()). Defaults to 1.
+
+        Returns:
+            int: The number of bytes reclaimed (negative when the header
+            was widened and nothing was reclaimed).
+
+        Raises:
+            InvalidArchiveFormat: If the archive has no central directory.
+        """
+        header, directory, _ = self.load_archive_index(
+            archive_path=archive_path
+        )
+        if directory is None:
+            raise InvalidArchiveFormat(
+                f"The archive {archive_path} has no central directory."
+            )
+
+        compacted_path = f"{archive_path}.compact"
+        moved_offsets: Dict[int, int] = {}
+        try:
+            with ExitStack() as stack:
+                compressed_data = stack.enter_context(
+                    self.map_file(file=archive_path)
+                )
+                source = stack.enter_context(
+                    open(archive_path, "rb", buffering=0)
+                )
+                target = stack.enter_context(
+                    open(compacted_path, "wb", buffering=0)
+                )
+                archive_size = len(compressed_data)
+                header.flags &= ~ArchiveFlags.REMOVED_ENTRIES
+                header.flags_size = max(header.flags_size, flags_size)
+                offset = target.write(header.to_bytes())
+                for entry in directory.entries:
+                    record = self.relocate_record(
+                        compressed_data=compressed_data,
+                        entry=entry,
+                        offset=offset,
+                        moved_offsets=moved_offsets,
+                    )
+                    if record is None:
+                        self.copy_record(
+                            source=source,
+                            target=target,
+                            index=entry.offset,
+                            offset=offset,
+                            length=entry.compressed_size,
+                        )
+                    else:
+                        target.write(record)
+                        entry.compressed_size = len(record)
+                        entry.record_checksum = zlib.crc32(record)
+                    moved_offsets[entry.offset] = offset
+                    entry.offset = offset
+                    offset += entry.compressed_size
+
+                index_data = CentralDirectory(
+                    entries=directory.entries,
+                    manifest=directory.manifest,
+                    record_checksums=directory.record_checksums,
+                    path_codec=directory.path_codec,
+                ).to_bytes()
+                footer = ArchiveFooter(
+                    index_offset=offset, index_length=len(index_data)
+                )
+                target.write(index_data + footer.to_bytes())
+                os.fsync(target.fileno())
+            os.replace(compacted_path, archive_path)
+        except BaseException:
+            if os.path.exists(compacted_path):
+                os.remove(compacted_path)
+            raise
+
+        return archive_size - os.path.getsize(archive_path)
+
+    def relocate_record(
+        self,
+        compressed_data: memoryview,
+        entry: IndexEntry,
+        offset: int,
+        moved_offsets: Dict[int, int],
+    ) -> Optional[bytes]:
+        """Get the record of an entry which is moved to a new offset, if
+        the record itself changes by the move.
+
+        Args:
+            compressed_data (memoryview): The archive data.
+            entry (IndexEntry): The moved entry.
+            offset (int): The new offset of the entry.
+            moved_offsets (dict): The new offsets of the entries and chunks
+            which were already moved, by their old offsets.
+
+        Returns:
+            bytes | None: The new record of a reference, chunk list or
+            solid entry, None when the record is copied as is.
+        """
+        if entry.flags & EntryFlags.REFERENCE:
+            return self.relocate_reference(
+                compressed_data=compressed_data,
+                entry=entry,
+                offset=offset,
+                moved_offsets=moved_offsets,
+            )
+        if not entry.flags & (EntryFlags.CHUNK_LIST | EntryFlags.SOLID):
+            return None
+
+        # the flags byte is followed by the path
+        data_index = self.skip_path(
+            compressed_data=compressed_data, index=entry.offset + 1
+        )
+        record = bytes(compressed_data[entry.offset:data_index])
+        if entry.flags & EntryFlags.CHUNK_LIST:
+            return record + self.relocate_chunk_list(
+                compressed_data=compressed_data,
+                index=data_index,
+                offset=offset + data_index - entry.offset,
+                moved_offsets=moved_offsets,
+            )
+
+        # the block of a solid entry is followed by the file offset and
+        # size inside it
+        block_data, index = self.relocate_stored_chunk(
+            compressed_data=compressed_data,
+            index=data_index,
+            offset=offset + data_index - entry.offset,
+            moved_offsets=moved_offsets,
+        )
+        _, end = decode_varint(data=compressed_data, index=index)
+        _, end = decode_varint(data=compressed_data, index=end)
+        return record + block_data + bytes(compressed_data[index:end])
+
+    @staticmethod
+    def copy_record(
+        source: BinaryIO, target: BinaryIO, index: int, offset: int,
+        length: int
+    ) -> None:
+        """Copy a record from one file into another, in the kernel when
+        the platform supports copy_file_range and in large buffered copies
+        otherwise. The target file is positioned after the copied record.
+
+        Args:
+            source (BinaryIO): The unbuffered file the record is copied
+            from.
+            target (BinaryIO): The unbuffered file the record is copied to.
+            index (int): The index of the record in the source file.
+            offset (int): The index the record is copied to in the target
+            file.
+            length (int): The length of the record.
+        """
+        end = offset + length
+        if hasattr(os, "copy_file_range"):
+            try:
+                while length > 0:
+                    copied = os.copy_file_range(
+                        source.fileno(), target.fileno(), length,
+                        index, offset,
+                    )
+                    if copied == 0:
+                        break
+                    index += copied
+                    offset += copied
+                    length -= copied
+            except OSError:
+                # e.g. copies between filesystems on older kernels
+                pass
+
+        source.seek(index)
+        target.seek(offset)
+        while length > 0:
+            data = source.read(min(length, COPY_BUFFER_SIZE))
+            if not data:
+                raise InvalidArchiveFormat(
+                    "An entry record ends after the end of the archive."
+                )
+            target.write(data)
+            length -= len(data)
+        target.seek(end)
+
+    def relocate_reference(
+        self,
+        compressed_data: memoryview,
+        entry: IndexEntry,
+        offset: int,
+        moved_offsets: Dict[int, int],
+    ) -> bytes:
+        """Get the record of a reference entry which is moved to a new
+        offset, referring to the new offset of the entry it refers to. If
+        that entry was removed, the reference takes its data instead (and
+        the next references to it refer to this entry).
+
+        Args:
+            compressed_data (memoryview): The archive data.
+            entry (IndexEntry): The reference entry (its flags are updated
+            when it takes the data).
+            offset (int): The new offset of the reference entry.
+            moved_offsets (dict): The new offsets of the entries and chunks
+            which were already moved, by their old offsets.
+
+        Returns:
+            bytes: The record of the entry.
+        """
+        # the flags byte is followed by the path
+        data_index = self.skip_path(
+            compressed_data=compressed_data, index=entry.offset + 1
+        )
+        target_offset, _ = decode_varint(
+            data=compressed_data, index=data_index
+        )
+        path_record = compressed_data[entry.offset + 1:data_index]
+        if target_offset in moved_offsets:
+            return (
+                bytes([entry.flags])
+                + path_record
+                + encode_varint(moved_offsets[target_offset])
+            )
+
+        # the entry it refers to was removed - the data moves to this entry
+        target_flags = EntryFlags(compressed_data[target_offset])
+        target_data_index = self.skip_path(
+            compressed_data=compressed_data, index=target_offset + 1
+        )
+        moved_offsets[target_offset] = offset
+        entry.flags = target_flags
+        if target_flags & EntryFlags.CHUNK_LIST:
+            target_data = self.relocate_chunk_list(
+                compressed_data=compressed_data,
+                index=target_data_index,
+                offset=offset + 1 + len(path_record),
+                moved_offsets=moved_offsets,
+            )
+        else:
+            target_data_end = self.skip_file_data(
+                compressed_data=compressed_data,
+                index=target_data_index,
+                flags=target_flags,
+            )
+            target_data = compressed_data[target_data_index:target_data_end]
+
+        return bytes([target_flags]) + path_record + target_data
+
+    def relocate_chunk_list(
+        self,
+        compressed_data: memoryview,
+        index: int,
+        offset: int,
+        moved_offsets: Dict[int, int],
+    ) -> bytes:
+        """Get the data of a chunk list entry which is moved to a new
+        offset, referring to the new offsets of the stored chunks. Chunks
+        stored by removed entries are stored by this entry instead (and
+        the next references to them refer to this entry).
+
+        Args:
+            compressed_data (memoryview): The archive data.
+            index (int): The index of the entry data.
+            offset (int): The new index of the entry data.
+            moved_offsets (dict): The new offsets of the entries and chunks
+            which were already moved, by their old offsets.
+
+        Returns:
+            bytes: The data of the entry.
+        """
+        data = bytearray()
+        while True:
+            tag, _ = decode_varint(data=compressed_data, index=index)
+            if tag == 0:
+                data.extend(encode_varint(0))
+                return bytes(data)
+
+            chunk_data, index = self.relocate_stored_chunk(
+                compressed_data=compressed_data,
+                index=index,
+                offset=offset + len(data),
+                moved_offsets=moved_offsets,
+            )
+            data.extend(chunk_data)
+
+    def relocate_stored_chunk(
+        self,
+        compressed_data: memoryview,
+        index: int,
+        offset: int,
+        moved_offsets: Dict[int, int],
+    ) -> Tuple[bytes, int]:
+        """Get the tag (and the stored data) of a chunk of a chunk list
+        entry, or of the block of a solid entry, which is moved to a new
+        offset. A chunk stored by a removed entry is stored by this entry
+        instead (and the next references to it refer to this entry).
+
+        Args:
+            compressed_data (memoryview): The archive data.
+            index (int): The index of the chunk tag.
+            offset (int): The new index of the chunk tag.
+            moved_offsets (dict): The new offsets of the entries and chunks
+            which were already moved, by their old offsets.
+
+        Returns:
+            Tuple[bytes, int]: The new tag (followed by the chunk when it
+            is stored) and the index after the chunk tag (and data).
+        """
+        tag, next_index = decode_varint(data=compressed_data, index=index)
+        chunk_index = tag >> 1 if tag & 1 else index
+        if tag & 1 and chunk_index in moved_offsets:
+            return (
+                encode_varint(moved_offsets[chunk_index] << 1 | 1),
+                next_index,
+            )
+
+        # a stored chunk, or a chunk of a removed entry which is stored by
+        # this entry instead
+        stored_len, chunk_start = decode_varint(
+            data=compressed_data, index=chunk_index
+        )
+        chunk_end = chunk_start + (stored_len >> 1)
+        moved_offsets[chunk_index] = offset
+        return (
+            bytes(compressed_data[chunk_index:chunk_end]),
+            next_index if tag & 1 else chunk_end,
+        )
+
     def update_archive(self, input_paths: List[str], 
                        archive_path: str) -> bool:
         """Update an existing archive with new files.
 
+        Archives with a central directory are updated without being
+        written again (see update_indexed_archive()), the entries of other
+        archives are removed and written again.
+
         Args:
             input_paths (list): List of paths to add to the archive.
             archive_path (str): Path to the archive.
@@ -765,27 +4639,174 @@ class FilesystemHandler:
         Returns:
             bool: True if the archive path is valid, False otherwise.
         """
+        try:
+            _, directory, _ = self.load_archive_index(
+                archive_path=archive_path
+            )
+        except Exception:
+            return False
+        if directory is not None:
+            self.update_indexed_archive(
+                input_paths=input_paths, archive_path=archive_path
+            )
+            return True
+
         result = self.remove_from_archive(
             input_paths=input_paths, archive_path=archive_path
         )
         if result == None:
             return False
         else:
+            self.open_output_file(output_file_path=archive_path)
             self.compress(directories=input_paths, remove_output=False)
+            self.close_output_file()
             return True
 
-    def check_validation(self, archive_paths: List[str]) -> Dict[str, str]:
-        """Check the validation of archived files and directories.
+    def update_indexed_archive(
+        self, input_paths: List[str], archive_path: str
+    ) -> None:
+        """Update an archive with a central directory, appending the new
+        entries and directory to it (see open_output_file()) - the entries
+        they supersede become tombstones. With a manifest the files are
+        checked against it (see add_manifest_entry()) - only changed and
+        new files are compressed, the entries of files which no longer
+        exist become tombstones too, and unchanged files are not touched
+        at all (nothing is written when no file changed).
+
+        Args:
+            input_paths (list): List of paths to add to the archive.
+            archive_path (str): Path to the archive.
+        """
+        self.widen_header_flags(archive_path=archive_path)
+        self.open_output_file(output_file_path=archive_path)
+        try:
+            directory = self._central_directory
+            manifest = directory.manifest
+            if manifest is not None:
+                archived_files = {
+                    entry.path: (entry.size, entry.mtime, entry.content_hash)
+                    for entry in manifest.entries
+                }
+                manifest_entries = []
+                for entry in manifest.entries:
+                    if is_under_paths(path=entry.path, paths=input_paths):
+                        # the files are added to the manifest again when
+                        # compressed
+                        self._base_manifest[entry.path] = entry
+                    else:
+                        manifest_entries.append(entry)
+                manifest.entries = manifest_entries
+            old_entries = directory.find_entries(paths=input_paths)
+            entries_count = len(directory.entries)
+
+            # a file which fails to compress discards the update
+            self.compress(directories=input_paths)
+            if self._output_file.closed:
+                return
+
+            if manifest is not None:
+                written_paths = {
+                    entry.path for entry in directory.entries[entries_count:]
+                }
+                archived_paths = {entry.path for entry in manifest.entries}
+                old_entries = [
+                    entry for entry in old_entries
+                    if entry.path in written_paths
+                    or entry.path not in archived_paths
+                ]
+                if not written_paths and not old_entries and {
+                    entry.path: (entry.size, entry.mtime, entry.content_hash)
+                    for entry in manifest.entries
+                } == archived_files:
+                    self.discard_output_file()
+                    return
+            directory.remove_entries(entries=old_entries)
+            self.close_output_file()
+        except BaseException:
+            self.discard_output_file()
+            raise
+
+    def check_validation(
+        self,
+        archive_paths: List[str],
+        timeout_seconds: Optional[int] = None,
+        quick: bool = False,
+    ) -> Dict[str, str]:
+        """Check the validation of archived files and directories - by
+        decompressing every entry and verifying its checksum, or (quick)
+        by verifying the checksums of the entry records without
+        decompressing them. Archives without record checksums are always
+        decompressed.
 
         Args:
             archive_paths (list): List of paths to archived
             files and directories.
+            timeout_seconds (int, optional): Timeout in seconds for every
+            decompressed archive. Defaults to None (no timeout).
+            quick (bool, optional): Whether only the entry records are
+            verified. Defaults to False.
 
         Returns:
             dict: A dictionary containing non-valid archive paths
             and their corresponding error messages.
         """
+        non_valid_archive_paths = {}
+        decompressed_paths = []
+        for archive_path in archive_paths:
+            if not quick:
+                decompressed_paths.append(archive_path)
+                continue
+            try:
+                if not self.validate_archive_records(
+                    archive_path=archive_path
+                ):
+                    decompressed_paths.append(archive_path)
+            except Exception as e:
+                non_valid_archive_paths[archive_path] = (
+                    f"raise {type(e).__name__}({e})"
+                )
+
+        if decompressed_paths:
+            non_valid_archive_paths.update(self.decompress_files(
+                directories=decompressed_paths,
+                debug_mode=True,
+                timeout_seconds=timeout_seconds,
+            ))
+
+        return non_valid_archive_paths
+
+    def validate_archive_records(self, archive_path: str) -> bool:
+        """Verify the CRC32 of every entry record of an archive against its
+        central directory, without decompressing anything - corrupted
+        compressed data is found at the speed of reading the archive.
+
+        Args:
+            archive_path (str): Path to the archive.
 
-        return self.decompress_files(
-            directories=archive_paths, debug_mode=True
+        Returns:
+            bool: True if the records were verified, False if the archive
+            has no record checksums.
+
+        Raises:
+            ChecksumMismatch: If an entry record does not match its
+            checksum.
+        """
+        _, directory, footer = self.load_archive_index(
+            archive_path=archive_path
         )
+        if directory is None or not directory.record_checksums:
+            return False
+
+        with self.map_file(file=archive_path) as compressed_data:
+            for entry in directory.entries:
+                record_end = entry.offset + entry.compressed_size
+                if record_end > footer.index_offset or zlib.crc32(
+                    compressed_data[entry.offset:record_end]
+                ) != entry.record_checksum:
+                    raise ChecksumMismatch(
+                        f"The record of {entry.path} does not match its "
+                        f"checksum."
+                    )
+            del compressed_data
+
+        return True
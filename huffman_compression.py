@@ -36,6 +36,8 @@ class HuffmanCompression(DataCompression):
         get_metadata() -> bytes: Retrieves metadata related to Huffman compression.
     """
 
+    codec_id = 2
+
     def __init__(self) -> None:
         """Initialize the HuffmanCompression class."""
         super().__init__()
@@ -229,7 +231,6 @@ class HuffmanCompression(DataCompression):
             bytes: The compressed data.
         """
         self._reverse_mapping = {}
-        data = data.rstrip()
         frequency = self.make_frequency_dict(data)
         self.make_heap(frequency)
         self.merge_nodes()
@@ -325,7 +326,7 @@ class HuffmanCompression(DataCompression):
             huffman_table_len = compressed_data[0]
 
         hufffman_table = json.loads(
-            compressed_data[start_index : huffman_table_len + 1].decode()
+            bytes(compressed_data[start_index : huffman_table_len + 1])
         )
 
         bit_string = ""
@@ -348,9 +349,7 @@ class HuffmanCompression(DataCompression):
         algorithm.
 
         Returns:
-            bytes: Metadata information encoded as bytes.
+            bytes: Metadata information encoded as bytes - huffman
+            compression has no parameters.
         """
-        metadata = bytearray()
-        metadata.extend(self.__class__.__name__.encode())
-
-        return bytes(metadata)
+        return b""
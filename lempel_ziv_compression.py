@@ -1,5 +1,8 @@
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from data_compression import DataCompression
+from stream_compression import (
+    EscapedStreamDecompressor, StreamCompressor, StreamDecompressor
+)
 
 
 class LempelZivCompression(DataCompression):
@@ -10,13 +13,18 @@ class LempelZivCompression(DataCompression):
     compressingand decompressing data using the Lempel-Ziv algorithm.
 
     Attributes:
+        stream_compatible (bool): True - compress_data() output is a
+        single Lempel-Ziv stream.
         _last_data_bytes_sign (bytes): The sign used to mark the last
         data bytes.
 
     Methods:
         __init__: Initialize the LempelZivCompression object.
+        compressor: Create an incremental Lempel-Ziv compressor.
+        decompressor: Create an incremental Lempel-Ziv decompressor.
         compress_prev: Compress the previous sequence in the compression
         process.
+        compress_end_of_data: Compress the last (incomplete) sequence.
         get_byte_representation: Get the byte representation of an integer.
         compress_data: Compress data using the Lempel-Ziv algorithm.
         bigger_than_max_bytes: Check if the compressed data uses a
@@ -25,6 +33,7 @@ class LempelZivCompression(DataCompression):
         bigger-than-maximum byte representation.
         end_of_data: Check if the compressed data indicates the end of
         the data.
+        is_unit_complete: Check if a compressed unit is complete.
         get_key_by_val: Get a key from a dictionary by its value.
         update_codebook: Update the codebook used in decompression.
         update_decompress_data: Update the decompressed data during
@@ -35,6 +44,9 @@ class LempelZivCompression(DataCompression):
         decompress_data: Decompress data using the Lempel-Ziv algorithm.
     """
 
+    codec_id = 3
+    stream_compatible = True
+
     def __init__(self) -> None:
         """
         Initializes the LempelZivCompression object.
@@ -45,6 +57,191 @@ class LempelZivCompression(DataCompression):
         super().__init__()
         self._last_data_bytes_sign = b"!@#"
 
+    class Compressor(StreamCompressor):
+        """Compressor is an incremental Lempel-Ziv compressor - the
+        codebook is kept between chunks, so the output is the same as
+        compress_data() output.
+
+        Args:
+            compression_algorithem (LempelZivCompression): The Lempel-Ziv
+            compression.
+        """
+
+        def __init__(
+            self, compression_algorithem: "LempelZivCompression"
+        ) -> None:
+            """Initialize the Compressor class.
+
+            Args:
+                compression_algorithem (LempelZivCompression): The
+                Lempel-Ziv compression.
+            """
+            self._compression_algorithem = compression_algorithem
+            self._result: Dict[bytes, int] = {}
+            self._index = 1
+            self._prev = b""
+
+        def feed(self, chunk: bytes) -> bytes:
+            """Compress the next chunk of data - the last sequence is
+            kept, since it may continue in the next chunk.
+
+            Args:
+                chunk (bytes): The next chunk of data.
+
+            Returns:
+                bytes: The escaped compressed data of the chunk.
+            """
+            algo = self._compression_algorithem
+            compress_data = bytearray()
+            algo.set_signs_positions(positions=set())
+            for c in chunk:
+                byte_representation = algo.get_byte_representation(c)
+                current = self._prev + byte_representation
+                if current in self._result:
+                    self._prev = current
+                else:
+                    self._result[current] = self._index
+                    if self._prev == b"":
+                        compress_data.append(0)
+                    else:
+                        algo.compress_prev(
+                            result=self._result,
+                            prev=self._prev,
+                            compress_data=compress_data,
+                        )
+
+                    compress_data.extend(byte_representation)
+                    self._prev = b""
+                    self._index += 1
+
+            return algo.escape_signs(compress_data=compress_data)
+
+        def flush(self) -> bytes:
+            """Compress the last sequence, which is already in the
+            codebook.
+
+            Returns:
+                bytes: The escaped compressed data of the last sequence.
+            """
+            algo = self._compression_algorithem
+            compress_data = bytearray()
+            algo.set_signs_positions(positions=set())
+            if self._prev:
+                algo.compress_end_of_data(
+                    result=self._result,
+                    prev=self._prev,
+                    compress_data=compress_data,
+                )
+                self._prev = b""
+
+            return algo.escape_signs(compress_data=compress_data)
+
+    class Decompressor(EscapedStreamDecompressor):
+        """Decompressor is an incremental Lempel-Ziv decompressor - the
+        codebook is kept between chunks.
+
+        Args:
+            compression_algorithem (LempelZivCompression): The Lempel-Ziv
+            compression.
+        """
+
+        def __init__(
+            self, compression_algorithem: "LempelZivCompression"
+        ) -> None:
+            """Initialize the Decompressor class.
+
+            Args:
+                compression_algorithem (LempelZivCompression): The
+                Lempel-Ziv compression.
+            """
+            super().__init__(compression_algorithem=compression_algorithem)
+            self._codebook: Dict[bytes, int] = {}
+            self._index = 1
+            self._ended = False
+
+        def decode(self, data: bytearray, final: bool) -> Tuple[bytes, int]:
+            """Decode the complete units of unescaped data.
+
+            Args:
+                data (bytearray): The unescaped data.
+                final (bool): Whether no more data will follow, so the
+                last unit must be decoded even if it looks incomplete.
+
+            Returns:
+                Tuple[bytes, int]: The decoded data and the number of
+                bytes of data that were consumed.
+            """
+            algo = self._compression_algorithem
+            decompress_data = bytearray()
+            i = 0
+            while i < len(data) and not self._ended:
+                if not final and not algo.is_unit_complete(
+                    compressed_data=data, i=i
+                ):
+                    break
+
+                codebook_index = data[i]
+                # symbol in lempel ziv codebook that contains just itself
+                if codebook_index == 0:
+                    decompress_data.append(data[i + 1])
+                    byte_representation = algo.get_byte_representation(
+                        n=data[i + 1]
+                    )
+                    algo.update_codebook(
+                        self._codebook, b"", byte_representation, self._index
+                    )
+                    i += 2
+                elif algo.bigger_than_max_bytes(compressed_data=data, i=i):
+                    i = algo.decompress_data_bigger_than_max_size(
+                        decompress_data=decompress_data,
+                        compressed_data=data,
+                        codebook=self._codebook,
+                        index=self._index,
+                        i=i,
+                    )
+                elif algo.end_of_data(compressed_data=data, i=i):
+                    algo.decompress_end_of_data(
+                        compressed_data=data,
+                        codebook=self._codebook,
+                        decompress_data=decompress_data,
+                        i=i,
+                    )
+                    self._ended = True
+                # that case is for data that has prev symbol
+                # that already exist in codebool
+                else:
+                    i = algo.decompress_regular_data(
+                        decompress_data=decompress_data,
+                        compressed_data=data,
+                        codebook=self._codebook,
+                        codebook_index=codebook_index,
+                        index=self._index,
+                        i=i,
+                    )
+
+                self._index += 1
+
+            # nothing is decoded after the end of data sign
+            if self._ended:
+                i = len(data)
+            return bytes(decompress_data), min(i, len(data))
+
+    def compressor(self) -> StreamCompressor:
+        """Creates an incremental Lempel-Ziv compressor.
+
+        Returns:
+            StreamCompressor: An object with feed(chunk) and flush().
+        """
+        return self.Compressor(compression_algorithem=self)
+
+    def decompressor(self) -> StreamDecompressor:
+        """Creates an incremental Lempel-Ziv decompressor.
+
+        Returns:
+            StreamDecompressor: An object with feed(chunk) and flush().
+        """
+        return self.Decompressor(compression_algorithem=self)
+
     def compress_prev(
         self, result: Dict[bytes, int], prev: bytes, compress_data: bytearray
     ) -> None:
@@ -56,33 +253,29 @@ class LempelZivCompression(DataCompression):
             compress_data (bytearray): The compressed data.
         """
         if result[prev] >= self._max_bytes_range:
-            compress_data.extend(self._bigger_than_max_bytes_sign)
+            self.append_sign(
+                compress_data=compress_data,
+                sign=self._bigger_than_max_bytes_sign,
+            )
 
             original_a = int(result[prev] / self._max_bytes_range)
             if original_a >= self._max_bytes_range:
-                compress_data.extend(self._bigger_than_max_bytes_sign)
+                self.append_sign(
+                    compress_data=compress_data,
+                    sign=self._bigger_than_max_bytes_sign,
+                )
 
                 a = int(original_a / self._max_bytes_range)
                 b = original_a % self._max_bytes_range
-                if self.valid_append_for_compression(
-                    compress_data=compress_data, extra_append=a):
-                    compress_data.append(a)
-                if self.valid_append_for_compression(
-                    compress_data=compress_data, extra_append=b):
-                    compress_data.append(b)
+                compress_data.append(a)
+                compress_data.append(b)
             else:
-                if self.valid_append_for_compression(
-                    compress_data=compress_data, extra_append=original_a):
-                    compress_data.append(original_a)
+                compress_data.append(original_a)
 
             c = result[prev] % self._max_bytes_range
-            if self.valid_append_for_compression(
-                    compress_data=compress_data, extra_append=c):
-                compress_data.append(c)
+            compress_data.append(c)
         else:
-            if self.valid_append_for_compression(
-                    compress_data=compress_data, extra_append=result[prev]):
-                compress_data.append(result[prev])
+            compress_data.append(result[prev])
 
     def get_byte_representation(self, n: int) -> bytes:
         """Converts an integer into its byte representation.
@@ -101,6 +294,24 @@ class LempelZivCompression(DataCompression):
 
         return byte_representation
 
+    def compress_end_of_data(
+        self, result: Dict[bytes, int], prev: bytes, compress_data: bytearray
+    ) -> None:
+        """Compresses the last sequence, which is already in the codebook,
+        after the last data bytes sign.
+
+        Args:
+            result (dict): The compression result dictionary.
+            prev (bytes): The last sequence.
+            compress_data (bytearray): The compressed data.
+        """
+        self.append_sign(
+            compress_data=compress_data, sign=self._last_data_bytes_sign
+        )
+        self.compress_prev(
+            result=result, prev=prev, compress_data=compress_data
+        )
+
     def compress_data(self, data: bytes) -> bytes:
         """Compresses the input data using Lempel-Ziv compression.
 
@@ -110,38 +321,8 @@ class LempelZivCompression(DataCompression):
         Returns:
             bytes: The compressed data.
         """
-        compress_data = bytearray()
-        index = 1
-        result = {}
-        prev = b""
-        current = None
-        for c in data:
-            byte_representation = self.get_byte_representation(c)
-            current = prev + byte_representation
-            if current in result:
-                prev = current
-            else:
-                result[current] = index
-                if prev == b"":
-                    compress_data.append(0)
-                else:
-                    self.compress_prev(
-                        result=result, prev=prev, compress_data=compress_data
-                    )
-
-                if self.valid_extend_for_compression(
-                    compress_data=compress_data, extra_extend=byte_representation):
-                    compress_data.extend(byte_representation)
-                prev = b""
-                index += 1
-
-        if prev == current:
-            compress_data.extend(self._last_data_bytes_sign)
-            self.compress_prev(
-                result=result, prev=prev, compress_data=compress_data
-            )
-
-        return bytes(compress_data)
+        compressor = self.compressor()
+        return compressor.feed(chunk=data) + compressor.flush()
 
     def bigger_than_max_bytes(self, compressed_data: bytes, i: int) -> bool:
         """Checks if the data size is bigger than the maximum bytes range.
@@ -154,13 +335,11 @@ class LempelZivCompression(DataCompression):
             bool: True if the size is bigger than the max bytes range,
             False otherwise.
         """
-        if (
-            compressed_data[i] == self._bigger_than_max_bytes_sign[0]
-            and compressed_data[i + 1] == self._bigger_than_max_bytes_sign[1]
-            and compressed_data[i + 2] == self._bigger_than_max_bytes_sign[2]
-        ):
-            return True
-        return False
+        return self.is_sign(
+            data=compressed_data,
+            i=i,
+            sign=self._bigger_than_max_bytes_sign,
+        )
 
     def decompress_data_bigger_than_max_size(
         self,
@@ -221,15 +400,49 @@ class LempelZivCompression(DataCompression):
         Returns:
             bool: True if end of data, False otherwise.
         """
-        if (
-            i + 3 < len(compressed_data)
-            and compressed_data[i] == self._last_data_bytes_sign[0]
-            and compressed_data[i + 1] == self._last_data_bytes_sign[1]
-            and compressed_data[i + 2] == self._last_data_bytes_sign[2]
+        return i + 3 < len(compressed_data) and self.is_sign(
+            data=compressed_data, i=i, sign=self._last_data_bytes_sign
+        )
+
+    def is_unit_complete(self, compressed_data: bytes, i: int) -> bool:
+        """Checks if the compressed unit (a codebook index and a symbol,
+        or the end of data) which starts at the given index is complete.
+
+        Args:
+            compressed_data (bytes): The unescaped compressed data.
+            i (int): The index of the unit in the compressed data.
+
+        Returns:
+            bool: True if all the bytes of the unit are available.
+        """
+        size = len(compressed_data)
+        if compressed_data[i] == 0:
+            return i + 2 <= size
+        if self.bigger_than_max_bytes(compressed_data=compressed_data, i=i):
+            if i + 4 > size:
+                return False
+            if self.bigger_than_max_bytes(
+                compressed_data=compressed_data, i=i + 3
+            ):
+                return i + 10 <= size
+            return i + 6 <= size
+        if self.is_sign(
+            data=compressed_data, i=i, sign=self._last_data_bytes_sign
         ):
-            
-            return True
-        return False
+            if i + 4 > size:
+                return False
+            if not self.bigger_than_max_bytes(
+                compressed_data=compressed_data, i=i + 3
+            ):
+                return True
+            if i + 7 > size:
+                return False
+            if self.bigger_than_max_bytes(
+                compressed_data=compressed_data, i=i + 6
+            ):
+                return i + 12 <= size
+            return i + 8 <= size
+        return i + 2 <= size
 
     def get_key_by_val(self, d: Dict[bytes, int], value: int) -> bytes:
         """Gets the key from a dictionary by its value.
@@ -302,6 +515,16 @@ class LempelZivCompression(DataCompression):
             i (int): The current index in the compressed data.
         """
         if self.bigger_than_max_bytes(
+            compressed_data=compressed_data, i=i + 6
+        ):
+            a = (
+                self._max_bytes_range * compressed_data[i + 9]
+                + compressed_data[i + 10]
+            )
+            codebook_index = (
+                self._max_bytes_range * a + compressed_data[i + 11]
+            )
+        elif self.bigger_than_max_bytes(
             compressed_data=compressed_data, i=i + 3
         ):
             codebook_index = (
@@ -359,67 +582,17 @@ class LempelZivCompression(DataCompression):
         Returns:
             bytes: The decompressed data.
         """
-        decompress_data = bytearray()
-        codebook:  Dict[bytes, int] = {}
-        index = 1
-        i = 0
-        while i < len(compressed_data):
-            codebook_index = compressed_data[i]
-            # symbol in lempel ziv codebook that contains just itself
-            if codebook_index == 0:
-                decompress_data.append(compressed_data[i + 1])
-                prev = b""
-                byte_representation = self.get_byte_representation(
-                    n=compressed_data[i + 1]
-                )
-                self.update_codebook(
-                    codebook, prev, byte_representation, index
-                )
-                i += 2
-            elif self.bigger_than_max_bytes(
-                compressed_data=compressed_data, i=i
-            ):
-                i = self.decompress_data_bigger_than_max_size(
-                    decompress_data=decompress_data,
-                    compressed_data=compressed_data,
-                    codebook=codebook,
-                    index=index,
-                    i=i,
-                )
-            elif self.end_of_data(compressed_data=compressed_data, i=i):
-                self.decompress_end_of_data(
-                    compressed_data=compressed_data,
-                    codebook=codebook,
-                    decompress_data=decompress_data,
-                    i=i,
-                )
-                break
-            # that case is for data that has prev symbol 
-            # that already exist in codebool
-            else:
-                i = self.decompress_regular_data(
-                    decompress_data=decompress_data,
-                    compressed_data=compressed_data,
-                    codebook=codebook,
-                    codebook_index=codebook_index,
-                    index=index,
-                    i=i,
-                )
-
-            index += 1
-
-        return bytes(decompress_data)
+        decompressor = self.decompressor()
+        return decompressor.feed(chunk=compressed_data) + decompressor.flush()
 
     def get_metadata(self) -> bytes:
         """Gets metadata information about the compression algorithm.
 
         Returns:
-            bytes: Metadata information encoded as bytes.
+            bytes: Metadata information encoded as bytes - lempel ziv
+            compression has no parameters.
         """
-        metadata = bytearray()
-        metadata.extend(self.__class__.__name__.encode())
-
-        return bytes(metadata)
+        return b""
 
     def get_special_signs(self) -> List[bytes]:
         """Get the special signs for the compression algorithm.
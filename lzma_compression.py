@@ -0,0 +1,44 @@
+import lzma
+from typing import Any
+from stdlib_compression import StdlibCompression
+
+
+class LzmaCompression(StdlibCompression):
+    """LzmaCompression is a class that wraps the lzma (xz) compression
+    of the python standard library.
+
+    Args:
+        StdlibCompression (class): The base class for standard library
+        compression algorithms.
+
+    Methods:
+        compressobj() -> Any: Creates a new lzma compressor object.
+        decompressobj() -> Any: Creates a new lzma decompressor object.
+    """
+
+    codec_id = 5
+    DEFAULT_LEVEL = 6
+
+    def __init__(self, level: int = DEFAULT_LEVEL) -> None:
+        """Initialize the LzmaCompression class.
+
+        Args:
+            level (int): The compression preset (0-9). Default: 6
+        """
+        super().__init__(level=level)
+
+    def compressobj(self) -> Any:
+        """Creates a new lzma compressor object.
+
+        Returns:
+            Any: lzma compressor object.
+        """
+        return lzma.LZMACompressor(preset=self._level)
+
+    def decompressobj(self) -> Any:
+        """Creates a new lzma decompressor object.
+
+        Returns:
+            Any: lzma decompressor object.
+        """
+        return lzma.LZMADecompressor()
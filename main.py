@@ -8,6 +8,8 @@ from display_action_info import DisplayActionInfo
 from action_types import ActionTypes
 from compression_types import CompressionTypes
 from data_compression import DataCompression
+from stdlib_compression import StdlibCompression
+from archive_format import DEFAULT_CHUNK_SIZE
 
 
 def run(
@@ -20,6 +22,16 @@ def run(
     ignore_folders: List[str] = [],
     ignore_extensions: List[str] = [],
     timeout_seconds: int = 300,
+    compression_level: Optional[int] = None,
+    entries: List[str] = [],
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    deduplicate: bool = False,
+    content_chunk_size: Optional[int] = None,
+    incremental: bool = False,
+    base_archive_path: Optional[str] = None,
+    quick: bool = False,
+    solid_block_size: Optional[int] = None,
 ) -> None:
     """Run the specified action with compression and decompression options.
 
@@ -37,12 +49,47 @@ def run(
         compression. Defaults to [].
         ignore_extensions (list, optional): List of file extensions to
         ignore during compression. Defaults to [].
+        timeout_seconds (int, optional): Timeout in seconds for the
+        decompress action (for every archive when validating or when
+        using workers). Defaults to 300.
+        compression_level (int, optional): Compression level for the
+        zlib/lzma/bz2 algorithems. Defaults to the algorithem default.
+        entries (list, optional): Glob patterns of the entries to extract
+        (Relevant just for extract action). Defaults to [].
+        workers (int, optional): Number of worker processes files are
+        compressed, extracted and validated in. Defaults to 1.
+        chunk_size (int, optional): Size of the chunks big files are
+        compressed in. Defaults to DEFAULT_CHUNK_SIZE (1 MB).
+        deduplicate (bool, optional): Whether identical files are stored
+        once (Relevant just for compress action). Defaults to False.
+        content_chunk_size (int, optional): Average size of the content
+        defined chunks files are split into, so identical chunks are
+        stored once (Relevant just for compress action). Defaults to None.
+        incremental (bool, optional): Whether a manifest of the compressed
+        files is written, so later runs can write delta archives against
+        the archive (Relevant just for compress action). Defaults to False.
+        base_archive_path (str, optional): Archive to write a delta archive
+        of - only files which changed since it are compressed (Relevant
+        just for compress action). Defaults to None.
+        quick (bool, optional): Whether archives are validated by the
+        checksums of their entry records, without decompressing them
+        (Relevant just for is-valid-archive action). Defaults to False.
+        solid_block_size (int, optional): Size of the solid blocks small
+        files are concatenated into, each compressed as one stream
+        (Relevant just for compress action). Defaults to None.
     """
-    if not validate_args(output_path=output_path, action_type=action_type):
+    if not validate_args(output_path=output_path, action_type=action_type,
+                         entries=entries, compression_type=compression_type,
+                         compression_level=compression_level):
         return
 
     handler = define_handler(
-        compression_type=compression_type, bytes_size=bytes_size)
+        compression_type=compression_type, bytes_size=bytes_size,
+        compression_level=compression_level, workers=workers,
+        chunk_size=chunk_size, deduplicate=deduplicate,
+        content_chunk_size=content_chunk_size, incremental=incremental,
+        base_archive_path=base_archive_path,
+        solid_block_size=solid_block_size)
 
     display_info = DisplayActionInfo(action_type=action_type,
         input_paths=input_paths, output_path=output_path)
@@ -54,9 +101,15 @@ def run(
         ignore_files=ignore_files, ignore_extensions=ignore_extensions)
 
     elif action_type == ActionTypes.DECOMPRESS.value:
-        error_msg = handle_decompress_action_with_timeout(
-            timeout_seconds=timeout_seconds, handler=handler, 
-            input_paths=input_paths, output_path=output_path)
+        if workers > 1:
+            # the timeout is enforced for every archive in its worker
+            error_msg = handler.decompress_files(
+                directories=input_paths, output_path=output_path,
+                timeout_seconds=timeout_seconds)
+        else:
+            error_msg = handle_decompress_action_with_timeout(
+                timeout_seconds=timeout_seconds, handler=handler, 
+                input_paths=input_paths, output_path=output_path)
 
         valid = display_info.alert(error_msg=error_msg)
     elif action_type == ActionTypes.REMOVE_FROM_ARCHIVE.value:
@@ -64,10 +117,8 @@ def run(
             input_paths=input_paths, archive_path=output_path)
 
     elif action_type == ActionTypes.UPDATE_ARCHIVE.value:
-        handler.open_output_file(output_file_path=output_path)
         result = handler.update_archive(
             input_paths=input_paths, archive_path=output_path)
-        handler.close_output_file()
 
     elif action_type == ActionTypes.VIEW_ARCHIVE.value:
         error_msg = handler.decompress_files(
@@ -75,9 +126,20 @@ def run(
         valid = display_info.alert(error_msg)
 
     elif action_type == ActionTypes.CHECK_VALIDATION.value:
-        result = handler.check_validation(archive_paths=input_paths)
+        result = handler.check_validation(
+            archive_paths=input_paths, timeout_seconds=timeout_seconds,
+            quick=quick)
         display_info.alert(result)
 
+    elif action_type == ActionTypes.EXTRACT.value:
+        error_msg = handler.extract_files(
+            directories=input_paths, entries=entries, output_path=output_path)
+        valid = display_info.alert(error_msg)
+
+    elif action_type == ActionTypes.COMPACT_ARCHIVE.value:
+        error_msg = handler.compact_archives(archive_paths=input_paths)
+        valid = display_info.alert(error_msg)
+
     if valid:
         display_info.show(
             result=result,
@@ -85,13 +147,39 @@ def run(
                 handler.get_compression_algorithem_name())
 
 
-def define_handler(compression_type: str, 
-                   bytes_size: int) -> FilesystemHandler:
+def define_handler(compression_type: str, bytes_size: int,
+                   compression_level: Optional[int] = None,
+                   workers: int = 1,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   deduplicate: bool = False,
+                   content_chunk_size: Optional[int] = None,
+                   incremental: bool = False,
+                   base_archive_path: Optional[str] = None,
+                   solid_block_size: Optional[int] = None
+                   ) -> FilesystemHandler:
     """Define a compression handler based on the specified compression type.
 
     Args:
         compression_type (str): The type of compression algorithm.
         bytes_size (int): The number of bytes to process at a time.
+        compression_level (int, optional): The compression level of the
+        zlib/lzma/bz2 algorithems. Defaults to the algorithem default.
+        workers (int, optional): The number of worker processes files are
+        compressed and extracted in. Defaults to 1.
+        chunk_size (int, optional): The size of the chunks big files are
+        compressed in. Defaults to DEFAULT_CHUNK_SIZE.
+        deduplicate (bool, optional): Whether files with the content of an
+        earlier file are written as references to it. Defaults to False.
+        content_chunk_size (int, optional): The average size of the content
+        defined chunks files are split into. Defaults to None (files are
+        not split into content defined chunks).
+        incremental (bool, optional): Whether a manifest of the compressed
+        files is written. Defaults to False.
+        base_archive_path (str, optional): The archive to write a delta
+        archive of. Defaults to None (a full archive is written).
+        solid_block_size (int, optional): The size of the solid blocks
+        small files are concatenated into. Defaults to None (files are
+        compressed one by one).
 
     Returns:
         FilesystemHandler: The initialized filesystem handler object.
@@ -99,17 +187,24 @@ def define_handler(compression_type: str,
 
     compression_algorithem: Optional[DataCompression] = None
 
-    if compression_type == CompressionTypes.RLE.name.lower():
-        compression_algorithem = CompressionTypes.RLE.value(
-            bytes_size=bytes_size
-        )
-    elif compression_type == CompressionTypes.HUFFMAN.name.lower():
-        compression_algorithem = CompressionTypes.HUFFMAN.value()
-    elif compression_type == CompressionTypes.LZ.name.lower():
-        compression_algorithem = CompressionTypes.LZ.value()
+    member = CompressionTypes[compression_type.upper()]
+    if member == CompressionTypes.RLE:
+        compression_algorithem = member.value(bytes_size=bytes_size)
+    elif compression_level is not None and issubclass(
+            member.value, StdlibCompression):
+        compression_algorithem = member.value(level=compression_level)
+    else:
+        compression_algorithem = member.value()
 
     handler = FilesystemHandler(
-        data_compression_algorithem=compression_algorithem
+        data_compression_algorithem=compression_algorithem,
+        workers=workers,
+        chunk_size=chunk_size,
+        deduplicate=deduplicate,
+        content_chunk_size=content_chunk_size,
+        incremental=incremental,
+        base_archive_path=base_archive_path,
+        solid_block_size=solid_block_size,
     )
 
     return handler
@@ -168,18 +263,33 @@ def handle_compress_action(
     return result
 
 
-def validate_args(output_path: str, action_type: str) -> bool:
+def validate_args(output_path: str, action_type: str,
+                  entries: List[str] = [], compression_type: str = "rle",
+                  compression_level: Optional[int] = None) -> bool:
     """Validate the command-line arguments.
 
     Args:
         output_path (str): Path to the output file or directory.
         action_type (str): Type of action to perform.
+        entries (list, optional): Glob patterns of the entries to extract.
+        compression_type (str, optional): Type of compression algorithm.
+        compression_level (int, optional): Compression level for the
+        zlib/lzma/bz2 algorithems.
     Return:
         bool: If validation valid or not.
     """
     error_msg = ""
+    compression_class = CompressionTypes[compression_type.upper()].value
 
-    if action_type in [ActionTypes.COMPRESS.value] and not output_path:
+    if compression_level is not None and issubclass(
+            compression_class, StdlibCompression) and \
+            not compression_class.is_valid_level(level=compression_level):
+        error_msg = f"Error - compression level: {compression_level} "
+        error_msg += f"of {compression_type} is not between "
+        error_msg += f"{compression_class.MIN_LEVEL} and "
+        error_msg += f"{compression_class.MAX_LEVEL}."
+
+    elif action_type in [ActionTypes.COMPRESS.value] and not output_path:
         error_msg = f"Error - missing output path parameter."
 
     elif action_type in [
@@ -193,6 +303,12 @@ def validate_args(output_path: str, action_type: str) -> bool:
         if output_path and not os.path.isdir(output_path):
             error_msg = f"Error - output_path: {output_path} doesn't exist."
 
+    elif action_type == ActionTypes.EXTRACT.value:
+        if not entries:
+            error_msg = f"Error - missing entries parameter."
+        elif output_path and not os.path.isdir(output_path):
+            error_msg = f"Error - output_path: {output_path} doesn't exist."
+
     if error_msg:
         print(Exception(error_msg))
         return False
@@ -284,6 +400,100 @@ if "__main__" == __name__:
         required=False
     )
 
+    parser.add_argument(
+        "--compression_level",
+        metavar="compression_level",
+        type=int,
+        help="compression level (Relevant just for zlib/lzma/bz2 compression)",
+        default=None,
+        required=False
+    )
+
+    parser.add_argument(
+        "--entries",
+        metavar="entries",
+        type=str,
+        nargs="+",
+        help="list of entries (glob patterns) to extract from archive",
+        required=False,
+        default=[],
+    )
+
+    parser.add_argument(
+        "--workers",
+        metavar="workers",
+        type=int,
+        help="number of worker processes to compress/extract/validate in",
+        default=1,
+        required=False
+    )
+
+    parser.add_argument(
+        "--chunk_size",
+        metavar="chunk_size",
+        type=int,
+        help="size in bytes of the independently compressed chunks of big files",
+        default=DEFAULT_CHUNK_SIZE,
+        required=False
+    )
+
+    parser.add_argument(
+        "--deduplicate",
+        action="store_true",
+        help="store identical files once (Relevant just for compress)",
+        required=False,
+    )
+
+    parser.add_argument(
+        "--content_chunk_size",
+        metavar="content_chunk_size",
+        type=int,
+        help="average size in bytes of the content defined chunks files are "
+        "split into, storing identical chunks once (Relevant just for "
+        "compress)",
+        default=None,
+        required=False
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="store a manifest of the compressed files, so later runs can "
+        "write delta archives against the archive (Relevant just for "
+        "compress)",
+        required=False,
+    )
+
+    parser.add_argument(
+        "--base_archive",
+        metavar="base_archive",
+        type=str,
+        help="write a delta archive of this archive, compressing only the "
+        "files which changed since it (Relevant just for compress)",
+        default=None,
+        required=False
+    )
+
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="validate archives by the checksums of their compressed "
+        "entries, without decompressing them (Relevant just for "
+        "is-valid-archive)",
+        required=False,
+    )
+
+    parser.add_argument(
+        "--solid_block_size",
+        metavar="solid_block_size",
+        type=int,
+        help="size in bytes of the solid blocks smaller files are "
+        "concatenated into, each compressed as one stream (Relevant just "
+        "for compress)",
+        default=None,
+        required=False
+    )
+
     # Parse the command-line arguments
     try:
         args = parser.parse_args()
@@ -297,7 +507,17 @@ if "__main__" == __name__:
             ignore_files=args.ignore_files,
             ignore_folders=args.ignore_folders,
             ignore_extensions=args.ignore_extensions,
-            timeout_seconds=args.timeout
+            timeout_seconds=args.timeout,
+            compression_level=args.compression_level,
+            entries=args.entries,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            deduplicate=args.deduplicate,
+            content_chunk_size=args.content_chunk_size,
+            incremental=args.incremental,
+            base_archive_path=args.base_archive,
+            quick=args.quick,
+            solid_block_size=args.solid_block_size
         )
     # catch any exception that argparse throw
     except SystemExit as e:
@@ -0,0 +1,347 @@
+import hashlib
+import zlib
+from collections import deque
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import (
+    Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+)
+from compression_types import CODECS_REGISTRY
+from data_compression import DataCompression
+
+# the compression algorithm of the current worker process
+_worker_compression_algorithem: Optional[DataCompression] = None
+# the shared memory segments the current worker process attached to
+_worker_shared_buffers: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def init_worker(codec_id: int, codec_parameters: bytes) -> None:
+    """Create the compression algorithm of a worker process once, so the
+    tasks do not need to pass it.
+
+    Args:
+        codec_id (int): The codec id of the compression algorithm.
+        codec_parameters (bytes): The metadata of the compression
+        algorithm.
+    """
+    global _worker_compression_algorithem
+    _worker_compression_algorithem = CODECS_REGISTRY[codec_id].from_metadata(
+        metadata=codec_parameters
+    )
+
+
+def hand_over(
+    data: bytes, buffer_name: Optional[str] = None
+) -> Union[bytes, int]:
+    """Hand the result data of a task over to the current process through
+    a shared memory segment, so it is not pickled.
+
+    Args:
+        data (bytes): The result data.
+        buffer_name (str, optional): The name of the shared memory
+        segment. Defaults to None (no segment).
+
+    Returns:
+        bytes | int: The length of the data which was copied to the
+        segment, or the data itself if it does not fit in the segment.
+    """
+    if buffer_name is None:
+        return data
+    buffer = _worker_shared_buffers.get(buffer_name)
+    if buffer is None:
+        # attaching registers the segment with the resource tracker of the
+        # process which created it (workers share it), which already holds
+        # it - it is unregistered there when that process unlinks it
+        buffer = shared_memory.SharedMemory(name=buffer_name)
+        _worker_shared_buffers[buffer_name] = buffer
+    if len(data) > buffer.size:
+        return data
+
+    buffer.buf[:len(data)] = data
+    return len(data)
+
+
+def compress_file_task(
+    file_path: str, buffer_name: Optional[str] = None
+) -> Tuple[Union[bytes, int], int, int]:
+    """Read and compress a whole file inside a worker process.
+
+    Args:
+        file_path (str): The path of the file to compress.
+        buffer_name (str, optional): The shared memory segment for the
+        compressed data. Defaults to None.
+
+    Returns:
+        Tuple[bytes | int, int, int]: The compressed data (see
+        hand_over()), the size and the CRC32 of the file data.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    compressed_data = _worker_compression_algorithem.compress_data(data=data)
+
+    return hand_over(compressed_data, buffer_name), len(data), zlib.crc32(data)
+
+
+def compress_block_task(
+    file_paths: List[str], buffer_name: Optional[str] = None
+) -> Tuple[Union[bytes, int], List[int], List[int]]:
+    """Read the files of a solid block and compress them as one stream
+    inside a worker process.
+
+    Args:
+        file_paths (list): The paths of the files of the block.
+        buffer_name (str, optional): The shared memory segment for the
+        compressed block. Defaults to None.
+
+    Returns:
+        Tuple[bytes | int, list, list]: The compressed block (see
+        hand_over()), the sizes and the CRC32 of the files data.
+    """
+    files_data = []
+    for file_path in file_paths:
+        with open(file_path, "rb") as f:
+            files_data.append(f.read())
+    compressed_block = _worker_compression_algorithem.compress_data(
+        data=b"".join(files_data)
+    )
+
+    return (
+        hand_over(compressed_block, buffer_name),
+        [len(data) for data in files_data],
+        [zlib.crc32(data) for data in files_data],
+    )
+
+
+def compress_chunk_task(
+    file_path: str, offset: int, size: int, buffer_name: Optional[str] = None
+) -> Tuple[Union[bytes, int], int, int]:
+    """Read and compress a chunk of a file inside a worker process.
+
+    Args:
+        file_path (str): The path of the file.
+        offset (int): The offset of the chunk in the file.
+        size (int): The maximum size of the chunk.
+        buffer_name (str, optional): The shared memory segment for the
+        compressed chunk. Defaults to None.
+
+    Returns:
+        Tuple[bytes | int, int, int]: The compressed chunk (see
+        hand_over()), the size and the CRC32 of the chunk data.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        chunk = f.read(size)
+    compressed_chunk = _worker_compression_algorithem.compress_data(
+        data=chunk
+    )
+
+    return (
+        hand_over(compressed_chunk, buffer_name),
+        len(chunk),
+        zlib.crc32(chunk),
+    )
+
+
+def hash_file_task(file_path: str, block_size: int = 1 << 20) -> bytes:
+    """Hash the content of a file (BLAKE2b), reading it block by block.
+
+    Args:
+        file_path (str): The path of the file.
+        block_size (int, optional): The size of the blocks the file is
+        read in. Defaults to 1 MB.
+
+    Returns:
+        bytes: The 16 bytes digest of the file content.
+    """
+    content_hash = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            content_hash.update(block)
+
+    return content_hash.digest()
+
+
+class SharedBuffers:
+    """SharedBuffers is a ring of reusable shared memory segments, which
+    worker processes copy their results to (see hand_over()), so the
+    results are written to files directly from the shared memory instead
+    of being pickled between the processes.
+
+    Attributes:
+        _buffers (list): The shared memory segments.
+        _free (deque): The indexes of the segments which are not in use.
+
+    Methods:
+        acquire() -> Tuple[int, str] | None: Take a free segment.
+        release(slot: int) -> None: Return a segment to the ring.
+        read(slot: int, result: bytes | int) -> Iterator[memoryview]:
+        View the result data of a task.
+        close() -> None: Close and unlink all the segments.
+    """
+
+    def __init__(self, slots_num: int, slot_size: int) -> None:
+        """Initialize the SharedBuffers.
+
+        Args:
+            slots_num (int): The number of segments.
+            slot_size (int): The size of every segment.
+        """
+        self._buffers: List[shared_memory.SharedMemory] = []
+        try:
+            for _ in range(slots_num):
+                self._buffers.append(
+                    shared_memory.SharedMemory(create=True, size=slot_size)
+                )
+        except Exception:
+            self.close()
+            raise
+        self._free: Deque[int] = deque(range(slots_num))
+
+    def acquire(self) -> Optional[Tuple[int, str]]:
+        """Take a free segment out of the ring.
+
+        Returns:
+            Tuple[int, str] | None: The index and the name of the segment,
+            or None if all the segments are in use.
+        """
+        if not self._free:
+            return None
+        slot = self._free.popleft()
+        return slot, self._buffers[slot].name
+
+    def release(self, slot: Optional[int]) -> None:
+        """Return a segment to the ring.
+
+        Args:
+            slot (int | None): The index of the segment (None is ignored).
+        """
+        if slot is not None:
+            self._free.append(slot)
+
+    @contextmanager
+    def read(
+        self, slot: Optional[int], result: Union[bytes, int]
+    ) -> Iterator[memoryview]:
+        """View the result data of a task, which was handed over through
+        a segment or (if it did not fit) as bytes.
+
+        Args:
+            slot (int | None): The index of the segment of the task.
+            result (bytes | int): The result of hand_over().
+
+        Yields:
+            memoryview: The result data.
+        """
+        if isinstance(result, int):
+            view = self._buffers[slot].buf[:result]
+        else:
+            view = memoryview(result)
+        try:
+            yield view
+        finally:
+            view.release()
+
+    def close(self) -> None:
+        """Close and unlink all the segments."""
+        for buffer in self._buffers:
+            buffer.close()
+            buffer.unlink()
+        self._buffers = []
+
+
+class OrderedTaskQueue:
+    """OrderedTaskQueue runs tasks in an executor and hands their results
+    back in the order the tasks were put, so a single writer can consume
+    them deterministically. The number of tasks in flight is bounded, so
+    the memory held by results that were not consumed yet is bounded too.
+
+    Attributes:
+        _executor (Executor): The executor which runs the tasks.
+        _max_in_flight (int): The maximum number of queued items.
+        _pending (deque): The queued items and the futures of their tasks.
+
+    Methods:
+        full() -> bool: Check whether an item must be consumed before the
+        next one is put.
+        put(item: Any, task: Callable, *args: Any) -> None: Queue an item,
+        running its task (if any) in the executor.
+        get() -> Tuple[Any, Any]: Wait for the oldest item's task result.
+        cancel() -> None: Cancel the tasks which did not start yet.
+        map(task: Callable, *iterables: Any) -> List[Any]: Run tasks
+        concurrently, out of the queue order.
+    """
+
+    def __init__(self, executor: Executor, max_in_flight: int) -> None:
+        """Initialize the OrderedTaskQueue.
+
+        Args:
+            executor (Executor): The executor which runs the tasks.
+            max_in_flight (int): The maximum number of queued items.
+        """
+        self._executor = executor
+        self._max_in_flight = max_in_flight
+        self._pending: Deque[Tuple[Any, Optional[Future]]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def full(self) -> bool:
+        """Check whether an item must be consumed before the next one is
+        put.
+
+        Returns:
+            bool: True if the maximum number of items is queued.
+        """
+        return len(self._pending) >= self._max_in_flight
+
+    def put(
+        self, item: Any, task: Optional[Callable] = None, *args: Any
+    ) -> None:
+        """Queue an item, running its task (if any) in the executor.
+
+        Args:
+            item (Any): The item, handed back by get().
+            task (Callable, optional): The task to run for the item.
+            Defaults to None (an item without a task).
+            *args (Any): The task arguments.
+        """
+        future = None
+        if task is not None:
+            future = self._executor.submit(task, *args)
+        self._pending.append((item, future))
+
+    def get(self) -> Tuple[Any, Any]:
+        """Wait for the task of the oldest queued item.
+
+        Returns:
+            Tuple[Any, Any]: The item and its task result (None for items
+            without a task).
+
+        Raises:
+            Exception: Any exception raised by the task.
+        """
+        item, future = self._pending.popleft()
+        return item, future.result() if future is not None else None
+
+    def cancel(self) -> None:
+        """Cancel the tasks which did not start yet and drop their items -
+        the items of tasks which already started stay queued."""
+        self._pending = deque(
+            (item, future) for item, future in self._pending
+            if future is None or not future.cancel()
+        )
+
+    def map(self, task: Callable, *iterables: Any) -> List[Any]:
+        """Run a task for every set of arguments concurrently in the
+        executor and wait for all the results - without queueing items.
+
+        Args:
+            task (Callable): The task to run.
+            *iterables (Any): The task arguments, one iterable per
+            argument.
+
+        Returns:
+            list: The task results, in the order of the arguments.
+        """
+        return list(self._executor.map(task, *iterables))
@@ -1,4 +1,8 @@
+from typing import Tuple
 from data_compression import DataCompression
+from stream_compression import (
+    EscapedStreamDecompressor, StreamCompressor, StreamDecompressor
+)
 
 
 class RleCompression(DataCompression):
@@ -10,16 +14,31 @@ class RleCompression(DataCompression):
         algorithms.
 
     Attributes:
+        stream_compatible (bool): True - compress_data() output is a
+        single RLE stream.
         _bytes_size (int): The size of bytes used for compression.
 
     Methods:
+        compress_runs(data) -> bytes: Compresses complete runs of data.
+        get_runs_end(data) -> int: Finds the end of the complete runs.
+        decode_runs(data, final) -> Tuple[bytes, int]: Decodes complete
+        runs of unescaped compressed data.
+        compressor() -> StreamCompressor: Creates an incremental
+        RLE compressor.
+        decompressor() -> StreamDecompressor: Creates an incremental
+        RLE decompressor.
         compress_data(data) -> bytes: Compresses input data using RLE.
         decompress_data(compressed_data) -> bytes: Decompresses RLE
         compressed data.
         get_metadata() -> bytes: Retrieves metadata specific to RLE
         compression.
+        from_metadata(metadata) -> RleCompression: Creates RLE compression
+        from its metadata.
     """
 
+    codec_id = 1
+    stream_compatible = True
+
     def __init__(self, bytes_size: int = 2) -> None:
         """Initialize the RleCompression class.
 
@@ -30,9 +49,142 @@ class RleCompression(DataCompression):
         super().__init__()
         self._bytes_size = bytes_size
 
+    class Compressor(StreamCompressor):
+        """Compressor is an incremental RLE compressor. The data is
+        compressed up to the last run which may continue in the next
+        chunk, so the output is the same as compress_data() output.
+
+        Args:
+            compression_algorithem (RleCompression): The RLE compression.
+        """
+
+        def __init__(self, compression_algorithem: "RleCompression") -> None:
+            """Initialize the Compressor class.
+
+            Args:
+                compression_algorithem (RleCompression): The RLE
+                compression.
+            """
+            self._compression_algorithem = compression_algorithem
+            self._pending = bytearray()
+
+        def feed(self, chunk: bytes) -> bytes:
+            """Compress the complete runs of the data fed so far - the
+            last run is kept, since it may continue in the next chunk.
+
+            Args:
+                chunk (bytes): The next chunk of data.
+
+            Returns:
+                bytes: The compressed data of the complete runs.
+            """
+            self._pending.extend(chunk)
+            runs_end = self._compression_algorithem.get_runs_end(
+                data=self._pending
+            )
+            if runs_end == 0:
+                return b""
+            compressed_data = self._compression_algorithem.compress_runs(
+                data=bytes(self._pending[:runs_end])
+            )
+            del self._pending[:runs_end]
+            return compressed_data
+
+        def flush(self) -> bytes:
+            """Compress the runs which are left.
+
+            Returns:
+                bytes: The compressed data of the last runs.
+            """
+            if not self._pending:
+                return b""
+            compressed_data = self._compression_algorithem.compress_runs(
+                data=bytes(self._pending)
+            )
+            self._pending = bytearray()
+            return compressed_data
+
+    class Decompressor(EscapedStreamDecompressor):
+        """Decompressor is an incremental RLE decompressor.
+
+        Args:
+            compression_algorithem (RleCompression): The RLE compression.
+        """
+
+        def decode(self, data: bytearray, final: bool) -> Tuple[bytes, int]:
+            """Decode the complete runs of unescaped data.
+
+            Args:
+                data (bytearray): The unescaped data.
+                final (bool): Whether no more data will follow, so the
+                last unit must be decoded even if it looks incomplete.
+
+            Returns:
+                Tuple[bytes, int]: The decoded data and the number of
+                bytes of data that were consumed.
+            """
+            return self._compression_algorithem.decode_runs(
+                data=data, final=final
+            )
+
+    def compressor(self) -> StreamCompressor:
+        """Creates an incremental RLE compressor.
+
+        Returns:
+            StreamCompressor: An object with feed(chunk) and flush().
+        """
+        return self.Compressor(compression_algorithem=self)
+
+    def decompressor(self) -> StreamDecompressor:
+        """Creates an incremental RLE decompressor.
+
+        Returns:
+            StreamDecompressor: An object with feed(chunk) and flush().
+        """
+        return self.Decompressor(compression_algorithem=self)
+
+    def get_runs_end(self, data: bytearray) -> int:
+        """Finds the end of the complete runs of data - the start of the
+        last run (which may continue), rounded up to the maximum run size.
+
+        Args:
+            data (bytearray): The data to be compressed.
+
+        Returns:
+            int: The index after the last complete run.
+        """
+        aligned_end = len(data) - len(data) % self._bytes_size
+        if aligned_end == 0:
+            return 0
+
+        last_value = data[aligned_end - self._bytes_size : aligned_end]
+        run_start = aligned_end - self._bytes_size
+        while (
+            run_start >= self._bytes_size
+            and data[run_start - self._bytes_size : run_start] == last_value
+        ):
+            run_start -= self._bytes_size
+
+        # full runs of maximum size are complete as well
+        max_run = self._max_bytes_range - 1
+        run_len = (aligned_end - run_start) // self._bytes_size
+        return run_start + (run_len // max_run) * max_run * self._bytes_size
+
     def compress_data(self, data: bytes) -> bytes:
         """Compresses input data using Run-Length Encoding (RLE).
 
+        Args:
+            data (bytes): The data to be compressed.
+
+        Returns:
+            bytes: The compressed data.
+        """
+        compressor = self.compressor()
+        return compressor.feed(chunk=data) + compressor.flush()
+
+    def compress_runs(self, data: bytes) -> bytes:
+        """Compresses complete runs of data using Run-Length Encoding.
+
         Args:
             data (bytes): The data to be compressed.
 
@@ -40,21 +192,26 @@ class RleCompression(DataCompression):
             bytes: The compressed data.
         """
         compressed_data = bytearray()
+        self._signs_positions = set()
         count = 1
         for i in range(0, len(data), self._bytes_size):
             if (
                 data[i : i + self._bytes_size]
                 == data[i + self._bytes_size : i + 2 * self._bytes_size]
+                and count < self._max_bytes_range - 1
             ):
                 count += 1
             else:
                 if count > 1:
-                    compressed_data.extend(self._bigger_than_max_bytes_sign)
+                    self.append_sign(
+                        compress_data=compressed_data,
+                        sign=self._bigger_than_max_bytes_sign,
+                    )
                     compressed_data.append(count)
                 compressed_data.extend(data[i : i + self._bytes_size])
                 count = 1
 
-        return bytes(compressed_data)
+        return self.escape_signs(compress_data=compressed_data)
 
     def decompress_data(self, compressed_data: bytes) -> bytes:
         """Decompresses input data that was compressed using
@@ -66,34 +223,61 @@ class RleCompression(DataCompression):
         Returns:
             bytes: The decompressed data.
         """
+        decompressor = self.decompressor()
+        return decompressor.feed(chunk=compressed_data) + decompressor.flush()
+
+    def decode_runs(self, data: bytearray, final: bool) -> Tuple[bytes, int]:
+        """Decodes the complete runs of unescaped RLE compressed data.
+
+        Args:
+            data (bytearray): The unescaped compressed data.
+            final (bool): Whether it is the end of the compressed data,
+            so a last partial value is decoded as well.
+
+        Returns:
+            Tuple[bytes, int]: The decompressed data and the number of
+            bytes of data that were decoded.
+        """
         decompressed_data = bytearray()
         i = 0
-        while i < len(compressed_data):
-            if (
-                compressed_data[i] == self._bigger_than_max_bytes_sign[0]
-                and compressed_data[i + 1]
-                == self._bigger_than_max_bytes_sign[1]
-                and compressed_data[i + 2]
-                == self._bigger_than_max_bytes_sign[2]
-            ):
-                count = compressed_data[i + 3]
+        while i < len(data):
+            is_run = self.is_sign(
+                data=data,
+                i=i,
+                sign=self._bigger_than_max_bytes_sign,
+            )
+            run_size = 4 + self._bytes_size if is_run else self._bytes_size
+            if not final and i + run_size > len(data):
+                break
+
+            if is_run:
+                count = data[i + 3]
                 i += 4
             else:
                 count = 1
-            bytes_value = compressed_data[i : i + self._bytes_size]
+            bytes_value = data[i : i + self._bytes_size]
             decompressed_data.extend(bytes_value * count)
             i += self._bytes_size
-        return bytes(decompressed_data)
+        return bytes(decompressed_data), min(i, len(data))
 
     def get_metadata(self) -> bytes:
         """Retrieves metadata related to the Run-Length Encoding (RLE)
         compression.
 
         Returns:
-            bytes: The metadata information.
+            bytes: The metadata information - the bytes size.
         """
-        metadata = bytearray()
-        metadata.extend(self.__class__.__name__.encode())
-        metadata.append(self._bytes_size)
+        return bytes([self._bytes_size])
 
-        return bytes(metadata)
+    @classmethod
+    def from_metadata(cls, metadata: bytes) -> "RleCompression":
+        """Create the Run-Length Encoding (RLE) compression from its
+        metadata.
+
+        Args:
+            metadata (bytes): The metadata returned by get_metadata().
+
+        Returns:
+            RleCompression: The compression algorithm instance.
+        """
+        return cls(bytes_size=metadata[0])
@@ -0,0 +1,244 @@
+from abc import abstractmethod
+from typing import Any, List, Type, TypeVar
+from data_compression import DataCompression
+from stream_compression import StreamCompressor, StreamDecompressor
+from exceptions import InvalidArchiveFormat, InvalidCompressionAlgorithem
+
+T = TypeVar("T", bound="StdlibCompression")
+
+
+class StdlibCompression(DataCompression):
+    """StdlibCompression is a base class for compression algorithms
+    that are backed by the python standard library (zlib, lzma, bz2).
+
+    Args:
+        DataCompression (class): The base class for data compression
+        algorithms.
+
+    Attributes:
+        stream_compatible (bool): True - compress_data() output is a
+        single standard library stream.
+        MIN_LEVEL (int): The lowest compression level of the codec.
+        MAX_LEVEL (int): The highest compression level of the codec.
+        _level (int): The compression level passed to the standard
+        library compressor.
+
+    Methods:
+        is_valid_level(level) -> bool: Checks a compression level is
+        supported by the codec.
+        compressobj() -> Any: Creates a new streaming compressor object.
+        decompressobj() -> Any: Creates a new streaming decompressor object.
+        compressor() -> StreamCompressor: Creates an incremental compressor.
+        decompressor() -> StreamDecompressor: Creates an incremental
+        decompressor.
+        compress_data(data) -> bytes: Compresses input data.
+        decompress_data(compressed_data) -> bytes: Decompresses input data.
+        get_metadata() -> bytes: Retrieves metadata specific to the
+        compression.
+        from_metadata(metadata) -> StdlibCompression: Creates the
+        compression from its metadata.
+        get_special_signs(): special signs for the compression algorithm.
+    """
+
+    stream_compatible = True
+    MIN_LEVEL = 0
+    MAX_LEVEL = 9
+
+    def __init__(self, level: int) -> None:
+        """Initialize the StdlibCompression class.
+
+        Args:
+            level (int): The compression level.
+
+        Raises:
+            InvalidCompressionAlgorithem: If the codec does not support
+            the compression level.
+        """
+        super().__init__()
+        if not self.is_valid_level(level=level):
+            raise InvalidCompressionAlgorithem(
+                f"Compression level {level} of {type(self).__name__} "
+                f"is not between {self.MIN_LEVEL} and {self.MAX_LEVEL}."
+            )
+        self._level = level
+
+    @classmethod
+    def is_valid_level(cls, level: int) -> bool:
+        """Checks a compression level is supported by the codec.
+
+        Args:
+            level (int): The compression level.
+
+        Returns:
+            bool: True if the level is in the codec range.
+        """
+        return cls.MIN_LEVEL <= level <= cls.MAX_LEVEL
+
+    class Compressor(StreamCompressor):
+        """Compressor adapts a standard library compressor object to the
+        feed/flush protocol.
+
+        Args:
+            compressobj (Any): The standard library compressor object.
+        """
+
+        def __init__(self, compressobj: Any) -> None:
+            """Initialize the Compressor class.
+
+            Args:
+                compressobj (Any): The standard library compressor object.
+            """
+            self._compressobj = compressobj
+
+        def feed(self, chunk: bytes) -> bytes:
+            """Compress the next chunk of data.
+
+            Args:
+                chunk (bytes): The next chunk of data.
+
+            Returns:
+                bytes: The compressed data the compressor outputs.
+            """
+            return self._compressobj.compress(chunk)
+
+        def flush(self) -> bytes:
+            """Compress the data buffered in the compressor.
+
+            Returns:
+                bytes: The rest of the compressed stream.
+            """
+            return self._compressobj.flush()
+
+    class Decompressor(StreamDecompressor):
+        """Decompressor adapts a standard library decompressor object to
+        the feed/flush protocol.
+
+        Args:
+            decompressobj (Any): The standard library decompressor object.
+        """
+
+        def __init__(self, decompressobj: Any) -> None:
+            """Initialize the Decompressor class.
+
+            Args:
+                decompressobj (Any): The standard library decompressor
+                object.
+            """
+            self._decompressobj = decompressobj
+
+        def feed(self, chunk: bytes) -> bytes:
+            """Decompress the next chunk of compressed data.
+
+            Args:
+                chunk (bytes): The next chunk of compressed data.
+
+            Returns:
+                bytes: The decompressed data the decompressor outputs.
+            """
+            return self._decompressobj.decompress(chunk)
+
+        def flush(self) -> bytes:
+            """Decompress the data buffered in the decompressor.
+
+            Returns:
+                bytes: The rest of the decompressed data.
+
+            Raises:
+                InvalidArchiveFormat: If the compressed stream is truncated.
+            """
+            # only zlib decompressor objects buffer output
+            decompressed_data = b""
+            if hasattr(self._decompressobj, "flush"):
+                decompressed_data = self._decompressobj.flush()
+            if not self._decompressobj.eof:
+                raise InvalidArchiveFormat("Truncated compressed stream.")
+            return decompressed_data
+
+    @abstractmethod
+    def compressobj(self) -> Any:
+        """Creates a new streaming compressor object.
+
+        Returns:
+            Any: An object with compress(data) and flush() methods.
+        """
+        pass
+
+    @abstractmethod
+    def decompressobj(self) -> Any:
+        """Creates a new streaming decompressor object.
+
+        Returns:
+            Any: An object with a decompress(data) method.
+        """
+        pass
+
+    def compressor(self) -> StreamCompressor:
+        """Creates an incremental compressor.
+
+        Returns:
+            StreamCompressor: An object with feed(chunk) and flush().
+        """
+        return self.Compressor(compressobj=self.compressobj())
+
+    def decompressor(self) -> StreamDecompressor:
+        """Creates an incremental decompressor.
+
+        Returns:
+            StreamDecompressor: An object with feed(chunk) and flush().
+        """
+        return self.Decompressor(decompressobj=self.decompressobj())
+
+    def compress_data(self, data: bytes) -> bytes:
+        """Compresses input data with a fresh streaming compressor.
+
+        Args:
+            data (bytes): The data to be compressed.
+
+        Returns:
+            bytes: The compressed data.
+        """
+        compressor = self.compressor()
+        return compressor.feed(chunk=data) + compressor.flush()
+
+    def decompress_data(self, compressed_data: bytes) -> bytes:
+        """Decompresses input data with a fresh streaming decompressor.
+
+        Args:
+            compressed_data (bytes): The compressed data.
+
+        Returns:
+            bytes: The decompressed data.
+        """
+        decompressor = self.decompressor()
+        return decompressor.feed(chunk=compressed_data) + decompressor.flush()
+
+    def get_metadata(self) -> bytes:
+        """Retrieves metadata related to the compression.
+
+        Returns:
+            bytes: The metadata information - the compression level.
+        """
+        return bytes([self._level])
+
+    @classmethod
+    def from_metadata(cls: Type[T], metadata: bytes) -> T:
+        """Create the compression algorithm from its metadata.
+
+        Args:
+            metadata (bytes): The metadata returned by get_metadata().
+
+        Returns:
+            StdlibCompression: The compression algorithm instance.
+        """
+        return cls(level=metadata[0])
+
+    def get_special_signs(self) -> List[bytes]:
+        """Get the special signs for the compression algorithm.
+
+        The standard library formats are length-prefixed internally,
+        so they do not reserve any special signs.
+
+        Returns:
+            List[bytes]: An empty list.
+        """
+        return []
@@ -0,0 +1,340 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Set, Tuple
+from archive_format import DEFAULT_CHUNK_SIZE, decode_varint, encode_varint
+from exceptions import InvalidArchiveFormat
+
+if TYPE_CHECKING:
+    from data_compression import DataCompression
+
+
+class StreamCompressor(ABC):
+    """StreamCompressor is an interface for incremental compressors,
+    created by DataCompression.compressor().
+
+    Methods:
+        feed(chunk: bytes) -> bytes: Compress the next chunk of data.
+        flush() -> bytes: End the stream.
+    """
+
+    @abstractmethod
+    def feed(self, chunk: bytes) -> bytes:
+        """Compress the next chunk of data.
+
+        Args:
+            chunk (bytes): The next chunk of data.
+
+        Returns:
+            bytes: The compressed data that is ready (it may be empty).
+        """
+        pass
+
+    @abstractmethod
+    def flush(self) -> bytes:
+        """End the stream - no more data can be fed after flush.
+
+        Returns:
+            bytes: The rest of the compressed data.
+        """
+        pass
+
+
+class StreamDecompressor(ABC):
+    """StreamDecompressor is an interface for incremental decompressors,
+    created by DataCompression.decompressor().
+
+    Methods:
+        feed(chunk: bytes) -> bytes: Decompress the next chunk of
+        compressed data.
+        flush() -> bytes: End the stream.
+    """
+
+    @abstractmethod
+    def feed(self, chunk: bytes) -> bytes:
+        """Decompress the next chunk of compressed data.
+
+        Args:
+            chunk (bytes): The next chunk of compressed data.
+
+        Returns:
+            bytes: The decompressed data that is ready (it may be empty).
+        """
+        pass
+
+    @abstractmethod
+    def flush(self) -> bytes:
+        """End the stream - no more data can be fed after flush.
+
+        Returns:
+            bytes: The rest of the decompressed data.
+        """
+        pass
+
+
+class BlockCompressor(StreamCompressor):
+    """BlockCompressor compresses a stream in independent blocks with
+    the one-shot compress_data() - every block is written as a varint
+    length followed by the compressed block.
+
+    Attributes:
+        _compression_algorithem (DataCompression): The block codec.
+        _block_size (int): The size of the uncompressed blocks.
+        _buffer (bytearray): Data of the current (partial) block.
+    """
+
+    def __init__(
+        self,
+        compression_algorithem: "DataCompression",
+        block_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """Initialize the BlockCompressor.
+
+        Args:
+            compression_algorithem (DataCompression): The block codec.
+            block_size (int, optional): The size of the uncompressed
+            blocks. Defaults to DEFAULT_CHUNK_SIZE.
+        """
+        self._compression_algorithem = compression_algorithem
+        self._block_size = block_size
+        self._buffer = bytearray()
+
+    def compress_block(self, block: bytes) -> bytes:
+        """Compress a single block and frame it with its length.
+
+        Args:
+            block (bytes): The block data.
+
+        Returns:
+            bytes: The framed compressed block.
+        """
+        compressed_block = self._compression_algorithem.compress_data(
+            data=block
+        )
+        return encode_varint(len(compressed_block)) + compressed_block
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Compress the full blocks of the data fed so far.
+
+        Args:
+            chunk (bytes): The next chunk of data.
+
+        Returns:
+            bytes: The framed compressed blocks.
+        """
+        self._buffer.extend(chunk)
+        compressed_data = bytearray()
+        start = 0
+        while len(self._buffer) - start >= self._block_size:
+            compressed_data.extend(self.compress_block(
+                block=bytes(self._buffer[start:start + self._block_size])
+            ))
+            start += self._block_size
+        del self._buffer[:start]
+
+        return bytes(compressed_data)
+
+    def flush(self) -> bytes:
+        """Compress the last partial block.
+
+        Returns:
+            bytes: The framed compressed block (b'' if nothing is left).
+        """
+        if not self._buffer:
+            return b""
+        compressed_data = self.compress_block(block=bytes(self._buffer))
+        self._buffer = bytearray()
+
+        return compressed_data
+
+
+class BlockDecompressor(StreamDecompressor):
+    """BlockDecompressor decompresses a stream written by BlockCompressor,
+    one complete block at a time.
+
+    Attributes:
+        _compression_algorithem (DataCompression): The block codec.
+        _buffer (bytearray): Compressed data of the next blocks.
+    """
+
+    def __init__(self, compression_algorithem: "DataCompression") -> None:
+        """Initialize the BlockDecompressor.
+
+        Args:
+            compression_algorithem (DataCompression): The block codec.
+        """
+        self._compression_algorithem = compression_algorithem
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Decompress the complete blocks of the data fed so far.
+
+        Args:
+            chunk (bytes): The next chunk of compressed data.
+
+        Returns:
+            bytes: The decompressed blocks.
+        """
+        self._buffer.extend(chunk)
+        decompressed_data = bytearray()
+        view = memoryview(self._buffer)
+        start = 0
+        try:
+            while start < len(view):
+                try:
+                    block_len, block_start = decode_varint(
+                        data=view, index=start
+                    )
+                except InvalidArchiveFormat:
+                    # the length itself is not complete yet
+                    break
+                if block_start + block_len > len(view):
+                    break
+                decompressed_data.extend(
+                    self._compression_algorithem.decompress_data(
+                        compressed_data=view[
+                            block_start:block_start + block_len
+                        ]
+                    )
+                )
+                start = block_start + block_len
+        finally:
+            view.release()
+        del self._buffer[:start]
+
+        return bytes(decompressed_data)
+
+    def flush(self) -> bytes:
+        """Check that the stream ended with a complete block.
+
+        Returns:
+            bytes: b'' - every complete block was already returned.
+
+        Raises:
+            InvalidArchiveFormat: If the stream ends with a partial block.
+        """
+        if self._buffer:
+            raise InvalidArchiveFormat("Truncated compressed stream.")
+        return b""
+
+
+class EscapedStreamDecompressor(StreamDecompressor):
+    """EscapedStreamDecompressor is a base class for incremental
+    decompressors of codecs that escape their special signs (see
+    DataCompression.escape_signs()).
+
+    The compressed data is unescaped up to the last token that is
+    surely complete, and the unescaped data is decoded by decode() up
+    to the last complete unit of the codec.
+
+    Attributes:
+        _compression_algorithem (DataCompression): The codec.
+        _escaped (bytearray): Compressed data that was not unescaped yet.
+        _data (bytearray): Unescaped data that was not decoded yet.
+        _signs_positions (set): Positions of the real special signs
+        inside _data.
+        _escape_bytes (set): The first bytes of the special signs.
+        _max_token_size (int): The size of the longest escaping token.
+
+    Methods:
+        decode(data: bytearray, final: bool) -> Tuple[bytes, int]:
+        Decode the complete units of unescaped data.
+        decode_escaped(escaped_len: int, final: bool) -> bytes: Unescape
+        and decode compressed data.
+    """
+
+    def __init__(self, compression_algorithem: "DataCompression") -> None:
+        """Initialize the EscapedStreamDecompressor.
+
+        Args:
+            compression_algorithem (DataCompression): The codec.
+        """
+        self._compression_algorithem = compression_algorithem
+        self._escaped = bytearray()
+        self._data = bytearray()
+        self._signs_positions: Set[int] = set()
+        special_signs = compression_algorithem.get_special_signs()
+        self._escape_bytes = {sign[:1] for sign in special_signs}
+        self._max_token_size = max(len(sign) for sign in special_signs)
+
+    @abstractmethod
+    def decode(self, data: bytearray, final: bool) -> Tuple[bytes, int]:
+        """Decode the complete units of unescaped data - the codec
+        is_sign() checks use the positions of the real signs in data.
+
+        Args:
+            data (bytearray): The unescaped data.
+            final (bool): Whether no more data will follow, so the last
+            unit must be decoded even if it looks incomplete.
+
+        Returns:
+            Tuple[bytes, int]: The decoded data and the number of bytes
+            of data that were consumed.
+        """
+        pass
+
+    def decode_escaped(self, escaped_len: int, final: bool) -> bytes:
+        """Unescape the first bytes of the escaped data and decode all the
+        complete units.
+
+        Args:
+            escaped_len (int): The number of escaped bytes to unescape.
+            final (bool): Whether no more data will follow.
+
+        Returns:
+            bytes: The decoded data.
+        """
+        algo = self._compression_algorithem
+        if escaped_len:
+            offset = len(self._data)
+            self._data.extend(algo.unescape_signs(
+                compressed_data=bytes(self._escaped[:escaped_len])
+            ))
+            self._signs_positions.update(
+                offset + position for position in algo.get_signs_positions()
+            )
+            del self._escaped[:escaped_len]
+        if not self._data:
+            return b""
+
+        algo.set_signs_positions(positions=self._signs_positions)
+        decompressed_data, consumed = self.decode(
+            data=self._data, final=final
+        )
+        del self._data[:consumed]
+        self._signs_positions = {
+            position - consumed for position in self._signs_positions
+            if position >= consumed
+        }
+
+        return decompressed_data
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Decompress the data fed so far, keeping back a token that may
+        be split between this chunk and the next one.
+
+        Args:
+            chunk (bytes): The next chunk of compressed data.
+
+        Returns:
+            bytes: The decompressed data that is ready.
+        """
+        self._escaped.extend(chunk)
+        escaped_len = len(self._escaped)
+        # every token starts with an escape byte, so only tokens that start
+        # in the last (longest token - 1) bytes may be incomplete
+        tail_start = max(0, escaped_len - self._max_token_size + 1)
+        for escape_byte in self._escape_bytes:
+            position = self._escaped.find(escape_byte, tail_start)
+            if position != -1:
+                escaped_len = min(escaped_len, position)
+
+        return self.decode_escaped(escaped_len=escaped_len, final=False)
+
+    def flush(self) -> bytes:
+        """Decompress all the rest of the data.
+
+        Returns:
+            bytes: The rest of the decompressed data.
+        """
+        return self.decode_escaped(
+            escaped_len=len(self._escaped), final=True
+        )
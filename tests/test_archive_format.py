@@ -0,0 +1,266 @@
+import zlib
+import pytest
+from archive_format import (
+    ARCHIVE_MAGIC, FORMAT_VERSION, ArchiveFlags, ArchiveFooter,
+    ArchiveHeader, CentralDirectory, EntryFlags, IndexEntry, Manifest,
+    ManifestEntry, PathTable, crc32_combine, decode_varint, encode_varint
+)
+from compression_types import CODECS_REGISTRY, CompressionTypes
+from exceptions import InvalidArchiveFormat, UnsupportedArchiveVersion
+
+
+@pytest.mark.parametrize("codec_id, codec_parameters", [
+    (1, b"\x02"),
+    (2, b""),
+    (4, b"\x09"),
+])
+def test_header_round_trip(codec_id, codec_parameters):
+    header = ArchiveHeader(codec_id=codec_id, codec_parameters=codec_parameters)
+    data = header.to_bytes() + b"entries"
+    parsed, next_index = ArchiveHeader.from_bytes(data=data)
+    assert data[next_index:] == b"entries"
+    assert parsed.codec_id == codec_id
+    assert parsed.codec_parameters == codec_parameters
+    assert parsed.version == FORMAT_VERSION
+    assert parsed.flags == ArchiveFlags.NONE
+
+
+def test_legacy_archive_is_rejected():
+    legacy = (14).to_bytes(16, byteorder="big") + b"RleCompression\x02"
+    with pytest.raises(InvalidArchiveFormat):
+        ArchiveHeader.from_bytes(data=legacy)
+
+
+@pytest.mark.parametrize("version, flags", [
+    (FORMAT_VERSION + 1, 0),
+    (FORMAT_VERSION, 1 << 20),
+])
+def test_newer_archive_is_rejected(version, flags):
+    data = ARCHIVE_MAGIC + bytes([version]) + encode_varint(flags) + b"\x01\x00"
+    with pytest.raises(UnsupportedArchiveVersion):
+        ArchiveHeader.from_bytes(data=data)
+
+
+@pytest.mark.parametrize("flags, flags_bytes", [
+    (ArchiveFlags.VARINT_FRAMING | ArchiveFlags.RECORD_CHECKSUMS, b"\x41"),
+    (ArchiveFlags.CENTRAL_DIRECTORY | ArchiveFlags.PATH_TABLE, b"\x82\x01"),
+    (ArchiveFlags.PATH_TABLE | ArchiveFlags.REMOVED_ENTRIES, b"\x80\x03"),
+])
+def test_header_flags_varint(flags, flags_bytes):
+    header = ArchiveHeader(codec_id=2, flags=flags)
+    data = header.to_bytes()
+    assert data == ARCHIVE_MAGIC + bytes([FORMAT_VERSION]) + flags_bytes \
+        + b"\x02\x00"
+    parsed, next_index = ArchiveHeader.from_bytes(data=data)
+    assert next_index == len(data)
+    assert parsed.flags == flags
+    assert parsed.codec_id == 2
+
+
+def test_codecs_registry():
+    codec_ids = [member.value.codec_id for member in CompressionTypes]
+    assert len(set(codec_ids)) == len(codec_ids)
+    for member in CompressionTypes:
+        assert CODECS_REGISTRY[member.value.codec_id] is member.value
+
+
+@pytest.mark.parametrize("value, encoded", [
+    (0, b"\x00"),
+    (127, b"\x7f"),
+    (128, b"\x80\x01"),
+    (300, b"\xac\x02"),
+    (2 ** 40, b"\x80\x80\x80\x80\x80\x20"),
+])
+def test_varint_round_trip(value, encoded):
+    assert encode_varint(value) == encoded
+    data = memoryview(b"x" + encoded + b"rest")
+    assert decode_varint(data=data, index=1) == (value, 1 + len(encoded))
+
+
+@pytest.mark.parametrize("value, size, encoded", [
+    (5, 2, b"\x85\x00"),
+    (300, 3, b"\xac\x82\x00"),
+    (300, 1, b"\xac\x02"),
+])
+def test_padded_varint(value, size, encoded):
+    assert encode_varint(value, size=size) == encoded
+    assert decode_varint(data=encoded) == (value, len(encoded))
+
+
+def test_header_flags_size():
+    header = ArchiveHeader(
+        codec_id=2, flags=ArchiveFlags.VARINT_FRAMING, flags_size=2)
+    parsed, _ = ArchiveHeader.from_bytes(data=header.to_bytes())
+    assert (parsed.flags, parsed.flags_size) == (
+        ArchiveFlags.VARINT_FRAMING, 2)
+    parsed.flags |= ArchiveFlags.REMOVED_ENTRIES
+    assert len(parsed.to_bytes()) == len(header.to_bytes())
+
+
+def test_truncated_varint():
+    with pytest.raises(InvalidArchiveFormat):
+        decode_varint(data=b"\x80\x80")
+
+
+def test_central_directory_round_trip():
+    entries = [
+        IndexEntry(path="folder/file", offset=9, compressed_size=30,
+                   uncompressed_size=1000, checksum=0xDEADBEEF, codec_id=1,
+                   codec_parameters=b"\x02"),
+        IndexEntry(path="folder/empty/", offset=39, compressed_size=12,
+                   uncompressed_size=0, checksum=0, codec_id=4,
+                   flags=EntryFlags.DIRECTORY),
+    ]
+    data = CentralDirectory(entries=entries).to_bytes()
+    directory = CentralDirectory.from_bytes(data=memoryview(data))
+    for entry, parsed in zip(entries, directory.entries):
+        assert vars(entry) == vars(parsed)
+    assert directory.find_entries(paths=["folder/e"]) == []
+    assert directory.find_entries(paths=["folder/empty"]) == [
+        directory.entries[1]]
+
+
+def test_central_directory_record_checksums():
+    entry = IndexEntry(path="file", offset=9, compressed_size=30,
+                       uncompressed_size=1000, checksum=1, codec_id=1,
+                       record_checksum=0xCAFEBABE)
+    data = CentralDirectory(entries=[entry], record_checksums=True).to_bytes()
+    assert len(data) == len(CentralDirectory(entries=[entry]).to_bytes()) + 4
+    directory = CentralDirectory.from_bytes(
+        data=memoryview(data), record_checksums=True)
+    assert directory.record_checksums
+    assert vars(directory.entries[0]) == vars(entry)
+
+
+def test_central_directory_removed_entries():
+    entries = [
+        IndexEntry(path=path, offset=offset, compressed_size=10,
+                   uncompressed_size=5, checksum=0, codec_id=1)
+        for offset, path in enumerate(["kept", "removed"])
+    ]
+    entries[1].flags |= EntryFlags.REMOVED
+    directory = CentralDirectory(
+        entries=entries[:1], removed_entries=entries[1:])
+    directory.replace_index(offset=30, length=25)
+    directory = CentralDirectory.from_bytes(
+        data=memoryview(directory.to_bytes()))
+    assert [entry.path for entry in directory.entries] == ["kept"]
+    assert [entry.path for entry in directory.removed_entries] == ["removed"]
+    assert [(entry.offset, entry.compressed_size, entry.flags)
+            for entry in directory.replaced_indexes] == [
+        (30, 25, EntryFlags.REMOVED | EntryFlags.INDEX)]
+    assert directory.find_entries(paths=["removed"]) == []
+
+
+def test_path_table_front_coding():
+    paths = ["src/app/main.py", "src/app/models.py", "src/lib/", "", "é/x"]
+    data = PathTable(paths=paths).to_bytes()
+    # the shared prefixes are stored once
+    assert len(data) < sum(len(path) for path in paths)
+    assert PathTable.from_bytes(data=data, count=len(paths)).paths == paths
+    with pytest.raises(InvalidArchiveFormat):
+        PathTable.from_bytes(data=b"\x05\x01a", count=1)
+
+
+@pytest.mark.parametrize("member", list(CompressionTypes))
+def test_central_directory_path_table(member):
+    entries = [
+        IndexEntry(path=f"folder/sub/file{i}.txt", offset=i,
+                   compressed_size=10, uncompressed_size=5, checksum=i,
+                   codec_id=1, record_checksum=i)
+        for i in range(20)
+    ]
+    entries[-1].flags |= EntryFlags.REMOVED
+    codec = member.value()
+    data = CentralDirectory(
+        entries=entries[:-1], removed_entries=entries[-1:],
+        record_checksums=True, path_codec=codec).to_bytes()
+    directory = CentralDirectory.from_bytes(
+        data=memoryview(data), record_checksums=True, path_codec=codec)
+    assert [vars(entry) for entry in directory.entries] == [
+        vars(entry) for entry in entries[:-1]]
+    assert directory.removed_entries[0].path == entries[-1].path
+    assert len(directory.find_entries(paths=["folder/sub/file1"])) == 0
+    assert len(directory.find_entries(paths=["folder/sub/file1.txt"])) == 1
+    assert len(directory.find_entries(paths=["folder/sub/"])) == 19
+
+    empty = CentralDirectory(path_codec=codec).to_bytes()
+    assert CentralDirectory.from_bytes(
+        data=empty, path_codec=codec).entries == []
+
+
+@pytest.mark.parametrize("paths, expected_paths", [
+    (["e/a.txt"], ["e/a.txt"]),
+    (["e"], ["e/a.txt", "e/a.txt.bak", "e/empty/"]),
+    (["e/empty", "e/a"], ["e/empty/"]),
+    (["e/a.txt.bak", "f/"], ["e/a.txt.bak", "f/b"]),
+])
+def test_central_directory_find_entries(paths, expected_paths):
+    directory = CentralDirectory(entries=[
+        IndexEntry(path=path, offset=0, compressed_size=0,
+                   uncompressed_size=0, checksum=0, codec_id=1)
+        for path in ["e/a.txt", "e/a.txt.bak", "e/empty/", "f/b"]
+    ])
+    assert [entry.path for entry in directory.find_entries(
+        paths=paths)] == expected_paths
+
+
+@pytest.mark.parametrize("patterns, expected_paths", [
+    (["a/*.txt"], ["a/one.txt", "a/b/two.txt"]),
+    (["a/b"], ["a/b/two.txt"]),
+    (["*.ini", "c"], ["c/", "c/three.ini"]),
+    (["missing"], []),
+])
+def test_central_directory_match_entries(patterns, expected_paths):
+    directory = CentralDirectory(entries=[
+        IndexEntry(path=path, offset=0, compressed_size=0,
+                   uncompressed_size=0, checksum=0, codec_id=1)
+        for path in ["a/one.txt", "a/b/two.txt", "c/", "c/three.ini"]
+    ])
+    assert [entry.path for entry in directory.match_entries(
+        patterns=patterns)] == expected_paths
+
+
+def test_manifest_round_trip():
+    manifest = Manifest(
+        entries=[
+            ManifestEntry(path="folder/file", size=1000,
+                          mtime=1_700_000_000_123456789,
+                          content_hash=b"\x01" * 16),
+            ManifestEntry(path="folder/empty/"),
+        ],
+        base_path="../base.bin",
+        base_digest=b"\x02" * 16,
+    )
+    data = CentralDirectory(manifest=manifest).to_bytes()
+    directory = CentralDirectory.from_bytes(data=memoryview(data))
+    assert directory.entries == []
+    parsed = directory.manifest
+    assert (parsed.base_path, parsed.base_digest) == (
+        "../base.bin", b"\x02" * 16)
+    for entry, parsed_entry in zip(manifest.entries, parsed.entries):
+        assert vars(entry) == vars(parsed_entry)
+    assert parsed.digest() == manifest.digest()
+    assert CentralDirectory.from_bytes(
+        data=CentralDirectory().to_bytes()).manifest is None
+
+
+def test_footer_round_trip():
+    footer = ArchiveFooter(index_offset=123456, index_length=789)
+    data = footer.to_bytes()
+    assert len(data) == ArchiveFooter.SIZE
+    parsed = ArchiveFooter.from_bytes(data=data)
+    assert (parsed.index_offset, parsed.index_length) == (123456, 789)
+    with pytest.raises(InvalidArchiveFormat):
+        ArchiveFooter.from_bytes(data=data[:-1] + b"?")
+
+
+@pytest.mark.parametrize("first, second", [
+    (b"abc", b"defg"),
+    (b"", b"data"),
+    (b"data", b""),
+    (bytes(range(256)) * 3, b"\xff" * 1000),
+])
+def test_crc32_combine(first, second):
+    assert crc32_combine(zlib.crc32(first), zlib.crc32(second),
+                         len(second)) == zlib.crc32(first + second)
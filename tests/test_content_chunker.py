@@ -0,0 +1,39 @@
+import io
+import random
+import pytest
+from content_chunker import ContentChunker, chunk_digest
+
+
+def random_data(size, seed=0):
+    return random.Random(seed).randbytes(size)
+
+
+@pytest.mark.parametrize('data_size', [0, 100, 1024, 50000])
+def test_chunks_cover_data(data_size):
+    data = random_data(data_size)
+    chunker = ContentChunker(average_size=1024)
+    chunks = list(chunker.iter_chunks(file=io.BytesIO(data)))
+
+    assert b''.join(chunks) == data
+    assert all(len(chunk) <= 4096 for chunk in chunks)
+    # only the last chunk may be shorter than the minimum size
+    assert all(len(chunk) >= 256 for chunk in chunks[:-1])
+
+
+def test_boundaries_follow_content():
+    data = random_data(50000)
+    edited = data[:20000] + b'inserted bytes' + data[20000:]
+    chunker = ContentChunker(average_size=1024)
+    chunks = list(chunker.iter_chunks(file=io.BytesIO(data)))
+    edited_chunks = list(chunker.iter_chunks(file=io.BytesIO(edited)))
+
+    # only the chunks around the inserted bytes are different
+    assert len(set(chunks) - set(edited_chunks)) <= 2
+    assert edited_chunks[0] == chunks[0]
+    assert edited_chunks[-1] == chunks[-1]
+
+
+def test_chunk_digest():
+    assert chunk_digest(chunk=b'data') == chunk_digest(chunk=b'data')
+    assert chunk_digest(chunk=b'data') != chunk_digest(chunk=b'date')
+    assert len(chunk_digest(chunk=b'data')) == 16
@@ -1,8 +1,14 @@
 import os
+import random
 import shutil
+import time
+import zlib
 import pytest
 from rle_compression import RleCompression
 from filesystem_handler import FilesystemHandler
+from archive_format import FORMAT_VERSION, ArchiveFlags, EntryFlags
+from compression_types import CompressionTypes
+from exceptions import ChecksumMismatch, InvalidArchiveFormat
 
 
 def create_file(file_path, data):
@@ -107,3 +113,1171 @@ def test_some_files_compression_and_decompression():
     files_path.extend([output_file])
     clean(files=files_path)
 
+
+
+def compress_archive(handler, output_file, directories):
+    if os.path.isfile(output_file):
+        clean(files=[output_file])
+    handler.open_output_file(output_file_path=output_file)
+    result = handler.compress(directories=directories, init_compression=True)
+    handler.close_output_file()
+    return result
+
+
+def test_view_archive_reads_only_central_directory(capsys):
+    files_path = ['fileone', 'filetwo']
+    output_file = 'test.bin'
+    for file_path in files_path:
+        create_file(file_path, f'{file_path}-data' * 10)
+
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1))
+    compress_archive(handler, output_file, files_path)
+
+    # corrupt the entries - the central directory is still valid
+    with open(output_file, 'r+b') as f:
+        f.seek(12)
+        f.write(b'\xff' * 20)
+
+    assert handler.view_archive(compressed_file_path=output_file)
+    output = capsys.readouterr().out
+    for file_path in files_path:
+        assert f"{file_path} - size [{len(file_path) * 10 + 50}]" in output
+
+    clean(files=files_path + [output_file])
+
+
+def test_remove_from_indexed_archive():
+    files_path = ['fileone', 'filetwo', 'filethree']
+    output_file = 'test.bin'
+    for file_path in files_path:
+        create_file(file_path, f'{file_path}-data')
+
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1))
+    compress_archive(handler, output_file, files_path)
+    clean(files=files_path)
+
+    assert handler.remove_from_archive(
+        input_paths=['filetwo'], archive_path=output_file) == 1
+    _, directory, _ = handler.load_archive_index(archive_path=output_file)
+    assert [entry.path for entry in directory.entries] == ['fileone', 'filethree']
+
+    assert handler.decompress_files(directories=[output_file]) == {}
+    assert_file_and_folders_exist(files=['fileone', 'filethree'])
+    assert_file_and_folders_exist(files=['filetwo'], suppose_exist=False)
+
+    clean(files=['fileone', 'filethree', output_file])
+
+
+def test_extract_entries_by_glob_pattern():
+    files_path = ['fileone.txt', 'filetwo.txt', 'filethree.bin']
+    output_file = 'test.bin'
+    for file_path in files_path:
+        create_file(file_path, f'{file_path}-data')
+
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1))
+    compress_archive(handler, output_file, files_path)
+    clean(files=files_path)
+
+    extracted_paths = handler.extract(
+        archive_path=output_file, entries=['*.txt'])
+    assert extracted_paths == ['fileone.txt', 'filetwo.txt']
+    assert_file_and_folders_exist(files=['fileone.txt', 'filetwo.txt'])
+    assert_file_and_folders_exist(files=['filethree.bin'], suppose_exist=False)
+    with open('filetwo.txt', 'rt') as f:
+        assert f.read() == 'filetwo.txt-data'
+
+    assert handler.extract_files(
+        directories=[output_file], entries=['missing*']) != {}
+
+    clean(files=['fileone.txt', 'filetwo.txt', output_file])
+
+
+def test_scan_entries_matches_central_directory():
+    files_path = ['fileone', 'filetwo']
+    output_file = 'test.bin'
+    for file_path in files_path:
+        create_file(file_path, f'{file_path}-data' * 10)
+
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1))
+    compress_archive(handler, output_file, files_path)
+
+    _, directory, _ = handler.load_archive_index(archive_path=output_file)
+    compressed_data = handler.read_file(file=output_file)
+    _, next_index = handler.read_metadata(compressed_data=compressed_data)
+    scanned = handler.scan_entries(
+        compressed_data=handler.get_entries_data(compressed_data),
+        index=next_index)
+
+    assert [(entry.path, entry.offset, entry.compressed_size)
+            for entry in scanned.entries] == [
+        (entry.path, entry.offset, entry.compressed_size)
+        for entry in directory.entries]
+
+    clean(files=files_path + [output_file])
+
+
+def test_walk_archive_with_many_entries():
+    entries_num = 100000
+    output_file = 'test.bin'
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1))
+    handler.open_output_file(output_file_path=output_file)
+    handler.write_metadata()
+    for i in range(entries_num):
+        handler.write_entry(path=f'folder/file{i}'.encode(), data=b'aaab')
+    handler.close_output_file()
+
+    # deeper than the recursion limit - walked iteratively
+    assert handler.check_validation(archive_paths=[output_file]) == {}
+    compressed_data = handler.read_file(file=output_file)
+    _, next_index = handler.read_metadata(compressed_data=compressed_data)
+    walked = 0
+    for entry, file_data in handler.iter_entries(
+            compressed_data=handler.get_entries_data(compressed_data),
+            index=next_index):
+        assert entry.path == f'folder/file{walked}'
+        assert file_data == b'aaab'
+        walked += 1
+    assert walked == entries_num
+
+    clean(files=[output_file])
+
+
+def test_map_file():
+    file_path = 'fileone'
+    create_file(file_path, 'mapped-data')
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1))
+
+    with handler.map_file(file=file_path) as data:
+        assert isinstance(data, memoryview)
+        assert data[7:] == b'data'
+    # the view is released when the mapping is closed
+    with pytest.raises(ValueError):
+        data[0]
+
+    create_file(file_path, '')
+    with handler.map_file(file=file_path) as data:
+        assert len(data) == 0
+
+    clean(files=[file_path])
+
+
+@pytest.mark.parametrize('file_size', [1, 16, 17, 1000])
+def test_chunked_entries(file_size):
+    file_path = 'fileone'
+    output_file = 'test.bin'
+    file_data = ''.join(chr(ord('a') + i % 7) * (i % 3 + 1)
+                        for i in range(file_size))[:file_size]
+    create_file(file_path, file_data)
+
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        chunk_size=16)
+    compress_archive(handler, output_file, [file_path])
+    clean(files=[file_path])
+
+    _, directory, _ = handler.load_archive_index(archive_path=output_file)
+    entry = directory.entries[0]
+    assert bool(entry.flags & EntryFlags.CHUNKED) == (file_size > 16)
+    assert entry.uncompressed_size == file_size
+    assert entry.checksum == zlib.crc32(file_data.encode())
+
+    assert handler.decompress_files(directories=[output_file]) == {}
+    with open(file_path, 'rt') as f:
+        assert f.read() == file_data
+    assert handler.extract(
+        archive_path=output_file, entries=[file_path]) == [file_path]
+
+    clean(files=[output_file, file_path])
+
+
+@pytest.mark.parametrize('compression_type', list(CompressionTypes))
+def test_stream_entries_to_disk(compression_type):
+    file_path = 'fileone'
+    output_file = 'test.bin'
+    file_data = ''.join(f'line {i % 97} of the file\n' for i in range(2000))
+    create_file(file_path, file_data)
+
+    # a single (not chunked) entry, fed to the decompressor in small slices
+    handler = FilesystemHandler(
+        data_compression_algorithem=compression_type.value())
+    handler._stream_buffer_size = 64
+    compress_archive(handler, output_file, [file_path])
+    clean(files=[file_path])
+
+    assert handler.decompress_files(directories=[output_file]) == {}
+    with open(file_path, 'rt') as f:
+        assert f.read() == file_data
+    assert handler.check_validation(archive_paths=[output_file]) == {}
+
+    clean(files=[output_file, file_path])
+
+
+def test_stream_entries_to_disk_removes_partial_file():
+    file_path = 'fileone'
+    output_file = 'test.bin'
+    create_file(file_path, 'stam-data' * 1000)
+
+    handler = FilesystemHandler(
+        data_compression_algorithem=CompressionTypes.ZLIB.value())
+    handler._stream_buffer_size = 64
+    compress_archive(handler, output_file, [file_path])
+    clean(files=[file_path])
+
+    # corrupt the end of the compressed file data
+    _, directory, _ = handler.load_archive_index(archive_path=output_file)
+    entry = directory.entries[0]
+    with open(output_file, 'r+b') as f:
+        f.seek(entry.offset + entry.compressed_size - 4)
+        f.write(b'\xff' * 4)
+
+    assert handler.decompress_files(directories=[output_file]) != {}
+    assert_file_and_folders_exist(files=[file_path], suppose_exist=False)
+
+    clean(files=[output_file])
+
+
+@pytest.mark.parametrize('compression_type', [
+    CompressionTypes.RLE, CompressionTypes.LZ, CompressionTypes.ZLIB])
+def test_compress_in_workers(compression_type):
+    folder = 'stam'
+    os.makedirs(os.path.join(folder, 'empty'), exist_ok=True)
+    files_path = [os.path.join(folder, f'file{i}') for i in range(20)]
+    for i, file_path in enumerate(files_path):
+        create_file(file_path, f'{file_path}-data' * (i * 5 + 1))
+    output_files = ['serial.bin', 'parallel.bin']
+
+    for output_file, workers in zip(output_files, [1, 3]):
+        handler = FilesystemHandler(
+            data_compression_algorithem=compression_type.value(),
+            chunk_size=256, workers=workers)
+        compress_archive(handler, output_file, [folder])
+
+    # the entries are written in the same order as a serial compression
+    assert handler.read_file(file=output_files[0]) == \
+        handler.read_file(file=output_files[1])
+
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_files[1]]) == {}
+    assert_file_and_folders_exist(
+        files=files_path, folders=[os.path.join(folder, 'empty')])
+
+    clean(files=output_files, folders=[folder])
+
+
+def test_compress_in_workers_with_error():
+    files_path = ['fileone', 'filetwo']
+    output_file = 'test.bin'
+    for file_path in files_path:
+        create_file(file_path, f'{file_path}-data')
+
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1), workers=2)
+    result = compress_archive(handler, output_file, files_path + ['missing'])
+
+    assert 'MissingInputPath' in result
+    assert_file_and_folders_exist(files=[output_file], suppose_exist=False)
+
+    clean(files=files_path)
+
+
+def test_extract_in_workers(capsys):
+    folder = 'stam'
+    os.makedirs(os.path.join(folder, 'empty'), exist_ok=True)
+    files_path = [os.path.join(folder, f'file{i}') for i in range(20)]
+    for i, file_path in enumerate(files_path):
+        create_file(file_path, f'{file_path}-data' * (i * 5 + 1))
+    output_file = 'test.bin'
+
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        chunk_size=256, workers=3)
+    compress_archive(handler, output_file, [folder])
+    clean(folders=[folder])
+    capsys.readouterr()
+
+    assert handler.decompress_files(directories=[output_file]) == {}
+    for i, file_path in enumerate(files_path):
+        with open(file_path, 'rt') as f:
+            assert f.read() == f'{file_path}-data' * (i * 5 + 1)
+    assert_file_and_folders_exist(folders=[os.path.join(folder, 'empty')])
+    # the entries are reported in archive order
+    output = capsys.readouterr().out
+    assert output.index(files_path[1]) < output.index(files_path[2])
+    clean(folders=[folder])
+
+    assert sorted(handler.extract(
+        archive_path=output_file, entries=['*/file1?'])) == files_path[10:]
+    assert_file_and_folders_exist(files=files_path[10:])
+    assert_file_and_folders_exist(files=files_path[:10], suppose_exist=False)
+
+    clean(files=[output_file], folders=[folder])
+
+
+@pytest.mark.parametrize('corrupt_offset', [-4, -40])
+def test_extract_in_workers_with_error(corrupt_offset):
+    files_path = ['fileone', 'filetwo', 'filethree']
+    output_file = 'test.bin'
+    for file_path in files_path:
+        create_file(file_path, f'{file_path}-data' * 100)
+
+    handler = FilesystemHandler(
+        data_compression_algorithem=CompressionTypes.ZLIB.value(),
+        chunk_size=64, workers=2)
+    compress_archive(handler, output_file, files_path)
+    clean(files=files_path)
+
+    # corrupt the data of the second entry
+    _, directory, _ = handler.load_archive_index(archive_path=output_file)
+    entry = directory.entries[1]
+    with open(output_file, 'r+b') as f:
+        f.seek(entry.offset + entry.compressed_size + corrupt_offset)
+        f.write(b'\xff' * 4)
+
+    non_valid_archive_paths = handler.decompress_files(
+        directories=[output_file])
+    assert list(non_valid_archive_paths) == [output_file]
+    assert non_valid_archive_paths[output_file].startswith('raise ')
+    # all files of the invalid archive are removed
+    assert_file_and_folders_exist(files=files_path, suppose_exist=False)
+
+    clean(files=[output_file])
+
+
+def test_decompress_files_in_workers(capsys):
+    files_path = ['fileone', 'filetwo', 'filethree']
+    output_files = [f'test{i}.bin' for i in range(3)]
+    for file_path, output_file in zip(files_path, output_files):
+        create_file(file_path, f'{file_path}-data' * 10)
+        handler = FilesystemHandler(
+            data_compression_algorithem=RleCompression(bytes_size=1),
+            workers=2)
+        compress_archive(handler, output_file, [file_path])
+    clean(files=files_path)
+    # the second archive is not valid
+    with open(output_files[1], 'r+b') as f:
+        f.truncate(20)
+    capsys.readouterr()
+
+    non_valid_archive_paths = handler.decompress_files(
+        directories=output_files)
+    assert list(non_valid_archive_paths) == [output_files[1]]
+    assert non_valid_archive_paths[output_files[1]].startswith('raise ')
+    assert_file_and_folders_exist(files=[files_path[0], files_path[2]])
+    assert_file_and_folders_exist(files=[files_path[1]], suppose_exist=False)
+
+    # the output of the archives is printed in order
+    assert handler.decompress_files(
+        directories=[output_files[2], output_files[0]], view_mode=True) == {}
+    output = capsys.readouterr().out
+    assert output.index(output_files[2]) < output.index(output_files[0])
+
+    assert list(handler.check_validation(
+        archive_paths=output_files, timeout_seconds=60)) == [output_files[1]]
+
+    clean(files=output_files + [files_path[0], files_path[2]])
+
+
+def test_decompress_archive_timeout():
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1))
+    handler.decompress_archive_paths = lambda *args: time.sleep(5)
+
+    error_msg = handler.decompress_archive(
+        compressed_file='test.bin', timeout_seconds=0.1)
+    assert error_msg == \
+        'raise TimeoutError(Decompress execution timed out [0.1 seconds].)'
+
+
+def create_duplicate_files(folder):
+    os.makedirs(folder, exist_ok=True)
+    files_data = ['data-A' * 50, 'data-B' * 50, 'data-A' * 50,
+                  'data-A' * 50, 'big-data' * 100, 'big-data' * 100]
+    files_path = [os.path.join(folder, f'file{i}')
+                  for i in range(len(files_data))]
+    for file_path, file_data in zip(files_path, files_data):
+        create_file(file_path, file_data)
+    return files_path, files_data
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_deduplicate_files(workers):
+    folder = 'stam'
+    files_path, files_data = create_duplicate_files(folder)
+    output_files = ['test.bin', 'dedup.bin']
+
+    for output_file, deduplicate in zip(output_files, [False, True]):
+        handler = FilesystemHandler(
+            data_compression_algorithem=RleCompression(bytes_size=1),
+            chunk_size=256, workers=workers, deduplicate=deduplicate)
+        compress_archive(handler, output_file, files_path)
+    assert os.path.getsize(output_files[1]) < os.path.getsize(output_files[0])
+
+    _, directory, _ = handler.load_archive_index(archive_path=output_files[1])
+    references = [entry.path for entry in directory.entries
+                  if entry.flags & EntryFlags.REFERENCE]
+    assert references == [files_path[2], files_path[3], files_path[5]]
+    for entry, file_data in zip(directory.entries, files_data):
+        assert entry.uncompressed_size == len(file_data)
+        assert entry.checksum == zlib.crc32(file_data.encode())
+
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_files[1]]) == {}
+    for file_path, file_data in zip(files_path, files_data):
+        with open(file_path, 'rt') as f:
+            assert f.read() == file_data
+    clean(folders=[folder])
+
+    # the entries they refer to are not extracted
+    assert handler.extract(
+        archive_path=output_files[1], entries=['*/file3', '*/file5']
+    ) == [files_path[3], files_path[5]]
+    for i in [3, 5]:
+        with open(files_path[i], 'rt') as f:
+            assert f.read() == files_data[i]
+    assert handler.check_validation(archive_paths=[output_files[1]]) == {}
+
+    clean(files=output_files, folders=[folder])
+
+
+def test_iter_reference_entries():
+    folder = 'stam'
+    files_path, files_data = create_duplicate_files(folder)
+    output_file = 'test.bin'
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        chunk_size=256, deduplicate=True)
+    compress_archive(handler, output_file, files_path)
+
+    with handler.map_file(file=output_file) as compressed_data:
+        next_index = handler.handle_init_decompression(
+            compressed_data=compressed_data)
+        entries_data = handler.get_entries_data(
+            compressed_data=compressed_data)
+        assert [file_data.decode() for _, file_data in handler.iter_entries(
+            compressed_data=entries_data, index=next_index)] == files_data
+        del entries_data
+
+    clean(files=[output_file], folders=[folder])
+
+
+def test_remove_referred_entry():
+    folder = 'stam'
+    files_path, files_data = create_duplicate_files(folder)
+    output_file = 'test.bin'
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        chunk_size=256, deduplicate=True)
+    compress_archive(handler, output_file, files_path)
+
+    assert handler.remove_from_archive(
+        input_paths=[files_path[0], files_path[4]],
+        archive_path=output_file) == 2
+    for compact in [False, True]:
+        if compact:
+            assert handler.compact_archive(archive_path=output_file) > 0
+            _, directory, _ = handler.load_archive_index(
+                archive_path=output_file)
+            # the first reference takes the data of the removed entry
+            assert [entry.flags & EntryFlags.REFERENCE
+                    for entry in directory.entries] == [
+                        0, 0, EntryFlags.REFERENCE, 0]
+            assert directory.removed_entries == []
+        assert handler.check_validation(
+            archive_paths=[output_file], quick=True) == {}
+
+        clean(folders=[folder])
+        assert handler.decompress_files(directories=[output_file]) == {}
+        for i in [1, 2, 3, 5]:
+            with open(files_path[i], 'rt') as f:
+                assert f.read() == files_data[i]
+        assert_file_and_folders_exist(
+            files=[files_path[0], files_path[4]], suppose_exist=False)
+
+    clean(files=[output_file], folders=[folder])
+
+
+def create_near_duplicate_files(folder):
+    os.makedirs(folder, exist_ok=True)
+    data = random.Random(0).randbytes(20000)
+    files_data = [data, data[:9000] + b'edited' + data[9000:],
+                  data + b'rotated log lines' * 100, b'other']
+    files_path = [os.path.join(folder, f'file{i}')
+                  for i in range(len(files_data))]
+    for file_path, file_data in zip(files_path, files_data):
+        with open(file_path, 'wb') as f:
+            f.write(file_data)
+    return files_path, files_data
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_content_defined_chunks(workers):
+    folder = 'stam'
+    files_path, files_data = create_near_duplicate_files(folder)
+    output_files = ['test.bin', 'chunks.bin']
+
+    for output_file, content_chunk_size in zip(output_files, [None, 1024]):
+        handler = FilesystemHandler(
+            data_compression_algorithem=CompressionTypes.ZLIB.value(),
+            chunk_size=4096, workers=workers,
+            content_chunk_size=content_chunk_size)
+        compress_archive(handler, output_file, files_path)
+    assert os.path.getsize(output_files[1]) * 2 < \
+        os.path.getsize(output_files[0])
+
+    _, directory, _ = handler.load_archive_index(archive_path=output_files[1])
+    for entry, file_data in zip(directory.entries, files_data):
+        assert entry.flags & EntryFlags.CHUNK_LIST
+        assert entry.uncompressed_size == len(file_data)
+        assert entry.checksum == zlib.crc32(file_data)
+
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_files[1]]) == {}
+    for file_path, file_data in zip(files_path, files_data):
+        assert handler.read_file(file=file_path) == file_data
+    clean(folders=[folder])
+
+    # the chunks stored by the first entry are read from it
+    assert handler.extract(
+        archive_path=output_files[1], entries=['*/file2']) == [files_path[2]]
+    assert handler.read_file(file=files_path[2]) == files_data[2]
+    assert handler.check_validation(archive_paths=[output_files[1]]) == {}
+
+    clean(files=output_files, folders=[folder])
+
+
+def test_remove_chunks_owner_entry():
+    folder = 'stam'
+    files_path, files_data = create_near_duplicate_files(folder)
+    files_path.append(os.path.join(folder, 'copy'))
+    files_data.append(files_data[0])
+    shutil.copyfile(files_path[0], files_path[-1])
+    output_file = 'test.bin'
+    handler = FilesystemHandler(
+        data_compression_algorithem=CompressionTypes.ZLIB.value(),
+        content_chunk_size=1024, deduplicate=True)
+    compress_archive(handler, output_file, files_path)
+    size = os.path.getsize(output_file)
+
+    assert handler.remove_from_archive(
+        input_paths=[files_path[0]], archive_path=output_file) == 1
+    handler.compact_archive(archive_path=output_file)
+    # the chunks of the removed entry are stored by the next entries
+    assert os.path.getsize(output_file) > size * 0.9
+    assert handler.check_validation(
+        archive_paths=[output_file], quick=True) == {}
+
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_file]) == {}
+    for file_path, file_data in zip(files_path[1:], files_data[1:]):
+        assert handler.read_file(file=file_path) == file_data
+    assert_file_and_folders_exist(files=[files_path[0]], suppose_exist=False)
+
+    clean(files=[output_file], folders=[folder])
+
+
+def create_small_files(folder):
+    os.makedirs(folder, exist_ok=True)
+    files_data = {}
+    for i in range(12):
+        extension = ['.txt', '.py', '.ini'][i % 3]
+        file_path = os.path.join(folder, f'file{i}{extension}')
+        files_data[file_path] = f'{extension} line {i}\n' * (i + 10)
+        create_file(file_path, files_data[file_path])
+    big_file = os.path.join(folder, 'big.bin')
+    files_data[big_file] = 'big-data' * 200
+    create_file(big_file, files_data[big_file])
+    return files_data
+
+
+def test_paths_in_path_table():
+    folder = 'stam'
+    files_data = create_small_files(folder)
+    output_file = 'test.bin'
+    handler = FilesystemHandler(
+        data_compression_algorithem=CompressionTypes.HUFFMAN.value())
+    assert compress_archive(handler, output_file, [folder]) is None
+
+    header, directory, _ = handler.load_archive_index(
+        archive_path=output_file)
+    assert header.version == FORMAT_VERSION
+    assert header.flags & ArchiveFlags.PATH_TABLE
+    assert directory.path_codec is not None
+    assert sorted(entry.path for entry in directory.entries) == sorted(
+        files_data)
+    # the compressed path table is the only copy of the paths - the entry
+    # records hold none
+    with open(output_file, 'rb') as f:
+        data = f.read()
+    for entry in directory.entries:
+        record = data[entry.offset:entry.offset + entry.compressed_size]
+        assert os.path.basename(entry.path).encode() not in record
+    assert data.count(b'file4.py') == 0
+
+    assert handler.remove_from_archive(
+        input_paths=[os.path.join(folder, 'file1')],
+        archive_path=output_file) == 0
+    assert handler.remove_from_archive(
+        input_paths=[os.path.join(folder, 'file1.py')],
+        archive_path=output_file) == 1
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_file]) == {}
+    for file_path, file_data in files_data.items():
+        if os.path.basename(file_path) == 'file1.py':
+            assert_file_and_folders_exist(
+                files=[file_path], suppose_exist=False)
+        else:
+            with open(file_path, 'rt') as f:
+                assert f.read() == file_data
+
+    clean(files=[output_file], folders=[folder])
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_solid_blocks(workers):
+    folder = 'stam'
+    files_data = create_small_files(folder)
+    output_files = ['solid.bin', 'test.bin']
+    for output_file, solid_block_size in zip(output_files, [1024, None]):
+        handler = FilesystemHandler(
+            data_compression_algorithem=CompressionTypes.ZLIB.value(),
+            workers=workers, solid_block_size=solid_block_size)
+        assert compress_archive(handler, output_file, [folder]) is None
+    assert os.path.getsize(output_files[0]) < os.path.getsize(output_files[1])
+    header, _, _ = handler.load_archive_index(archive_path=output_files[1])
+    assert not header.flags & ArchiveFlags.SOLID_BLOCKS
+
+    header, directory, _ = handler.load_archive_index(
+        archive_path=output_files[0])
+    assert header.flags & ArchiveFlags.SOLID_BLOCKS
+    solid_entries = [entry for entry in directory.entries
+                     if entry.flags & EntryFlags.SOLID]
+    assert len(solid_entries) == 12
+    assert [entry.path for entry in directory.entries
+            if not entry.flags & EntryFlags.SOLID] == [
+                os.path.join(folder, 'big.bin')]
+    # the files are ordered by their extensions
+    extensions = [os.path.splitext(entry.path)[1] for entry in solid_entries]
+    assert extensions == sorted(extensions)
+    assert handler.check_validation(
+        archive_paths=[output_files[0]], quick=True) == {}
+
+    # every block is decompressed once
+    read_blocks = []
+    read_stored_chunk = handler.read_stored_chunk
+    def count_blocks(compressed_data, index):
+        read_blocks.append(index)
+        return read_stored_chunk(compressed_data=compressed_data, index=index)
+    if workers == 1:
+        handler.read_stored_chunk = count_blocks
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_files[0]]) == {}
+    for file_path, file_data in files_data.items():
+        with open(file_path, 'rt') as f:
+            assert f.read() == file_data
+    if workers == 1:
+        assert 1 < len(read_blocks) == len(set(read_blocks))
+        del handler.read_stored_chunk
+
+    clean(folders=[folder])
+    assert handler.extract(
+        archive_path=output_files[0], entries=['*/file4.py']
+    ) == [os.path.join(folder, 'file4.py')]
+    with open(os.path.join(folder, 'file4.py'), 'rt') as f:
+        assert f.read() == files_data[os.path.join(folder, 'file4.py')]
+
+    # the next entries of a block take it when its first entry is removed
+    assert handler.remove_from_archive(
+        input_paths=[solid_entries[0].path], archive_path=output_files[0]
+    ) == 1
+    assert handler.compact_archive(archive_path=output_files[0]) > 0
+    assert handler.check_validation(
+        archive_paths=[output_files[0]], quick=True) == {}
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_files[0]]) == {}
+    assert_file_and_folders_exist(
+        files=[solid_entries[0].path], suppose_exist=False)
+    for file_path, file_data in files_data.items():
+        if file_path != solid_entries[0].path:
+            with open(file_path, 'rt') as f:
+                assert f.read() == file_data
+
+    clean(files=output_files, folders=[folder])
+
+
+@pytest.mark.parametrize('solid_block_size', [None, 64, 1 << 10])
+def test_shared_buffers_fit_solid_blocks(solid_block_size):
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        chunk_size=256, workers=2, solid_block_size=solid_block_size)
+    shared_buffers = handler.create_shared_buffers()
+    try:
+        for buffer in shared_buffers._buffers:
+            assert buffer.size >= max(256, solid_block_size or 0) * 9 // 8
+    finally:
+        shared_buffers.close()
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_remove_entries_with_tombstones(monkeypatch, workers):
+    files_path = ['fileone', 'filetwo', 'filethree']
+    output_file = 'test.bin'
+    for file_path in files_path:
+        create_file(file_path, f'{file_path}-data' * 20)
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        workers=workers)
+    compress_archive(handler, output_file, files_path)
+    header, directory, footer = handler.load_archive_index(
+        archive_path=output_file)
+    assert not header.flags & ArchiveFlags.REMOVED_ENTRIES
+    header_size = len(header.to_bytes())
+    with open(output_file, 'rb') as f:
+        archive_data = f.read()
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    # a failed removal leaves the archive as it was
+    with monkeypatch.context() as m:
+        m.setattr(handler, 'write_central_directory', fail)
+        assert handler.remove_from_archive(
+            input_paths=['filetwo'], archive_path=output_file) is None
+    with open(output_file, 'rb') as f:
+        assert f.read() == archive_data
+
+    # the entry records are never copied
+    monkeypatch.setattr(FilesystemHandler, 'copy_record', fail)
+    assert handler.remove_from_archive(
+        input_paths=['filetwo'], archive_path=output_file) == 1
+    assert handler.remove_from_archive(
+        input_paths=['filetwo'], archive_path=output_file) == 0
+    monkeypatch.undo()
+    # only the header flags and the central directory were written, after
+    # the old one
+    with open(output_file, 'rb') as f:
+        assert f.read(len(archive_data))[header_size:] == \
+            archive_data[header_size:]
+    header, directory, _ = handler.load_archive_index(
+        archive_path=output_file)
+    assert header.flags & ArchiveFlags.REMOVED_ENTRIES
+    assert [entry.path for entry in directory.entries] == [
+        'fileone', 'filethree']
+    assert [entry.path for entry in directory.removed_entries] == ['filetwo']
+    assert [(entry.offset, entry.compressed_size)
+            for entry in directory.replaced_indexes] == [
+        (footer.index_offset, len(archive_data) - footer.index_offset)]
+
+    # reading the entries one after the other skips the removed entry
+    clean(files=files_path)
+    handler.decompress(compressed_file_path=output_file,
+                       init_decompression=True)
+    assert_file_and_folders_exist(files=['fileone', 'filethree'])
+    assert_file_and_folders_exist(files=['filetwo'], suppose_exist=False)
+    clean(files=['fileone', 'filethree'])
+    assert handler.decompress_files(directories=[output_file]) == {}
+    assert_file_and_folders_exist(files=['filetwo'], suppose_exist=False)
+
+    size = os.path.getsize(output_file)
+    assert handler.compact_archive(archive_path=output_file) > 0
+    assert os.path.getsize(output_file) < size
+    header, _, _ = handler.load_archive_index(archive_path=output_file)
+    assert not header.flags & ArchiveFlags.REMOVED_ENTRIES
+    clean(files=['fileone', 'filethree'])
+    assert handler.decompress_files(directories=[output_file]) == {}
+    for file_path in ['fileone', 'filethree']:
+        with open(file_path, 'rt') as f:
+            assert f.read() == f'{file_path}-data' * 20
+
+    clean(files=['fileone', 'filethree', output_file])
+
+
+@pytest.mark.parametrize('kernel_copy', [True, False])
+def test_compact_archives(monkeypatch, kernel_copy):
+    if not kernel_copy:
+        monkeypatch.delattr(os, 'copy_file_range', raising=False)
+    folder = 'stam'
+    files_path, files_data = create_near_duplicate_files(folder)
+    output_file = 'test.bin'
+    not_archive = 'not-archive.bin'
+    create_file(not_archive, 'data' * 10)
+    handler = FilesystemHandler(
+        data_compression_algorithem=CompressionTypes.ZLIB.value(),
+        chunk_size=1024)
+    compress_archive(handler, output_file, [folder])
+    assert handler.remove_from_archive(
+        input_paths=[files_path[1]], archive_path=output_file) == 1
+    size = os.path.getsize(output_file)
+
+    assert handler.compact_archives(
+        archive_paths=[output_file, not_archive]).keys() == {not_archive}
+    assert os.path.getsize(output_file) < size
+    assert_file_and_folders_exist(
+        files=[f'{output_file}.compact', f'{not_archive}.compact'],
+        suppose_exist=False)
+    with open(not_archive, 'rt') as f:
+        assert f.read() == 'data' * 10
+    _, directory, _ = handler.load_archive_index(archive_path=output_file)
+    assert directory.removed_entries == []
+    assert handler.check_validation(
+        archive_paths=[output_file], quick=True) == {}
+    # nothing left to reclaim
+    assert handler.compact_archive(archive_path=output_file) == 0
+
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_file]) == {}
+    for i, (file_path, file_data) in enumerate(zip(files_path, files_data)):
+        if i == 1:
+            assert_file_and_folders_exist(
+                files=[file_path], suppose_exist=False)
+        else:
+            assert handler.read_file(file=file_path) == file_data
+
+    clean(files=[output_file, not_archive], folders=[folder])
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_incremental_archives(workers, capsys):
+    folder = 'stam'
+    files_path, files_data = create_duplicate_files(folder)
+    empty_folder = os.path.join(folder, 'empty')
+    os.makedirs(empty_folder)
+    output_files = ['base.bin', 'delta.bin', 'noop.bin']
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        workers=workers, incremental=True)
+    assert compress_archive(handler, output_files[0], [folder]) is None
+
+    # modify, touch (same content), delete and add files
+    files_data[1] = 'data-B-edited' * 30
+    create_file(files_path[1], files_data[1])
+    stat = os.stat(files_path[2])
+    os.utime(files_path[2], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    os.remove(files_path[3])
+    new_file = os.path.join(folder, 'new')
+    create_file(new_file, 'new-data' * 20)
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        workers=workers, base_archive_path=output_files[0])
+    assert compress_archive(handler, output_files[1], [folder]) is None
+
+    _, directory, _ = handler.load_archive_index(archive_path=output_files[1])
+    assert sorted(entry.path for entry in directory.entries) == [
+        files_path[1], new_file]
+    assert directory.manifest.base_path == output_files[0]
+    assert handler.view_archive(compressed_file_path=output_files[1])
+    assert f"{files_path[2]} - size [300] - unchanged since base.bin" in \
+        capsys.readouterr().out
+
+    # the unchanged files are restored from the base archive
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_files[1]]) == {}
+    for i in [0, 1, 2, 4, 5]:
+        with open(files_path[i], 'rt') as f:
+            assert f.read() == files_data[i]
+    assert_file_and_folders_exist(files=[files_path[3]], suppose_exist=False)
+    assert_file_and_folders_exist(folders=[empty_folder])
+    clean(folders=[folder])
+    assert handler.extract(
+        archive_path=output_files[1], entries=['*/file0']) == [files_path[0]]
+
+    # the restored files have new modification times but the same content
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_files[1]]) == {}
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        workers=workers, base_archive_path=output_files[1])
+    assert compress_archive(handler, output_files[2], [folder]) is None
+    _, directory, _ = handler.load_archive_index(archive_path=output_files[2])
+    assert directory.entries == []
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_files[2]]) == {}
+    with open(new_file, 'rt') as f:
+        assert f.read() == 'new-data' * 20
+
+    # a base archive which changed is detected
+    assert handler.remove_from_archive(
+        input_paths=[files_path[0]], archive_path=output_files[0]) == 1
+    error_msg = handler.decompress_files(directories=[output_files[2]])
+    assert 'InvalidArchiveFormat' in error_msg[output_files[2]]
+
+    clean(files=output_files, folders=[folder])
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_update_archive_in_place(monkeypatch, workers):
+    folder = 'stam'
+    files_path, files_data = create_duplicate_files(folder)
+    output_file = 'test.bin'
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        workers=workers, incremental=True)
+    assert compress_archive(handler, output_file, [folder]) is None
+    header, directory, footer = handler.load_archive_index(
+        archive_path=output_file)
+    offsets = {entry.path: entry.offset for entry in directory.entries}
+    header_size = len(header.to_bytes())
+    with open(output_file, 'rb') as f:
+        archive_data = f.read()
+
+    def fail(*args, **kwargs):
+        raise OSError('copied')
+
+    # the entry records are never copied
+    monkeypatch.setattr(FilesystemHandler, 'copy_record', fail)
+
+    # modify (same size), touch (same content), delete and add files
+    files_data[1] = 'data-b' * 50
+    create_file(files_path[1], files_data[1])
+    stat = os.stat(files_path[2])
+    os.utime(files_path[2], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    os.remove(files_path[3])
+    new_file = os.path.join(folder, 'new')
+    create_file(new_file, 'new-data' * 20)
+    assert handler.update_archive(
+        input_paths=[folder], archive_path=output_file)
+
+    # the existing entries are not touched, the new ones are appended
+    with open(output_file, 'rb') as f:
+        updated_data = f.read()
+    assert updated_data[header_size:len(archive_data)] == \
+        archive_data[header_size:]
+    _, directory, _ = handler.load_archive_index(archive_path=output_file)
+    assert sorted(entry.path for entry in directory.removed_entries) == [
+        files_path[1], files_path[3]]
+    for entry in directory.entries:
+        if entry.path in [files_path[1], new_file]:
+            assert entry.offset >= footer.index_offset
+        else:
+            assert entry.offset == offsets[entry.path]
+    assert sorted(entry.path for entry in directory.manifest.entries) == \
+        sorted(files_path[:3] + files_path[4:] + [new_file])
+
+    # nothing changed since the last update - nothing is written
+    assert handler.update_archive(
+        input_paths=[folder], archive_path=output_file)
+    with open(output_file, 'rb') as f:
+        assert f.read() == updated_data
+    monkeypatch.undo()
+    _, updated_directory, _ = handler.load_archive_index(
+        archive_path=output_file)
+    assert [vars(entry) for entry in updated_directory.entries] == [
+        vars(entry) for entry in directory.entries]
+    assert len(updated_directory.removed_entries) == 2
+
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_file]) == {}
+    for i, (file_path, file_data) in enumerate(zip(files_path, files_data)):
+        if i == 3:
+            assert_file_and_folders_exist(
+                files=[file_path], suppose_exist=False)
+        else:
+            with open(file_path, 'rt') as f:
+                assert f.read() == file_data
+    with open(new_file, 'rt') as f:
+        assert f.read() == 'new-data' * 20
+
+    clean(files=[output_file], folders=[folder])
+
+
+@pytest.mark.parametrize('incremental', [False, True])
+def test_update_and_remove_match_whole_paths(incremental):
+    folder = 'stam'
+    os.makedirs(folder)
+    file_path = os.path.join(folder, 'a.txt')
+    backup_path = os.path.join(folder, 'a.txt.bak')
+    create_file(file_path, 'data' * 20)
+    create_file(backup_path, 'backup' * 20)
+    output_file = 'test.bin'
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        incremental=incremental)
+    assert compress_archive(handler, output_file, [folder]) is None
+
+    create_file(file_path, 'changed' * 20)
+    assert handler.update_archive(
+        input_paths=[file_path], archive_path=output_file)
+    _, directory, _ = handler.load_archive_index(archive_path=output_file)
+    assert sorted(entry.path for entry in directory.entries) == [
+        file_path, backup_path]
+    assert [entry.path for entry in directory.removed_entries] == [
+        file_path]
+    if incremental:
+        assert sorted(entry.path for entry in directory.manifest.entries) \
+            == [file_path, backup_path]
+
+    assert handler.remove_from_archive(
+        input_paths=[os.path.join(folder, 'a')],
+        archive_path=output_file) == 0
+    assert handler.remove_from_archive(
+        input_paths=[file_path], archive_path=output_file) == 1
+    _, directory, _ = handler.load_archive_index(archive_path=output_file)
+    assert [entry.path for entry in directory.entries] == [backup_path]
+    if incremental:
+        assert [entry.path for entry in directory.manifest.entries] == [
+            backup_path]
+
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_file]) == {}
+    with open(backup_path, 'rt') as f:
+        assert f.read() == 'backup' * 20
+    assert_file_and_folders_exist(files=[file_path], suppose_exist=False)
+
+    clean(files=[output_file], folders=[folder])
+
+
+@pytest.mark.parametrize('incremental', [False, True])
+def test_interrupted_update_keeps_archive(monkeypatch, incremental):
+    folder = 'stam'
+    files_path, _ = create_duplicate_files(folder)
+    output_file = 'test.bin'
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        incremental=incremental)
+    assert compress_archive(handler, output_file, [folder]) is None
+    with open(output_file, 'rb') as f:
+        archive_data = f.read()
+
+    def interrupt(*args, **kwargs):
+        handler.write_output(b'partial-entry')
+        raise KeyboardInterrupt()
+
+    create_file(files_path[1], 'changed')
+    monkeypatch.setattr(handler, 'compress', interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        handler.update_archive(input_paths=[folder], archive_path=output_file)
+
+    with open(output_file, 'rb') as f:
+        assert f.read() == archive_data
+    assert handler.check_validation(
+        archive_paths=[output_file], quick=True) == {}
+
+    clean(files=[output_file], folders=[folder])
+
+
+def write_legacy_header(handler):
+    # the header of archives written before the flags became a varint -
+    # a single byte of flags, so without a path table
+    output_file = handler._output_file
+    handler._output_file = None
+    FilesystemHandler.write_metadata(handler)
+    handler._output_file = output_file
+    handler._path_table = False
+    handler._central_directory.path_codec = None
+    handler._archive_header.flags &= ~ArchiveFlags.PATH_TABLE
+    output_file.write(handler._archive_header.to_bytes())
+
+
+def test_legacy_header_is_widened_once(monkeypatch, capsys):
+    folder = 'stam'
+    files_path, files_data = create_duplicate_files(folder)
+    output_file = 'test.bin'
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        incremental=True)
+    with monkeypatch.context() as m:
+        m.setattr(handler, 'write_metadata',
+                  lambda: write_legacy_header(handler))
+        assert compress_archive(handler, output_file, [folder]) is None
+    header, _, _ = handler.load_archive_index(archive_path=output_file)
+    assert header.flags_size == 1
+
+    # the flag of removed entries has no room in place
+    handler.open_output_file(output_file_path=output_file)
+    handler._central_directory.remove_entries(
+        entries=handler._central_directory.entries[:1])
+    with pytest.raises(InvalidArchiveFormat):
+        handler.close_output_file()
+    handler.discard_output_file()
+    assert handler.check_validation(archive_paths=[output_file]) == {}
+
+    assert handler.remove_from_archive(
+        input_paths=[files_path[0]], archive_path=output_file) == 1
+    assert 'compacting the archive once' in capsys.readouterr().out
+    header, directory, _ = handler.load_archive_index(
+        archive_path=output_file)
+    assert header.flags_size == 2
+    assert header.flags & ArchiveFlags.REMOVED_ENTRIES
+    assert not header.flags & ArchiveFlags.PATH_TABLE
+    assert [entry.path for entry in directory.removed_entries] == [
+        files_path[0]]
+
+    # the widened header is updated in place from now on
+    os.remove(files_path[0])
+    create_file(files_path[1], 'changed' * 20)
+    assert handler.update_archive(
+        input_paths=[folder], archive_path=output_file)
+    assert 'compacting' not in capsys.readouterr().out
+    clean(folders=[folder])
+    assert handler.decompress_files(directories=[output_file]) == {}
+    assert_file_and_folders_exist(files=[files_path[0]], suppose_exist=False)
+    with open(files_path[1], 'rt') as f:
+        assert f.read() == 'changed' * 20
+    for file_path, file_data in zip(files_path[2:], files_data[2:]):
+        with open(file_path, 'rt') as f:
+            assert f.read() == file_data
+
+    clean(files=[output_file], folders=[folder])
+
+
+def test_delta_archive_without_base_manifest():
+    files_path = ['fileone']
+    output_files = ['base.bin', 'delta.bin']
+    create_file(files_path[0], 'data' * 10)
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1))
+    compress_archive(handler, output_files[0], files_path)
+
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        base_archive_path=output_files[0])
+    result = compress_archive(handler, output_files[1], files_path)
+    assert result.startswith('InvalidArchiveFormat')
+    assert_file_and_folders_exist(files=[output_files[1]], suppose_exist=False)
+
+    clean(files=files_path + [output_files[0]])
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+@pytest.mark.parametrize('chunk_size', [16, 1 << 20])
+def test_verify_checksums(workers, chunk_size):
+    files_path = ['fileone', 'filetwo']
+    files_data = ['abcd' * 20, 'efgh' * 20]
+    output_file = 'test.bin'
+    for file_path, file_data in zip(files_path, files_data):
+        create_file(file_path, file_data)
+    handler = FilesystemHandler(
+        data_compression_algorithem=RleCompression(bytes_size=1),
+        chunk_size=chunk_size, workers=workers)
+    compress_archive(handler, output_file, files_path)
+    assert handler.check_validation(
+        archive_paths=[output_file], quick=True) == {}
+
+    # corrupt a data byte of the last entry - it still decodes
+    _, directory, _ = handler.load_archive_index(archive_path=output_file)
+    entry = directory.entries[1]
+    corrupt_offset = entry.offset + entry.compressed_size - 2
+    if chunk_size == 16:
+        # the last byte is the end of the chunks
+        corrupt_offset -= 1
+    with open(output_file, 'r+b') as f:
+        f.seek(corrupt_offset)
+        corrupt_byte = f.read(1)
+        f.seek(corrupt_offset)
+        f.write(bytes([corrupt_byte[0] ^ 1]))
+
+    clean(files=files_path)
+    for quick in [True, False]:
+        error_msg = handler.check_validation(
+            archive_paths=[output_file], quick=quick)
+        assert 'ChecksumMismatch' in error_msg[output_file]
+    with pytest.raises(ChecksumMismatch):
+        handler.extract(archive_path=output_file, entries=files_path)
+    assert_file_and_folders_exist(files=[files_path[1]], suppose_exist=False)
+
+    clean(files=[output_file, files_path[0]])
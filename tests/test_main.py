@@ -3,6 +3,8 @@ from main import *
 from action_types import ActionTypes
 from compression_types import CompressionTypes
 import os
+import subprocess
+import sys
 import pytest
 
 FOLDER_NAME = 'test-folder'
@@ -89,6 +91,8 @@ def test_remove_from_archive():
 
         # REMOVE_FROM_ARCHIVE
         run(input_paths=[os.path.join(folder_name, file_name)], output_path=output_path, action_type=ActionTypes.REMOVE_FROM_ARCHIVE.value, compression_type=compression_type)
+        # COMPACT_ARCHIVE
+        run(input_paths=[output_path], output_path='', action_type=ActionTypes.COMPACT_ARCHIVE.value, compression_type=compression_type)
         # DECOMPRESS
         run(input_paths=[output_path], output_path='', action_type=ActionTypes.DECOMPRESS.value, compression_type=compression_type)
         
@@ -151,6 +155,27 @@ def test_compression_file_doesnot_exist():
     run(input_paths=[non_exist_file], output_path='stam.bin', action_type=ActionTypes.COMPRESS.value)
     assert not os.path.isfile('stam.bin')
 
+@pytest.mark.parametrize("compression_type, compression_level", [
+    ("zlib", 10),
+    ("lzma", 42),
+    ("bz2", 0),
+])
+def test_compression_level_out_of_range(compression_type, compression_level):
+    input_paths = make_dirs(folders_num=1)
+    output_path = 'stam.bin'
+    assert not validate_args(
+        output_path=output_path, action_type=ActionTypes.COMPRESS.value,
+        compression_type=compression_type,
+        compression_level=compression_level)
+    run(input_paths=input_paths, output_path=output_path,
+        action_type=ActionTypes.COMPRESS.value,
+        compression_type=compression_type,
+        compression_level=compression_level)
+    assert not os.path.isfile(output_path)
+
+    clean(input_paths)
+
+
 def test_compress_empty_folder():
     folder_name = 'stam'
     output_path = 'stam.bin'
@@ -191,13 +216,13 @@ def test_decompress_to_specific_location():
 @pytest.mark.parametrize("data", [
     (b'!@#'), 
     (b'*^&'),
+    (b'*\x00*^&!@#\x00!'),
     (b'valid data')
 ])
-def test_invalid_data_for_compression(data):
+def test_special_signs_data_compression(data):
     test_file = 'test.txt'
     paths = [test_file]   
     for member in CompressionTypes:
-        invalid_data = member.value().get_special_signs()
         with open(test_file, 'wb') as f:
             f.write(data)
         compression_type = member.name.lower()
@@ -206,17 +231,32 @@ def test_invalid_data_for_compression(data):
 
         # COMPRESS
         assert not os.path.isfile(output_path)
-        if data in invalid_data:
-            # with pytest.raises(expected_exception=Exception, match=f"Could not compress {test_file} using"):
-            run(input_paths=[test_file], output_path=output_path, action_type=ActionTypes.COMPRESS.value, compression_type=compression_type)
-            assert not os.path.isfile(output_path)
-        else:
-            run(input_paths=[test_file], output_path=output_path, action_type=ActionTypes.COMPRESS.value, compression_type=compression_type)
-            assert os.path.isfile(output_path)
+        run(input_paths=[test_file], output_path=output_path, action_type=ActionTypes.COMPRESS.value, compression_type=compression_type)
+        assert os.path.isfile(output_path)
+
+        # DECOMPRESS
+        os.remove(test_file)
+        run(input_paths=[output_path], output_path='', action_type=ActionTypes.DECOMPRESS.value)
+        with open(test_file, 'rb') as f:
+            assert data == f.read()
         
     clean(paths=paths)
 
 
+@pytest.mark.parametrize("member", list(CompressionTypes))
+@pytest.mark.parametrize("bytes_input", [
+    b"*^&*^&*^&",
+    b"!@#*\x00*^",
+    b"A" * 300 + b"*" * 300,
+    bytes(range(256)) * 3
+])
+def test_special_signs_round_trip(member, bytes_input):
+    data_compression = member.value()
+    compressed_data = data_compression.compress_data(data=bytes_input)
+    assert bytes_input == data_compression.decompress_data(
+        compressed_data=compressed_data)
+
+
 @pytest.mark.parametrize("compression_algo", [
     (CompressionTypes.RLE.name), 
     (CompressionTypes.LZ.name),
@@ -257,3 +297,51 @@ def test_compress_and_decompress_folder(compression_algo):
 
 
 
+
+
+def test_extract_entries():
+    files_num = 3
+    input_paths = make_dirs(folders_num=2, files_num=files_num)
+    output_path = "output.bin"
+    run(input_paths=input_paths, output_path=output_path, action_type=ActionTypes.COMPRESS.value)
+    clean(input_paths)
+
+    # EXTRACT
+    run(input_paths=[output_path], output_path='', action_type=ActionTypes.EXTRACT.value, entries=[f"{FOLDER_NAME}-1/{FILE_NAME}[01]"])
+    assert not os.path.exists(input_paths[0])
+    assert sorted(os.listdir(input_paths[1])) == [f"{FILE_NAME}0", f"{FILE_NAME}1"]
+
+    clean(input_paths + [output_path])
+
+
+def test_compress_and_decompress_in_workers():
+    input_paths = make_dirs(folders_num=2, files_num=3, size=100)
+    output_path = "output.bin"
+    run(input_paths=input_paths, output_path=output_path, action_type=ActionTypes.COMPRESS.value, workers=2, chunk_size=16)
+    clean(input_paths)
+
+    run(input_paths=[output_path], output_path='', action_type=ActionTypes.DECOMPRESS.value, workers=2)
+    for folder_name in input_paths:
+        for i in range(3):
+            with open(os.path.join(folder_name, f"{FILE_NAME}{i}"), 'rb') as f:
+                assert f.read() == b"1" * 100
+
+    clean(input_paths + [output_path])
+
+
+def test_compress_in_workers_keeps_stderr_clean():
+    # the resource tracker is a separate process writing to the inherited
+    # stderr, so the command runs in a subprocess to capture its output
+    input_paths = make_dirs(folders_num=1, files_num=6, size=10000)
+    output_path = "output.bin"
+    main_path = os.path.join(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))), "main.py")
+    result = subprocess.run(
+        [sys.executable, main_path, "--input_paths_list", *input_paths,
+         "--output_path", output_path, "--action_type",
+         ActionTypes.COMPRESS.value, "--workers", "2"],
+        capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0
+    assert result.stderr == ""
+    assert os.path.exists(output_path)
+    clean(input_paths + [output_path])
@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from parallel_workers import OrderedTaskQueue, SharedBuffers, hand_over
+
+
+@pytest.fixture
+def shared_buffers():
+    buffers = SharedBuffers(slots_num=2, slot_size=16)
+    yield buffers
+    buffers.close()
+
+
+def test_hand_over_through_shared_buffer(shared_buffers):
+    slot, buffer_name = shared_buffers.acquire()
+    result = hand_over(b"compressed", buffer_name)
+    assert result == len(b"compressed")
+    with shared_buffers.read(slot=slot, result=result) as data:
+        assert bytes(data) == b"compressed"
+    shared_buffers.release(slot=slot)
+
+
+def test_hand_over_too_big_data(shared_buffers):
+    slot, buffer_name = shared_buffers.acquire()
+    result = hand_over(b"x" * 17, buffer_name)
+    assert result == b"x" * 17
+    with shared_buffers.read(slot=slot, result=result) as data:
+        assert bytes(data) == b"x" * 17
+    assert hand_over(b"data") == b"data"
+
+
+def test_shared_buffers_ring(shared_buffers):
+    first = shared_buffers.acquire()
+    second = shared_buffers.acquire()
+    assert first[0] != second[0]
+    assert shared_buffers.acquire() is None
+    shared_buffers.release(slot=first[0])
+    shared_buffers.release(slot=None)
+    assert shared_buffers.acquire() == first
+
+
+def test_ordered_task_queue():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        queue = OrderedTaskQueue(executor=executor, max_in_flight=3)
+        queue.put("a", pow, 2, 3)
+        queue.put("b")
+        queue.put("c", pow, 3, 2)
+        assert queue.full()
+        assert [queue.get() for _ in range(3)] == [
+            ("a", 8), ("b", None), ("c", 9)
+        ]
+        assert not len(queue)
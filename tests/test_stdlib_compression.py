@@ -0,0 +1,64 @@
+import pytest
+from zlib_compression import ZlibCompression
+from lzma_compression import LzmaCompression
+from bz2_compression import Bz2Compression
+from exceptions import InvalidCompressionAlgorithem
+
+
+@pytest.mark.parametrize("compression_class", [
+    ZlibCompression, LzmaCompression, Bz2Compression
+])
+@pytest.mark.parametrize("bytes_input", [
+    b"WWWWWWWWWWWWBWWWWWWWWWWWWBBBWWWWWWWWWWWWWWWWWWWWWWWWBWWWWWWWWWWWWWW",
+    b"*^&!@#",
+    bytes(range(256)) * 4,
+    b""
+])
+def test_compress_and_decompress(compression_class, bytes_input):
+    data_compression = compression_class()
+    compressed_data = data_compression.compress_data(data=bytes_input)
+    assert bytes_input == data_compression.decompress_data(
+        compressed_data=compressed_data)
+
+
+@pytest.mark.parametrize("compression_class, level", [
+    (ZlibCompression, 1),
+    (LzmaCompression, 0),
+    (Bz2Compression, 1)
+])
+def test_metadata_contains_level(compression_class, level):
+    data_compression = compression_class(level=level)
+    metadata = data_compression.get_metadata()
+    assert metadata == bytes([level])
+    assert compression_class.from_metadata(metadata=metadata)._level == level
+
+
+@pytest.mark.parametrize("compression_class, level", [
+    (ZlibCompression, 10),
+    (ZlibCompression, -2),
+    (LzmaCompression, 42),
+    (Bz2Compression, 0),
+])
+def test_invalid_level(compression_class, level):
+    assert not compression_class.is_valid_level(level=level)
+    with pytest.raises(InvalidCompressionAlgorithem):
+        compression_class(level=level)
+
+
+def test_zlib_default_level():
+    data_compression = ZlibCompression(level=-1)
+    assert data_compression.get_metadata() == bytes(
+        [ZlibCompression.DEFAULT_LEVEL])
+
+
+@pytest.mark.parametrize("compression_class", [
+    ZlibCompression, LzmaCompression, Bz2Compression
+])
+def test_streaming_compressobj(compression_class):
+    data_compression = compression_class()
+    chunks = [b"stam-data" * 100, b"more-data" * 50, b""]
+    compressor = data_compression.compressobj()
+    compressed_data = b"".join(compressor.compress(c) for c in chunks)
+    compressed_data += compressor.flush()
+    assert b"".join(chunks) == data_compression.decompress_data(
+        compressed_data=compressed_data)
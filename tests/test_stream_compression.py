@@ -0,0 +1,90 @@
+import random
+import pytest
+from rle_compression import RleCompression
+from lempel_ziv_compression import LempelZivCompression
+from huffman_compression import HuffmanCompression
+from zlib_compression import ZlibCompression
+from lzma_compression import LzmaCompression
+from bz2_compression import Bz2Compression
+from stream_compression import BlockCompressor, BlockDecompressor
+from exceptions import InvalidArchiveFormat
+
+DATA = [
+    b"",
+    b"WWWWWWWWWWWWBWWWWWWWWWWWWBBBWWWWWWWWWWWWWWWWWWWWWWWWBWWWWWWWWWWWWWW",
+    b"*^&!@#*\x00*^" * 20,
+    b"A" * 1000 + b"*" * 600 + b"!" * 3,
+    bytes(random.Random(7).randrange(256) for _ in range(3000)),
+    bytes(random.Random(8).choice(b"*^&!@#\x00ab") for _ in range(3000)),
+]
+
+
+def split(data, seed):
+    rand = random.Random(seed)
+    chunks = []
+    i = 0
+    while i < len(data):
+        size = rand.choice([1, 2, 3, 7, 64, 500])
+        chunks.append(data[i:i + size])
+        i += size
+    return chunks
+
+
+def stream(coder, chunks):
+    return b"".join(coder.feed(chunk=chunk) for chunk in chunks) + coder.flush()
+
+
+@pytest.mark.parametrize("compression_algorithem", [
+    RleCompression(bytes_size=1), RleCompression(bytes_size=2),
+    RleCompression(bytes_size=3), LempelZivCompression(),
+    HuffmanCompression(), ZlibCompression(), LzmaCompression(),
+    Bz2Compression()
+])
+@pytest.mark.parametrize("data", DATA)
+def test_stream_round_trip(compression_algorithem, data):
+    compressed_data = stream(
+        compression_algorithem.compressor(), split(data, seed=1))
+    assert data == stream(
+        compression_algorithem.decompressor(), split(compressed_data, seed=2))
+
+
+@pytest.mark.parametrize("compression_algorithem", [
+    RleCompression(bytes_size=1), RleCompression(bytes_size=2),
+    LempelZivCompression()
+])
+@pytest.mark.parametrize("data", DATA)
+def test_stream_is_same_as_one_shot(compression_algorithem, data):
+    compressed_data = compression_algorithem.compress_data(data=data)
+    assert compressed_data == stream(
+        compression_algorithem.compressor(), split(data, seed=3))
+    assert data == compression_algorithem.decompress_data(
+        compressed_data=compressed_data)
+
+
+def test_block_mode():
+    compression_algorithem = HuffmanCompression()
+    compressor = BlockCompressor(
+        compression_algorithem=compression_algorithem, block_size=100)
+    compressed_data = stream(compressor, split(DATA[1] * 5, seed=4))
+    decompressor = BlockDecompressor(
+        compression_algorithem=compression_algorithem)
+    assert DATA[1] * 5 == stream(decompressor, split(compressed_data, seed=5))
+
+    decompressor = BlockDecompressor(
+        compression_algorithem=compression_algorithem)
+    decompressor.feed(chunk=compressed_data[:-1])
+    with pytest.raises(InvalidArchiveFormat):
+        decompressor.flush()
+
+
+@pytest.mark.parametrize('compression_algorithem', [
+    ZlibCompression(), LzmaCompression(), Bz2Compression()])
+def test_truncated_stdlib_stream(compression_algorithem):
+    compressed_data = compression_algorithem.compress_data(data=DATA[1])
+    decompressor = compression_algorithem.decompressor()
+    decompressor.feed(chunk=compressed_data[:-1])
+    with pytest.raises(InvalidArchiveFormat):
+        decompressor.flush()
+    with pytest.raises(InvalidArchiveFormat):
+        compression_algorithem.decompress_data(
+            compressed_data=compressed_data[:-1])
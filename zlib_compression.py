@@ -0,0 +1,50 @@
+import zlib
+from typing import Any
+from stdlib_compression import StdlibCompression
+
+
+class ZlibCompression(StdlibCompression):
+    """ZlibCompression is a class that wraps the zlib (deflate)
+    compression of the python standard library.
+
+    Args:
+        StdlibCompression (class): The base class for standard library
+        compression algorithms.
+
+    Methods:
+        compressobj() -> Any: Creates a new zlib compressor object.
+        decompressobj() -> Any: Creates a new zlib decompressor object.
+    """
+
+    codec_id = 4
+    DEFAULT_LEVEL = 6
+
+    # zlib accepts its own Z_DEFAULT_COMPRESSION (-1) as a level
+    MIN_LEVEL = zlib.Z_DEFAULT_COMPRESSION
+
+    def __init__(self, level: int = DEFAULT_LEVEL) -> None:
+        """Initialize the ZlibCompression class.
+
+        Args:
+            level (int): The compression level (0-9, -1 for the zlib
+            default). Default: 6
+        """
+        if level == zlib.Z_DEFAULT_COMPRESSION:
+            level = self.DEFAULT_LEVEL
+        super().__init__(level=level)
+
+    def compressobj(self) -> Any:
+        """Creates a new zlib compressor object.
+
+        Returns:
+            Any: zlib compressor object.
+        """
+        return zlib.compressobj(self._level)
+
+    def decompressobj(self) -> Any:
+        """Creates a new zlib decompressor object.
+
+        Returns:
+            Any: zlib decompressor object.
+        """
+        return zlib.decompressobj()